@@ -0,0 +1,20 @@
+"""Tools to explore the Collatz conjecture and discrete dynamical systems.
+
+Submodules are imported on first access (e.g. collatz.dynamical), and plotting (matplotlib, networkx) and scipy
+are only loaded when they are used, so importing the package and starting worker processes is cheap.
+"""
+import importlib
+
+_SUBMODULES = ('affine', 'aggregate', 'batch', 'benchmark', 'bigint', 'cache', 'codec', 'collatz', 'columns',
+				'database', 'dynamical', 'functions', 'importer', 'instrument', 'jit', 'lazy', 'pipeline', 'plot',
+				'records', 'storage', 'utils')
+
+
+def __getattr__(name):
+	if name in _SUBMODULES:
+		return importlib.import_module('collatz.' + name)
+	raise AttributeError("module 'collatz' has no attribute " + repr(name))
+
+
+def __dir__():
+	return sorted(list(globals()) + list(_SUBMODULES))
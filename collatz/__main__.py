@@ -0,0 +1,225 @@
+"""Command line interface: python -m collatz {sweep, query, fractal, bench} --help"""
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+# Rough memory used by a block of generate_collatz_data (dict with the orbit lists) per value.
+SWEEP_BYTES_PER_VALUE = 4096
+# Memory used by mandelbrot_set per grid point (z, c, iterations and masks).
+FRACTAL_BYTES_PER_POINT = 64
+
+
+def fit_memory_budget(budget, item_bytes, workers, queue_size):
+	"""Reduces queue_size and then workers so that the items in flight (being computed or waiting to be written)
+	fit in budget.
+
+	Args:
+		budget (int): memory budget in bytes, None for no limit.
+		item_bytes (int): memory of one item.
+		workers (int): number of workers.
+		queue_size (int): number of items waiting to be written.
+
+	Returns:
+		tuple: (workers, queue_size).
+	"""
+	if budget is None:
+		return workers, queue_size
+	items = max(budget // max(item_bytes, 1), 2)
+	queue_size = max(1, min(queue_size, items - max(workers, 1)))
+	workers = max(0, min(workers, items - queue_size))
+	return workers, queue_size
+
+
+def sweep(args):
+	from collatz import functions, storage, instrument
+
+	data = storage.open_storage(args.storage) if args.storage else storage.get_default_storage()
+	database = None
+	if args.database:
+		from collatz.database import ResultsDatabase
+		database = ResultsDatabase(args.database)
+
+	workers, queue_size = fit_memory_budget(args.memory_budget, args.interval*SWEEP_BYTES_PER_VALUE, args.workers,
+											args.queue_size)
+	instrumentation = None
+	if args.prometheus:
+		instrumentation = instrument.Instrumentation(prometheus_path = args.prometheus)
+
+	metrics = functions.generate_collatz_data(args.blocks, args.interval, args.verify, data, database, workers,
+											queue_size, instrumentation)
+	print(metrics)
+	return 0
+
+
+def query(args):
+	from collatz.database import ResultsDatabase
+
+	database = ResultsDatabase(args.database)
+	begin, end = args.range if args.range else (1, None)
+	chunk_size = 1000000
+	if args.memory_budget is not None:
+		# value and metric arrays plus the python rows of sqlite
+		chunk_size = max(args.memory_budget // 128, 1000)
+
+	if args.value is not None:
+		result = database.get(args.value)
+	elif args.period is not None:
+		result = database.values_with_period(args.period, begin, end).tolist()
+	elif args.top_ratios is not None:
+		values, ratios = database.top_stopping_time_ratios(args.top_ratios, begin, end)
+		result = [[int(value), float(ratio)] for value, ratio in zip(values, ratios)]
+	elif args.first_period_above is not None:
+		result = database.first_with_period_above(args.first_period_above)
+	elif args.records is not None:
+		values, metric = database.records(args.records, begin, end, chunk_size)
+		result = [[int(value), int(m)] for value, m in zip(values, metric)]
+	else:
+		result = {"values": database.count()}
+
+	print(json.dumps(result))
+	return 0
+
+
+def _fractal_tile(task):
+	"""Computes the rows [first, last) of the fractal of fractal()."""
+	from collatz import dynamical, functions
+
+	function_name, xrange, ys, first, last, iterations, threshold, diverge_method, julia, tolerance = task
+	yrange = (ys[first], ys[last - 1], last - first)
+	with np.errstate(all = 'ignore'):
+		tile = dynamical.mandelbrot_set(getattr(functions, function_name), xrange, yrange, iterations, threshold,
+										diverge_method, julia, periodicity_tolerance = tolerance)
+	return first, last, tile
+
+
+def fractal(args):
+	xrange = (args.xrange[0], args.xrange[1], int(args.xrange[2]))
+	ys = np.linspace(args.yrange[0], args.yrange[1], int(args.yrange[2])).tolist()
+	rows = len(ys)
+
+	tile_rows = args.tile_rows
+	if args.memory_budget is not None:
+		tile_rows = max(1, min(tile_rows, args.memory_budget // (max(args.workers, 1)*xrange[2]*FRACTAL_BYTES_PER_POINT)))
+	tasks = [(args.function, xrange, ys, first, min(first + tile_rows, rows), args.iterations, args.threshold,
+			args.diverge_method, args.julia, args.periodicity_tolerance) for first in range(0, rows, tile_rows)]
+
+	to_image = not args.output.endswith(".npy")
+	if to_image:
+		result = np.lib.format.open_memmap(args.output + ".npy.tmp", mode = 'w+', dtype = np.int64, shape = (rows, xrange[2]))
+	else:
+		result = np.lib.format.open_memmap(args.output, mode = 'w+', dtype = np.int64, shape = (rows, xrange[2]))
+
+	if args.workers > 1:
+		from collatz.pipeline import worker_pool
+		with worker_pool(args.workers) as pool:
+			for first, last, tile in pool.imap_unordered(_fractal_tile, tasks):
+				result[first:last] = tile
+	else:
+		for first, last, tile in map(_fractal_tile, tasks):
+			result[first:last] = tile
+	result.flush()
+
+	if to_image:
+		import matplotlib
+		matplotlib.use("Agg")
+		import matplotlib.pyplot as plt
+		plt.imsave(args.output, result, cmap = args.cmap, origin = 'lower')
+		del result
+		os.remove(args.output + ".npy.tmp")
+	print("Saved " + args.output + " (" + str(rows) + "x" + str(xrange[2]) + ", " + str(len(tasks)) + " tiles)")
+	return 0
+
+
+def bench(args):
+	from collatz import benchmark
+
+	workers = args.scaling_workers or [1, 2, args.workers]
+	results = benchmark.run_benchmarks(args.names, args.full, sorted(set(workers)), args.repeat)
+	status = 0
+	if args.memory_budget is not None:
+		for key, result in results["results"].items():
+			if result["peak_memory"] is not None and result["peak_memory"] > args.memory_budget:
+				print(key + " exceeded the memory budget")
+				status = 1
+	if args.baseline:
+		comparison = benchmark.compare(results, benchmark.load_baseline(args.baseline), args.tolerance)
+		if any(case["regression"] for case in comparison.values()):
+			status = 1
+	if args.save:
+		benchmark.save_baseline(results, args.save)
+	return status
+
+
+def megabytes(value):
+	return int(float(value)*2**20)
+
+
+def make_parser():
+	common = argparse.ArgumentParser(add_help = False)
+	common.add_argument("--workers", type = int, default = os.cpu_count() or 1, help = "number of worker processes")
+	common.add_argument("--memory-budget", type = megabytes, default = None, metavar = "MB",
+						help = "approximate memory limit in MB")
+
+	parser = argparse.ArgumentParser(prog = "python -m collatz", description = "Collatz conjecture tools")
+	subparsers = parser.add_subparsers(dest = "command", required = True)
+
+	parser_sweep = subparsers.add_parser("sweep", parents = [common], help = "compute orbits and periods into storage")
+	parser_sweep.add_argument("--blocks", type = int, default = 1, help = "number of new blocks")
+	parser_sweep.add_argument("--interval", type = int, default = 10000, help = "values per block")
+	parser_sweep.add_argument("--storage", default = None, help = "directory, .sqlite/.db file or :memory:")
+	parser_sweep.add_argument("--database", default = None, help = "results database to fill with the metrics")
+	parser_sweep.add_argument("--queue-size", type = int, default = 2, help = "blocks waiting to be written")
+	parser_sweep.add_argument("--verify", action = "store_true", help = "verify the checksums of saved blocks")
+	parser_sweep.add_argument("--prometheus", default = None, help = "file for the Prometheus text metrics")
+	parser_sweep.set_defaults(run = sweep)
+
+	parser_query = subparsers.add_parser("query", parents = [common], help = "query a results database")
+	parser_query.add_argument("database", help = "results database")
+	parser_query.add_argument("--range", type = int, nargs = 2, metavar = ("BEGIN", "END"))
+	group = parser_query.add_mutually_exclusive_group()
+	group.add_argument("--value", type = int, help = "metrics of a value")
+	group.add_argument("--period", type = int, help = "values with this period")
+	group.add_argument("--top-ratios", type = int, metavar = "K", help = "K biggest stopping time ratios")
+	group.add_argument("--first-period-above", type = int, metavar = "X", help = "first value with period > X")
+	group.add_argument("--records", choices = ("delay", "path"), help = "delay or path records")
+	parser_query.set_defaults(run = query)
+
+	parser_fractal = subparsers.add_parser("fractal", parents = [common], help = "render mandelbrot_set by tiles")
+	parser_fractal.add_argument("output", help = "image file, or .npy file to keep the iterations as a memmap")
+	parser_fractal.add_argument("--function", default = "collatz_extension", help = "function of collatz.functions")
+	parser_fractal.add_argument("--xrange", type = float, nargs = 3, default = (-4.0, 4.0, 800),
+								metavar = ("LEFT", "RIGHT", "NUM"))
+	parser_fractal.add_argument("--yrange", type = float, nargs = 3, default = (-2.0, 2.0, 400),
+								metavar = ("LOWER", "UPPER", "NUM"))
+	parser_fractal.add_argument("--iterations", type = int, default = 50)
+	parser_fractal.add_argument("--threshold", type = float, default = 10**10)
+	parser_fractal.add_argument("--diverge-method", default = "abs")
+	parser_fractal.add_argument("--julia", action = "store_true")
+	parser_fractal.add_argument("--periodicity-tolerance", type = float, default = None,
+								help = "stop the points whose orbit cycles within this distance")
+	parser_fractal.add_argument("--tile-rows", type = int, default = 64, help = "rows computed by each task")
+	parser_fractal.add_argument("--cmap", default = "magma")
+	parser_fractal.set_defaults(run = fractal)
+
+	parser_bench = subparsers.add_parser("bench", parents = [common], help = "run the benchmark suite")
+	parser_bench.add_argument("names", nargs = "*", help = "workloads to run (all by default)")
+	parser_bench.add_argument("--full", action = "store_true", help = "run the full sizes")
+	parser_bench.add_argument("--repeat", type = int, default = 3)
+	parser_bench.add_argument("--scaling-workers", type = int, nargs = "+", help = "worker counts of the scaling runs")
+	parser_bench.add_argument("--baseline", default = None, help = "baseline json to compare against")
+	parser_bench.add_argument("--save", default = None, help = "save the results as a baseline json")
+	parser_bench.add_argument("--tolerance", type = float, default = 0.1)
+	parser_bench.set_defaults(run = bench)
+	return parser
+
+
+def main(argv = None):
+	args = make_parser().parse_args(argv)
+	return args.run(args)
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,199 @@
+import numpy as np
+
+CONVERGED = 'converged'
+CYCLED = 'cycled'
+DIVERGED = 'diverged'
+EXCEEDED = 'exceeded'
+
+# Status codes used in the status arrays of the batch kernels, STATUSES[code] is the status name.
+STATUSES = (CONVERGED, CYCLED, DIVERGED, EXCEEDED)
+
+DEFAULT_MAX_STEPS = 100000
+DEFAULT_MAX_BITS = 1024
+
+
+class AffineMap:
+	"""
+	Generalized Collatz map: n // 2 if n is even, q*n + r if n is odd (divided by 2 if short).
+	AffineMap(3, 1) is collatz_function and AffineMap(3, 1, short = True) is collatz_function_short.
+	Instances can be used as f anywhere a function is expected, and the batch and jit kernels specialize on q and r.
+	"""
+	def __init__(self, q = 3, r = 1, short = False) -> None:
+		"""init method of AffineMap class
+
+		Args:
+			q (int, optional): odd multiplier of odd values. Defaults to 3.
+			r (int, optional): odd constant added to odd values. Defaults to 1.
+			short (bool, optional): if True, q*n + r is divided by 2 in the same step. Defaults to False.
+		"""
+		if q % 2 == 0 or r % 2 == 0:
+			raise ValueError("q and r must be odd, so q*n + r is even for odd n")
+		self.q = q
+		self.r = r
+		self.short = short
+		pass
+
+
+	def __call__(self, n):
+		if n % 2 == 0:
+			return n // 2
+		elif self.short:
+			return (self.q*n + self.r) // 2
+		else:
+			return self.q*n + self.r
+
+
+	def __repr__(self):
+		return "AffineMap(q=" + str(self.q) + ", r=" + str(self.r) + ", short=" + str(self.short) + ")"
+
+
+	def __eq__(self, other):
+		return isinstance(other, AffineMap) and (self.q, self.r, self.short) == (other.q, other.r, other.short)
+
+
+	def __hash__(self):
+		return hash((self.q, self.r, self.short))
+
+
+	def is_collatz(self):
+		"""Checks if the map is the 3n + 1 map, for which every orbit is assumed to reach 1.
+
+		Returns:
+			bool: True if q = 3 and r = 1.
+		"""
+		return self.q == 3 and self.r == 1
+
+
+	def int64_limit(self):
+		"""Largest odd value whose image fits in a signed 64 bit integer.
+
+		Returns:
+			int: max value that can be iterated by the int64 kernels.
+		"""
+		return (int(np.iinfo(np.int64).max) - abs(self.r)) // self.q
+
+
+	def metrics(self, n, max_steps = DEFAULT_MAX_STEPS, max_bits = DEFAULT_MAX_BITS):
+		"""Iterates n until it reaches 1, falls in a cycle (Brent's method: the orbit is compared against the value
+		saved at the last power of two step), grows beyond max_bits or max_steps are done.
+
+		Args:
+			n (positive integer): value to iterate.
+			max_steps (int, optional): max number of iterations. Defaults to DEFAULT_MAX_STEPS.
+			max_bits (int, optional): max bit length of the orbit values. Defaults to DEFAULT_MAX_BITS.
+
+		Returns:
+			tuple: (status, period, stopping time, max value, odd steps). period is -1 if the orbit did not reach 1
+			and stopping time is 0 if the orbit never dropped to n or below.
+		"""
+		if n == 1:
+			# 1 is the end of every converging orbit, its period is 0
+			n0 = self(n)
+			stopping = 1
+			while n0 > n and stopping < max_steps:
+				n0 = self(n0)
+				stopping += 1
+			return CONVERGED, 0, stopping if n0 <= n else 0, n, 0
+
+		steps = 0
+		stopping = 0
+		max_value = n
+		odd_steps = 0
+		reference = n
+		power = 1
+
+		n0 = n
+		while steps < max_steps:
+			odd_steps += n0 % 2
+			n0 = self(n0)
+			steps += 1
+
+			if n0 > max_value:
+				max_value = n0
+			if stopping == 0 and n0 <= n:
+				stopping = steps
+
+			if n0 == 1:
+				return CONVERGED, steps, stopping, max_value, odd_steps
+			if n0 == reference:
+				return CYCLED, -1, stopping, max_value, odd_steps
+			if n0.bit_length() > max_bits:
+				return DIVERGED, -1, stopping, max_value, odd_steps
+			if steps == power:
+				reference = n0
+				power *= 2
+
+		return EXCEEDED, -1, stopping, max_value, odd_steps
+
+
+	def orbit(self, n, max_steps = DEFAULT_MAX_STEPS, max_bits = DEFAULT_MAX_BITS):
+		"""Orbit of n until it reaches 1, closes a cycle, grows beyond max_bits or max_steps are done.
+
+		Args:
+			n (positive integer): value to iterate.
+			max_steps (int, optional): max number of iterations. Defaults to DEFAULT_MAX_STEPS.
+			max_bits (int, optional): max bit length of the orbit values. Defaults to DEFAULT_MAX_BITS.
+
+		Returns:
+			tuple: status and list with the orbit of n. If the status is CYCLED the orbit ends at the first
+			repeated value.
+		"""
+		orbit_list = [n]
+		seen = {n}
+		n0 = n
+		while len(orbit_list) <= max_steps:
+			n0 = self(n0)
+			orbit_list.append(n0)
+
+			if n0 == 1:
+				return CONVERGED, orbit_list
+			if n0 in seen:
+				return CYCLED, orbit_list
+			if n0.bit_length() > max_bits:
+				return DIVERGED, orbit_list
+			seen.add(n0)
+
+		return EXCEEDED, orbit_list
+
+
+	def cycle(self, n, max_steps = DEFAULT_MAX_STEPS, max_bits = DEFAULT_MAX_BITS):
+		"""Cycle reached by the orbit of n, starting at its smallest element.
+
+		Args:
+			n (positive integer): value to iterate.
+			max_steps (int, optional): max number of iterations. Defaults to DEFAULT_MAX_STEPS.
+			max_bits (int, optional): max bit length of the orbit values. Defaults to DEFAULT_MAX_BITS.
+
+		Returns:
+			list: values of the cycle (1, 4, 2 for the 3n + 1 map if the orbit converges), None if the orbit
+			diverged or max_steps were done.
+		"""
+		status, orbit_list = self.orbit(n, max_steps, max_bits)
+		if status == CONVERGED:
+			orbit_list = self.orbit(1, max_steps, max_bits)[1]
+		elif status != CYCLED:
+			return None
+
+		first = orbit_list.index(orbit_list[-1])
+		cycle_list = orbit_list[first:-1]
+		i = cycle_list.index(min(cycle_list))
+		return cycle_list[i:] + cycle_list[:i]
+
+
+	def metrics_array(self, values, metrics = ('period', 'status'), max_steps = DEFAULT_MAX_STEPS,
+					max_bits = DEFAULT_MAX_BITS, backend = 'numpy'):
+		"""Computes orbit metrics of many values at once with the batch kernels, see batch.orbit_metrics_array.
+
+		Args:
+			values (array-like): positive integers to iterate.
+			metrics (iterable, optional): names of the metrics to compute. Defaults to ('period', 'status').
+			max_steps (int, optional): max number of iterations. Defaults to DEFAULT_MAX_STEPS.
+			max_bits (int, optional): max bit length of the values iterated with python integers. Defaults to DEFAULT_MAX_BITS.
+			backend (str, optional): 'numpy' or 'numba'. Defaults to 'numpy'.
+
+		Returns:
+			dict: dictionary with metric names as keys and arrays as values.
+		"""
+		from collatz import batch
+		return batch.orbit_metrics_array(values, self.short, metrics, backend, q = self.q, r = self.r,
+										max_steps = max_steps, max_bits = max_bits)
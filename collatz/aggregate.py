@@ -0,0 +1,217 @@
+import numpy as np
+
+from collatz import batch, affine
+
+
+class PeriodStatistics:
+	"""
+	Streaming distribution of the periods of a set of values. It is filled chunk by chunk with the
+	output of the batch kernels, so no dictionary with every value is ever built. Two instances computed
+	over disjoint ranges (e.g. in different processes) can be combined with merge.
+	"""
+	def __init__(self, ratio_max = 64.0, ratio_bins = 4096) -> None:
+		"""init method of PeriodStatistics class
+
+		Args:
+			ratio_max (float, optional): upper limit of the stopping time ratio sketch, bigger ratios
+										are counted in the last bin. Defaults to 64.0.
+			ratio_bins (int, optional): number of bins of the stopping time ratio sketch. Defaults to 4096.
+		"""
+		self.count = 0
+		self.status_counts = np.zeros(len(affine.STATUSES), dtype = np.int64)
+		self.histogram = np.zeros(0, dtype = np.int64)
+		self.min_values = np.zeros(0, dtype = np.int64)
+		self.max_values = np.zeros(0, dtype = np.int64)
+		self.delay_records = []
+		self.path_records = []
+		self.ratio_max = ratio_max
+		self.ratio_histogram = np.zeros(ratio_bins, dtype = np.int64)
+		pass
+
+
+	def _grow(self, size):
+		"""Grows the per period arrays so that periods up to size - 1 fit."""
+		if size <= self.histogram.size:
+			return
+		extra = size - self.histogram.size
+		self.histogram = np.concatenate([self.histogram, np.zeros(extra, dtype = np.int64)])
+		self.min_values = np.concatenate([self.min_values, np.full(extra, np.iinfo(np.int64).max, dtype = np.int64)])
+		self.max_values = np.concatenate([self.max_values, np.zeros(extra, dtype = np.int64)])
+
+
+	def update(self, values, periods, max_values = None, statuses = None):
+		"""Adds a chunk of values to the statistics. Values whose orbit did not converge (period -1) are only
+		counted in status_counts.
+
+		Args:
+			values (array): int64 array with the values, in increasing order.
+			periods (array): int64 array with the period of each value.
+			max_values (array, optional): int64 array with the max value of each orbit, needed for the
+										path records. Defaults to None.
+			statuses (array, optional): status codes (see affine.STATUSES) of each value. Defaults to None
+										(converged if period >= 0, exceeded otherwise).
+		"""
+		values = np.asarray(values, dtype = np.int64)
+		periods = np.asarray(periods, dtype = np.int64)
+		if values.size == 0:
+			return
+
+		self.count += values.size
+		if statuses is None:
+			statuses = np.where(periods >= 0, 0, affine.STATUSES.index(affine.EXCEEDED))
+		self.status_counts += np.bincount(np.asarray(statuses, dtype = np.int64), minlength = self.status_counts.size)
+
+		converged = periods >= 0
+		if not converged.all():
+			values = values[converged]
+			periods = periods[converged]
+			if max_values is not None:
+				max_values = np.asarray(max_values)[converged]
+			if values.size == 0:
+				return
+
+		# Histogram of periods
+		self._grow(int(periods.max()) + 1)
+		counts = np.bincount(periods)
+		self.histogram[:counts.size] += counts
+
+		# Min and max representatives of each period
+		order = np.lexsort((values, periods))
+		sorted_periods = periods[order]
+		sorted_values = values[order]
+		first = np.flatnonzero(np.r_[True, sorted_periods[1:] != sorted_periods[:-1]])
+		last = np.r_[first[1:] - 1, sorted_periods.size - 1]
+		keys = sorted_periods[first]
+		self.min_values[keys] = np.minimum(self.min_values[keys], sorted_values[first])
+		self.max_values[keys] = np.maximum(self.max_values[keys], sorted_values[last])
+
+		# Running max records
+		self.delay_records = merge_records(self.delay_records, chunk_records(values, periods))
+		if max_values is not None:
+			max_values = np.asarray(max_values, dtype = np.int64)
+			self.path_records = merge_records(self.path_records, chunk_records(values, max_values))
+
+		# Stopping time ratio sketch, log(1) = 0 so 1 is left out.
+		big = values > 1
+		ratios = periods[big] / np.log(values[big])
+		bins = self.ratio_histogram.size
+		index = np.minimum((ratios * (bins / self.ratio_max)).astype(np.int64), bins - 1)
+		self.ratio_histogram += np.bincount(index, minlength = bins)
+
+
+	def merge(self, other):
+		"""Adds the statistics of other (computed over a disjoint set of values) to self.
+
+		Args:
+			other (PeriodStatistics): statistics to merge, must have the same ratio sketch parameters.
+
+		Returns:
+			PeriodStatistics: self
+		"""
+		if other.ratio_max != self.ratio_max or other.ratio_histogram.size != self.ratio_histogram.size:
+			raise ValueError("stopping time ratio sketches have different parameters")
+
+		self.count += other.count
+		self.status_counts += other.status_counts
+		self._grow(other.histogram.size)
+		size = other.histogram.size
+		self.histogram[:size] += other.histogram
+		self.min_values[:size] = np.minimum(self.min_values[:size], other.min_values)
+		self.max_values[:size] = np.maximum(self.max_values[:size], other.max_values)
+		self.delay_records = merge_records(self.delay_records, other.delay_records)
+		self.path_records = merge_records(self.path_records, other.path_records)
+		self.ratio_histogram += other.ratio_histogram
+		return self
+
+
+	def periods(self):
+		"""Periods with at least one value.
+
+		Returns:
+			array: int64 array with the periods that appear in the statistics.
+		"""
+		return np.flatnonzero(self.histogram)
+
+
+	def representatives(self):
+		"""Smallest and biggest value with each period.
+
+		Returns:
+			dict: dictionary with periods as keys and tuples (min value, max value) as values.
+		"""
+		return {int(p) : (int(self.min_values[p]), int(self.max_values[p])) for p in self.periods()}
+
+
+	def ratio_quantile(self, q):
+		"""Approximated quantile of the stopping time ratio, the error is at most one bin width
+		(ratio_max / ratio_bins).
+
+		Args:
+			q (float or array): quantile(s) between 0 and 1.
+
+		Returns:
+			float or array: stopping time ratio of the quantile.
+		"""
+		total = self.ratio_histogram.sum()
+		if total == 0:
+			return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+		cumulative = np.cumsum(self.ratio_histogram)
+		edges = np.linspace(0, self.ratio_max, self.ratio_histogram.size + 1)
+		return np.interp(np.asarray(q) * total, np.r_[0, cumulative], edges)
+
+
+def chunk_records(values, metric):
+	"""Records of a chunk: the values whose metric is bigger than all the previous metrics of the chunk.
+
+	Args:
+		values (array): sorted values of the chunk.
+		metric (array): metric (e.g. period or max value) of each value.
+
+	Returns:
+		list: list of (value, metric) tuples, merge the lists of several chunks with merge_records.
+	"""
+	running = np.maximum.accumulate(metric)
+	is_record = np.r_[True, metric[1:] > running[:-1]]
+	return [(int(v), int(m)) for v, m in zip(values[is_record], metric[is_record])]
+
+
+def merge_records(records, other):
+	"""Merges two record lists (see chunk_records) from disjoint ranges, keeping only the global records.
+
+	Returns:
+		list: list of (value, metric) tuples sorted by value.
+	"""
+	merged = []
+	for value, metric in sorted(records + other):
+		if not merged or metric > merged[-1][1]:
+			merged.append((value, metric))
+	return merged
+
+
+def period_statistics(begin, end, chunk_size = 1000000, short = False, statistics = None, f = None, 
+						max_steps = None, backend = 'numpy'):
+	"""Computes the period statistics of all the values in [begin, end] chunk by chunk.
+
+	Args:
+		begin (integer): first value of the range.
+		end (integer): last value of the range (inclusive).
+		chunk_size (int, optional): number of values iterated together. Defaults to 1000000.
+		short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+		statistics (PeriodStatistics, optional): statistics to update, a new one is created if None. Defaults to None.
+		f (function, optional): map with a batch kernel (e.g. an AffineMap), overrides short. Defaults to None.
+		max_steps (int, optional): max number of iterations of each value. Defaults to None.
+		backend (str, optional): 'numpy' or 'numba'. Defaults to 'numpy'.
+
+	Returns:
+		PeriodStatistics: statistics of the range.
+	"""
+	if statistics is None:
+		statistics = PeriodStatistics()
+	if f is None:
+		f = affine.AffineMap(3, 1, short)
+
+	for values in batch.range_chunks(begin, end, chunk_size):
+		metrics = batch.function_metrics_array(f, values, ('period', 'max_value', 'status'), backend, max_steps)
+		statistics.update(values, metrics['period'], metrics['max_value'], metrics['status'])
+
+	return statistics
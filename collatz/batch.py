@@ -0,0 +1,246 @@
+import numpy as np
+
+from collatz import functions, affine
+
+# Largest odd value whose image 3n + 1 still fits in a signed 64 bit integer.
+INT64_SAFE_LIMIT = (np.iinfo(np.int64).max - 1) // 3
+
+METRICS = ('period', 'stopping_time', 'max_value', 'odd_steps')
+
+BACKENDS = ('numpy', 'numba')
+
+
+def map_parameters(f):
+	"""Parameters (q, r, short) of the qn + r map f, if f is collatz_function, collatz_function_short or an AffineMap.
+
+	Args:
+		f (function): function to check.
+
+	Returns:
+		tuple: (q, r, short), None if f has no batch kernel.
+	"""
+	if f is functions.collatz_function:
+		return 3, 1, False
+	elif f is functions.collatz_function_short:
+		return 3, 1, True
+	elif isinstance(f, affine.AffineMap):
+		return f.q, f.r, f.short
+	return None
+
+
+def is_batch_function(f):
+	"""Checks if f is one of the built-in Collatz maps or an AffineMap, which have batch kernels.
+
+	Args:
+		f (function): function to check.
+
+	Returns:
+		bool: True if f is collatz_function, collatz_function_short or an AffineMap.
+	"""
+	return map_parameters(f) is not None
+
+
+def range_chunks(begin, end, chunk_size = 1000000):
+	"""Generator of int64 arrays that cover [begin, end] in consecutive chunks.
+
+	Args:
+		begin (integer): first value of the range.
+		end (integer): last value of the range (inclusive).
+		chunk_size (int, optional): max number of values in each chunk. Defaults to 1000000.
+
+	Yields:
+		array: numpy array with the values of the chunk.
+	"""
+	for chunk_begin in range(begin, end + 1, chunk_size):
+		chunk_end = min(chunk_begin + chunk_size - 1, end)
+		yield np.arange(chunk_begin, chunk_end + 1, dtype = np.int64)
+
+
+def _scalar_fallback(n, q, r, short, max_steps, max_bits):
+	"""Computes status code, period, stopping time, max value and odd steps of n with python integers.
+	Used for the values that the int64 kernels can not handle.
+	"""
+	status, period, stopping, max_value, odd_steps = affine.AffineMap(q, r, short).metrics(n, 
+		float('inf') if max_steps is None else max_steps, float('inf') if max_bits is None else max_bits)
+	return affine.STATUSES.index(status), period, stopping, min(max_value, np.iinfo(np.int64).max), odd_steps
+
+
+def orbit_metrics_array(values, short = False, metrics = METRICS, backend = 'numpy', q = 3, r = 1, 
+						max_steps = None, max_bits = affine.DEFAULT_MAX_BITS):
+	"""Computes orbit metrics of many values at once under the map n // 2 if n is even, q*n + r if n is odd
+	(divided by 2 if short). All the values are iterated together as an int64 array and each value leaves the 
+	active set when its orbit reaches 1, closes a cycle or max_steps are done. Values whose orbit does not fit
+	in int64 are computed with python integers up to max_bits.
+
+	Args:
+		values (array-like): positive integers to iterate.
+		short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+		metrics (iterable, optional): names of the metrics to compute, any of 'period', 'stopping_time',
+									'max_value', 'odd_steps' and 'status'. Defaults to METRICS.
+		backend (str, optional): 'numpy' to iterate the values as arrays, 'numba' to use the compiled kernels
+								of collatz.jit. Defaults to 'numpy'.
+		q (int, optional): multiplier of odd values. Defaults to 3.
+		r (int, optional): constant added to odd values. Defaults to 1.
+		max_steps (int, optional): max number of iterations of each value. Defaults to None, which means no limit 
+								for the 3n + 1 map and affine.DEFAULT_MAX_STEPS for other maps.
+		max_bits (int, optional): max bit length of the values iterated with python integers. 
+								Defaults to affine.DEFAULT_MAX_BITS.
+
+	Returns:
+		dict: dictionary with metric names as keys and int64 arrays (same shape as values) as values.
+		'status' has the codes of affine.STATUSES, period is -1 for values that did not reach 1
+		and max_value saturates at the int64 max for values whose orbit overflows.
+	"""
+	if max_steps is None and (q, r) != (3, 1):
+		max_steps = affine.DEFAULT_MAX_STEPS
+
+	if backend == 'numba':
+		from collatz import jit
+		return jit.orbit_metrics_array(values, short, metrics, q, r, max_steps, max_bits)
+	elif backend != 'numpy':
+		raise ValueError("backend must be one of " + str(BACKENDS))
+
+	metrics = tuple(metrics)
+	n = np.array(values, dtype = np.int64).ravel()
+	if n.size and n.min() < 1:
+		raise ValueError("values must be positive integers")
+
+	want_stopping = 'stopping_time' in metrics
+	want_max = 'max_value' in metrics
+	want_odd = 'odd_steps' in metrics
+	# No cycles other than 1, 4, 2 are known for 3n + 1, so they are not looked for.
+	detect_cycles = (q, r) != (3, 1)
+	limit = (int(np.iinfo(np.int64).max) - abs(r)) // q
+
+	period = np.full(n.shape, -1, dtype = np.int64)
+	stopping = np.zeros(n.shape, dtype = np.int64)
+	max_value = n.copy()
+	odd_steps = np.zeros(n.shape, dtype = np.int64)
+	status = np.zeros(n.shape, dtype = np.int8)
+
+	# 1 is already on its cycle, its stopping time is computed with the scalar loop.
+	overflow = [int(i) for i in np.flatnonzero(n == 1)]
+
+	# State of the active lanes only, lanes are removed when they reach 1.
+	index = np.flatnonzero(n != 1)
+	start = n[index]
+	x = start.copy()
+	peak = start.copy()
+	odd_count = np.zeros(index.shape, dtype = np.int64)
+	stop = np.zeros(index.shape, dtype = np.int64)
+	reference = start.copy()
+
+	step = 0
+	while index.size:
+		if max_steps is not None and step >= max_steps:
+			status[index] = affine.STATUSES.index(affine.EXCEEDED)
+			stopping[index] = stop
+			max_value[index] = peak
+			odd_steps[index] = odd_count
+			break
+
+		odd = x & 1
+
+		too_big = (odd == 1) & (x > limit)
+		if too_big.any():
+			overflow.extend(int(i) for i in index[too_big])
+			keep = ~too_big
+			index, start, x, peak, odd_count, stop, reference, odd = (index[keep], start[keep], x[keep], peak[keep], 
+																	odd_count[keep], stop[keep], reference[keep], odd[keep])
+
+		step += 1
+		if short:
+			x = np.where(odd == 1, (q*x + r) >> 1, x >> 1)
+		else:
+			x = np.where(odd == 1, q*x + r, x >> 1)
+
+		if want_odd:
+			odd_count += odd
+		if want_max:
+			np.maximum(peak, x, out = peak)
+		if want_stopping:
+			stop[(stop == 0) & (x <= start)] = step
+
+		done = x == 1
+		if detect_cycles:
+			cycled = (x == reference) & ~done
+			done = done | cycled
+			# Brent's method, every lane saves its value at the power of two steps
+			if step & (step - 1) == 0:
+				reference = x.copy()
+
+		if done.any():
+			finished = index[done]
+			stopping[finished] = stop[done]
+			max_value[finished] = peak[done]
+			odd_steps[finished] = odd_count[done]
+			if detect_cycles:
+				period[finished] = np.where(cycled[done], -1, step)
+				status[finished] = np.where(cycled[done], affine.STATUSES.index(affine.CYCLED), 0)
+			else:
+				period[finished] = step
+
+			keep = ~done
+			index, start, x, peak, odd_count, stop, reference = (index[keep], start[keep], x[keep], peak[keep], 
+																odd_count[keep], stop[keep], reference[keep])
+
+	for i in overflow:
+		status[i], period[i], stopping[i], max_value[i], odd_steps[i] = _scalar_fallback(int(n[i]), q, r, short, 
+																				max_steps, max_bits)
+
+	shape = np.shape(values)
+	result = {'period': period, 'stopping_time': stopping, 'max_value': max_value, 'odd_steps': odd_steps, 
+			'status': status}
+	return {name : result[name].reshape(shape) for name in metrics}
+
+
+def function_metrics_array(f, values, metrics = METRICS, backend = 'numpy', max_steps = None, 
+							max_bits = affine.DEFAULT_MAX_BITS):
+	"""Computes orbit metrics of many values under f with the batch kernel specialized on the parameters of f,
+	see orbit_metrics_array.
+
+	Args:
+		f (function): collatz_function, collatz_function_short or an AffineMap.
+		values (array-like): positive integers to iterate.
+		metrics (iterable, optional): names of the metrics to compute. Defaults to METRICS.
+		backend (str, optional): 'numpy' or 'numba'. Defaults to 'numpy'.
+		max_steps (int, optional): max number of iterations of each value. Defaults to None.
+		max_bits (int, optional): max bit length of the values iterated with python integers. 
+								Defaults to affine.DEFAULT_MAX_BITS.
+
+	Returns:
+		dict: dictionary with metric names as keys and int64 arrays as values.
+	"""
+	parameters = map_parameters(f)
+	if parameters is None:
+		raise ValueError(str(f) + " has no batch kernel")
+	q, r, short = parameters
+	return orbit_metrics_array(values, short, metrics, backend, q, r, max_steps, max_bits)
+
+
+def period_array(values, short = False, backend = 'numpy'):
+	"""Computes the periods of many values at once, see orbit_metrics_array.
+
+	Args:
+		values (array-like): positive integers to iterate.
+		short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+		backend (str, optional): 'numpy' or 'numba'. Defaults to 'numpy'.
+
+	Returns:
+		array: int64 array with the period of each value.
+	"""
+	return orbit_metrics_array(values, short, metrics = ('period',), backend = backend)['period']
+
+
+def stopping_time_array(values, short = False, backend = 'numpy'):
+	"""Computes the stopping times of many values at once, see orbit_metrics_array.
+
+	Args:
+		values (array-like): positive integers to iterate.
+		short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+		backend (str, optional): 'numpy' or 'numba'. Defaults to 'numpy'.
+
+	Returns:
+		array: int64 array with the stopping time of each value.
+	"""
+	return orbit_metrics_array(values, short, metrics = ('stopping_time',), backend = backend)['stopping_time']
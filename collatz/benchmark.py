@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+BENCHMARK_VERSION = 1
+
+
+def _collatz_problem_periods(size, workers):
+	from collatz.collatz import CollatzProblem
+	CollatzProblem(list(range(2, size + 2)), start = None, backend = 'numpy').period()
+	return size
+
+
+def _stopping_time_sweep(size, workers):
+	from collatz.collatz import stopping_time
+	from collatz.functions import collatz_function
+	for n in range(2, size + 2):
+		stopping_time(n, collatz_function)
+	return size
+
+
+def _period_statistics(size, workers):
+	from collatz import aggregate, batch
+	chunk_size = max(size // max(workers, 1), 1)
+	if workers <= 1:
+		aggregate.period_statistics(1, size, chunk_size)
+		return size
+
+	ranges = [(int(values[0]), int(values[-1]), chunk_size) for values in batch.range_chunks(1, size, chunk_size)]
+	from collatz.pipeline import worker_pool
+	with worker_pool(workers) as pool:
+		statistics = pool.starmap(aggregate.period_statistics, ranges)
+	for other in statistics[1:]:
+		statistics[0].merge(other)
+	return size
+
+
+def _mandelbrot_set(size, workers):
+	from collatz import dynamical, functions
+	with np.errstate(over = 'ignore', invalid = 'ignore'):
+		dynamical.mandelbrot_set(functions.collatz_extension, (-4, 4, size), (-2, 2, size), 50, 10**10)
+	return size*size
+
+
+def _attraction_basins(size, workers):
+	from collatz import dynamical, functions
+	dynamical.attraction_basins(functions.collatz_extension, np.linspace(-3, 5, size), [0.0, (1.0, 4.0, 2.0)], 200)
+	return size
+
+
+def _lyapunov_exponent(size, workers):
+	from collatz import dynamical, functions
+	dynamical.lyapunov_exponent(functions.collatz_extension, functions.collatz_extension_prime, np.linspace(-3, 5, size), 100)
+	return size
+
+
+def _fixed_points(method):
+	def run(size, workers):
+		from collatz import dynamical, functions
+		values = list(np.linspace(-10, 10, size))
+		dds = dynamical.DDS(values, functions.collatz_extension, 10, 100, functions.collatz_extension_prime, None)
+		dds.search_fixed_points(method, bisect_values = [(-5 - i, -4 - i) for i in range(size)])
+		return size
+	return run
+
+
+def _periodic_orbit(size, workers):
+	from collatz import dynamical
+	# x -> x^2 mod m starting at 3 reaches a long cycle after size iterations or less
+	dynamical.periodic_orbit(3, lambda x: x*x % 1000003, size)
+	return size
+
+
+def _json_save_load(size, workers):
+	from collatz import collatz, functions, utils
+	dictionary = {n : {"period": p, "orbit": o} for n in range(1, size + 1)
+				for p, o in [collatz.orbit_and_period(n, functions.collatz_function)]}
+	with tempfile.TemporaryDirectory() as path:
+		utils.save_dict_json(dictionary, path, "block.json")
+		utils.load_dict_json(path, "block.json")
+	return size
+
+
+# name: (function, sizes of the quick run, sizes of the full run, scale with workers)
+WORKLOADS = {
+	"collatz_problem_periods": (_collatz_problem_periods, [10**5], [10**5, 10**6, 10**7], False),
+	"stopping_time_sweep": (_stopping_time_sweep, [10**4], [10**5, 10**6], False),
+	"period_statistics": (_period_statistics, [10**5], [10**6, 10**7], True),
+	"mandelbrot_set": (_mandelbrot_set, [100], [100, 500, 1000], False),
+	"attraction_basins": (_attraction_basins, [10**5], [10**6, 10**7], False),
+	"lyapunov_exponent": (_lyapunov_exponent, [10**5], [10**6, 10**7], False),
+	"search_fixed_points_iteration": (_fixed_points(None), [50], [500], False),
+	"search_fixed_points_newton": (_fixed_points('newton'), [50], [500], False),
+	"search_fixed_points_secant": (_fixed_points('secant'), [50], [500], False),
+	"search_fixed_points_bisect": (_fixed_points('bisect'), [10], [100], False),
+	"periodic_orbit": (_periodic_orbit, [10**3], [10**4, 3*10**4], False),
+	"json_save_load": (_json_save_load, [10**3], [10**4], False),
+}
+
+
+def measure(function, size, workers = 1, repeat = 3):
+	"""Runs function(size, workers) repeat times.
+
+	Returns:
+		dict: dictionary with the best "seconds", "throughput" (items per second) and "peak_memory" (bytes traced by
+		tracemalloc in this process during one run). tracemalloc does not see the memory of worker processes, so
+		peak_memory is None if workers > 1.
+	"""
+	best = float('inf')
+	for _ in range(repeat):
+		start = time.perf_counter()
+		items = function(size, workers)
+		best = min(best, time.perf_counter() - start)
+
+	if workers > 1:
+		return {"seconds": best, "throughput": items / best if best else 0.0, "peak_memory": None}
+	tracemalloc.start()
+	function(size, workers)
+	peak_memory = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return {"seconds": best, "throughput": items / best if best else 0.0, "peak_memory": peak_memory}
+
+
+def run_benchmarks(names = None, full = False, workers = (1, 2, 4), repeat = 3):
+	"""Runs the workloads of WORKLOADS. Workloads that scale with workers run once for each worker count.
+
+	Args:
+		names (list, optional): names of the workloads to run. Defaults to None (all).
+		full (bool, optional): if True runs the full sizes, the quick sizes otherwise. Defaults to False.
+		workers (tuple, optional): worker counts of the scaling runs. Defaults to (1, 2, 4).
+		repeat (int, optional): number of runs of each case, the best time is kept. Defaults to 3.
+
+	Returns:
+		dict: results with the machine info and "results" with "<name>[size=<size>,workers=<workers>]" keys.
+	"""
+	results = {}
+	for name in names or WORKLOADS:
+		function, quick_sizes, full_sizes, scales = WORKLOADS[name]
+		for size in full_sizes if full else quick_sizes:
+			for worker_count in workers if scales else (1,):
+				key = name + "[size=" + str(size) + ",workers=" + str(worker_count) + "]"
+				results[key] = measure(function, size, worker_count, repeat)
+				peak_memory = results[key]["peak_memory"]
+				print(key + ": " + "{:.4f}".format(results[key]["seconds"]) + " s, "
+					+ "{:.0f}".format(results[key]["throughput"]) + " items/s, "
+					+ ("memory not measured" if peak_memory is None else "{:.1f}".format(peak_memory / 2**20) + " MiB"))
+
+	return {"format_version": BENCHMARK_VERSION, "python": sys.version.split()[0], "numpy": np.__version__,
+			"machine": platform.machine(), "processor": platform.processor(), "cpu_count": os.cpu_count(),
+			"results": results}
+
+
+def save_baseline(results, path):
+	"""Saves the results of run_benchmarks as a json baseline."""
+	with open(path, 'w') as f:
+		json.dump(results, f, indent = 1)
+
+
+def load_baseline(path):
+	with open(path, 'r') as f:
+		baseline = json.load(f)
+	if baseline.get("format_version") != BENCHMARK_VERSION:
+		raise ValueError("Unsupported benchmark baseline version " + str(baseline.get("format_version")))
+	return baseline
+
+
+def compare(results, baseline, tolerance = 0.1):
+	"""Compares results against a baseline. A case is a regression if its time grew more than tolerance.
+
+	Args:
+		results (dict): output of run_benchmarks.
+		baseline (dict): output of run_benchmarks or load_baseline.
+		tolerance (float, optional): relative slowdown allowed. Defaults to 0.1.
+
+	Returns:
+		dict: dictionary with the common cases as keys and dicts with the time "ratio" (new / baseline),
+		"memory_ratio" (None if the memory of the case is not measured) and "regression" (bool) as values.
+	"""
+	comparison = {}
+	for key, new in results["results"].items():
+		old = baseline["results"].get(key)
+		if old is None:
+			continue
+		ratio = new["seconds"] / old["seconds"] if old["seconds"] else float('inf')
+		if new["peak_memory"] is None or old["peak_memory"] is None:
+			memory_ratio = None
+		else:
+			memory_ratio = new["peak_memory"] / old["peak_memory"] if old["peak_memory"] else float('inf')
+		comparison[key] = {"ratio": ratio, "memory_ratio": memory_ratio, "regression": ratio > 1 + tolerance}
+		print(key + ": " + "{:.2f}".format(ratio) + "x time"
+			+ ("" if memory_ratio is None else ", " + "{:.2f}".format(memory_ratio) + "x memory")
+			+ (" REGRESSION" if comparison[key]["regression"] else ""))
+	return comparison
@@ -0,0 +1,129 @@
+try:
+	import gmpy2
+	HAS_GMPY2 = True
+except ImportError:
+	gmpy2 = None
+	HAS_GMPY2 = False
+
+# period and orbit_and_period switch to this module for values with more bits than this.
+BIG_INT_BITS = 256
+
+# Number of steps of collatz_function_short applied at once by period_big.
+JUMP_BITS = 12
+
+_jump_table = None
+
+
+def to_big(n):
+	"""Converts n to the integer type used by the engine, gmpy2.mpz if gmpy2 is installed, int otherwise.
+
+	Args:
+		n (integer): value to convert.
+
+	Returns:
+		mpz or int: n as big integer.
+	"""
+	return gmpy2.mpz(n) if HAS_GMPY2 else int(n)
+
+
+def trailing_zeros(n):
+	"""Number of trailing zero bits of n, i.e. the max k such that 2^k divides n. n must not be 0.
+
+	Args:
+		n (mpz or int): value to check.
+
+	Returns:
+		int: number of trailing zeros of n.
+	"""
+	if HAS_GMPY2:
+		return gmpy2.bit_scan1(n)
+	return (n & -n).bit_length() - 1
+
+
+def _get_jump_table():
+	"""Table with the JUMP_BITS steps of collatz_function_short for every residue b mod 2^JUMP_BITS.
+	If n = a*2^k + b, after k steps n is 3^c(b)*a + d(b), where c(b) is the number of odd steps.
+	"""
+	global _jump_table
+	if _jump_table is None:
+		size = 1 << JUMP_BITS
+		table = []
+		for b in range(size):
+			c = 0
+			d = b
+			for _ in range(JUMP_BITS):
+				if d % 2 == 0:
+					d = d // 2
+				else:
+					d = (3*d + 1) // 2
+					c += 1
+			table.append((to_big(3**c), to_big(d), c))
+		_jump_table = table
+	return _jump_table
+
+
+def period_big(n, short = False):
+	"""Period of n under collatz_function (or collatz_function_short if short) for huge values. While n is big
+	JUMP_BITS steps are applied with one multiplication, then trailing zeros are removed all at once.
+
+	Args:
+		n (positive integer): value to calculate the period.
+		short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+
+	Returns:
+		integer: number of iterations until n reaches 1.
+	"""
+	table = _get_jump_table()
+	mask = (1 << JUMP_BITS) - 1
+	# Below this bound the jump could go through 1.
+	jump_bound = 1 << (JUMP_BITS + 1)
+
+	n = to_big(n)
+	steps = 0
+	while n >= jump_bound:
+		multiplier, d, c = table[int(n & mask)]
+		n = multiplier * (n >> JUMP_BITS) + d
+		# every odd step of the short map is two steps of collatz_function
+		steps += JUMP_BITS if short else JUMP_BITS + c
+
+	while True:
+		zeros = trailing_zeros(n)
+		n >>= zeros
+		steps += zeros
+		if n == 1:
+			return int(steps)
+
+		if short:
+			n = (3*n + 1) >> 1
+		else:
+			n = 3*n + 1
+		steps += 1
+
+
+def orbit_and_period_big(n, short = False):
+	"""Orbit and period of n under collatz_function (or collatz_function_short if short) for huge values.
+	Trailing zeros are found at once and the halvings are added to the orbit as shifts.
+
+	Args:
+		n (positive integer): value to calculate the orbit.
+		short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+
+	Returns:
+		tuple: integer with the period of orbit and list with the orbit of n
+	"""
+	orbit_list = [int(n)]
+	n = to_big(n)
+
+	while True:
+		zeros = trailing_zeros(n)
+		for i in range(1, zeros + 1):
+			orbit_list.append(int(n >> i))
+		n >>= zeros
+		if n == 1:
+			return len(orbit_list) - 1, orbit_list
+
+		if short:
+			n = (3*n + 1) >> 1
+		else:
+			n = 3*n + 1
+		orbit_list.append(int(n))
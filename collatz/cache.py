@@ -0,0 +1,222 @@
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from collatz import batch
+
+CACHE_VERSION = 1
+
+# Metrics kept for every value, in the order of the arrays of the shared memory segment.
+CACHE_METRICS = ('period', 'stopping_time', 'status')
+
+# version, size, block_size, q, r, short
+_HEADER_ITEMS = 6
+
+
+class ComputationCache:
+	"""
+	Dense cache of the periods, stopping times and statuses of the values 1..size under a qn + r map, kept in a
+	multiprocessing.shared_memory segment. The values are computed with the batch kernels by aligned blocks of
+	block_size values the first time they are requested, so CollatzProblem instances over overlapping ranges reuse
+	each other's blocks.
+
+	Concurrency model: threads of a process share one instance; a lock protects the bookkeeping and a block that
+	is being computed by one thread is awaited by the others instead of being computed twice. Other processes
+	attach to the same segment with ComputationCache.attach(cache.name) and see every block already computed.
+	There is no lock between processes: a block is marked as filled only after its values are written and the
+	kernels are deterministic, so at worst two processes compute the same block and write the same values.
+	"""
+	def __init__(self, size, f = None, block_size = 2**16, backend = 'numpy', name = None) -> None:
+		"""init method of ComputationCache class, creates a new shared memory segment.
+
+		Args:
+			size (int): the values 1..size are cached.
+			f (function, optional): collatz_function, collatz_function_short or an AffineMap. Defaults to None
+									(collatz_function).
+			block_size (int, optional): number of values computed together. Defaults to 2**16.
+			backend (str, optional): 'numpy' or 'numba'. Defaults to 'numpy'.
+			name (str, optional): name of the shared memory segment. Defaults to None (a random name).
+		"""
+		from collatz.functions import collatz_function
+
+		parameters = batch.map_parameters(collatz_function if f is None else f)
+		if parameters is None:
+			raise ValueError(str(f) + " has no batch kernel")
+		q, r, short = parameters
+		blocks = -(-size // block_size)
+		memory = shared_memory.SharedMemory(name = name, create = True, size = self._segment_size(size, blocks))
+		header = np.ndarray(_HEADER_ITEMS, dtype = np.int64, buffer = memory.buf)
+		header[:] = (CACHE_VERSION, size, block_size, q, r, int(short))
+		del header
+		self._open(memory, backend, owner = True)
+
+
+	@classmethod
+	def attach(cls, name, backend = 'numpy'):
+		"""Attaches to the shared memory segment name of a ComputationCache created by another process.
+
+		Returns:
+			ComputationCache: cache that shares its values with the one that created the segment.
+		"""
+		memory = shared_memory.SharedMemory(name = name)
+		header = np.ndarray(_HEADER_ITEMS, dtype = np.int64, buffer = memory.buf)
+		version = int(header[0])
+		del header
+		if version != CACHE_VERSION:
+			memory.close()
+			raise ValueError("Unsupported cache version " + str(version))
+		cache = cls.__new__(cls)
+		cache._open(memory, backend, owner = False)
+		return cache
+
+
+	@staticmethod
+	def _segment_size(size, blocks):
+		return 8*(_HEADER_ITEMS + len(CACHE_METRICS)*size) + blocks
+
+
+	def _open(self, memory, backend, owner):
+		"""Maps the arrays of the segment memory."""
+		self.memory = memory
+		self.owner = owner
+		self.backend = backend
+		header = np.ndarray(_HEADER_ITEMS, dtype = np.int64, buffer = memory.buf)
+		_, self.size, self.block_size, self.q, self.r, short = (int(x) for x in header)
+		self.short = bool(short)
+		del header
+
+		self.blocks = -(-self.size // self.block_size)
+		offset = 8*_HEADER_ITEMS
+		self.arrays = {}
+		for metric in CACHE_METRICS:
+			self.arrays[metric] = np.ndarray(self.size, dtype = np.int64, buffer = memory.buf, offset = offset)
+			offset += 8*self.size
+		self.filled = np.ndarray(self.blocks, dtype = np.uint8, buffer = memory.buf, offset = offset)
+
+		self.lock = threading.Lock()
+		self.computing = {}
+		self.hits = 0
+		self.misses = 0
+
+
+	@property
+	def name(self):
+		return self.memory.name
+
+
+	def matches(self, f):
+		"""Checks if the values of f can be read from this cache."""
+		return batch.map_parameters(f) == (self.q, self.r, self.short)
+
+
+	def _fill_block(self, block):
+		"""Computes the block (0 based) if it is not filled yet, or waits for the thread that is computing it.
+
+		Returns:
+			bool: True if the block was already filled (a hit).
+		"""
+		if self.filled[block]:
+			return True
+		with self.lock:
+			if self.filled[block]:
+				return True
+			event = self.computing.get(block)
+			owner = event is None
+			if owner:
+				event = self.computing[block] = threading.Event()
+		if not owner:
+			event.wait()
+			if self.filled[block]:
+				return True
+			# the thread that was computing it failed, this one retries
+			return self._fill_block(block)
+
+		try:
+			begin = block*self.block_size + 1
+			end = min(begin + self.block_size - 1, self.size)
+			values = np.arange(begin, end + 1, dtype = np.int64)
+			metrics = batch.orbit_metrics_array(values, self.short, CACHE_METRICS, self.backend, self.q, self.r)
+			for metric in CACHE_METRICS:
+				self.arrays[metric][begin - 1:end] = metrics[metric]
+			self.filled[block] = 1
+		finally:
+			with self.lock:
+				del self.computing[block]
+			event.set()
+		return False
+
+
+	def metrics(self, values, metrics = ('period',)):
+		"""Metrics of values, computing the blocks that are missing. Values outside 1..size are computed directly
+		and not cached.
+
+		Args:
+			values (array-like): positive integers.
+			metrics (iterable, optional): names of CACHE_METRICS. Defaults to ('period',).
+
+		Returns:
+			dict: dictionary with metric names as keys and int64 arrays as values.
+		"""
+		if self.filled is None:
+			raise ValueError("The cache is closed")
+		try:
+			values = np.asarray(values, dtype = np.int64)
+		except OverflowError:
+			raise ValueError("values must fit in int64, use the python engines for bigger values") from None
+		for metric in metrics:
+			if metric not in CACHE_METRICS:
+				raise ValueError("Unknown metric " + str(metric) + ", options are " + str(CACHE_METRICS))
+
+		inside = (values >= 1) & (values <= self.size)
+		cached = values[inside]
+		blocks = []
+		if cached.size:
+			low, high = (int(cached.min()) - 1) // self.block_size, (int(cached.max()) - 1) // self.block_size
+			if (high - low + 1)*self.block_size <= 2*cached.size:
+				# dense values (e.g. a range), every block between the first and the last one
+				blocks = range(low, high + 1)
+			else:
+				blocks = np.unique((cached - 1) // self.block_size).tolist()
+
+		hits = sum(self._fill_block(block) for block in blocks)
+		with self.lock:
+			self.hits += hits
+			self.misses += len(blocks) - hits
+
+		result = {metric : np.empty(values.size, dtype = np.int64) for metric in metrics}
+		for metric in metrics:
+			result[metric][inside] = self.arrays[metric][cached - 1]
+		if not inside.all():
+			outside = batch.orbit_metrics_array(values[~inside], self.short, metrics, self.backend, self.q, self.r)
+			for metric in metrics:
+				result[metric][~inside] = outside[metric]
+		return result
+
+
+	def hit_rate(self):
+		"""Fraction of the requested blocks that were already filled, None if nothing was requested."""
+		total = self.hits + self.misses
+		return self.hits / total if total else None
+
+
+	def close(self):
+		"""Unmaps the segment from this process. The owner (the instance that created it) also removes it."""
+		self.arrays = {}
+		self.filled = None
+		self.memory.close()
+		if self.owner:
+			self.memory.unlink()
+
+
+	def __enter__(self):
+		return self
+
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+	def __reduce__(self):
+		# other processes attach to the segment instead of copying it
+		return ComputationCache.attach, (self.name, self.backend)
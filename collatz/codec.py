@@ -0,0 +1,250 @@
+import struct
+
+import numpy as np
+
+from collatz import affine
+
+CODEC_VERSION = 1
+DEFAULT_CHECKPOINT_EVERY = 256
+
+# version, checkpoint_every, q, r, short. Written once per orbit or once per block.
+_HEADER = struct.Struct('<BIqqB')
+
+
+def _write_varint(n, parts):
+	"""Appends the unsigned integer n as a LEB128 varint (7 bits per byte) to parts."""
+	data = bytearray()
+	while True:
+		byte = n & 0x7f
+		n >>= 7
+		if n:
+			data.append(byte | 0x80)
+		else:
+			data.append(byte)
+			break
+	parts.append(bytes(data))
+
+
+def _read_varint(data, offset):
+	"""Reads a LEB128 varint of data at offset.
+
+	Returns:
+		tuple: (value, offset after the varint).
+	"""
+	n = 0
+	shift = 0
+	while True:
+		byte = data[offset]
+		offset += 1
+		n |= (byte & 0x7f) << shift
+		if byte < 0x80:
+			return n, offset
+		shift += 7
+
+
+def _read_header(data, offset):
+	version, checkpoint_every, q, r, short = _HEADER.unpack_from(data, offset)
+	if version != CODEC_VERSION:
+		raise ValueError("Unsupported orbit codec version " + str(version))
+	return (checkpoint_every, q, r, bool(short)), offset + _HEADER.size
+
+
+class EncodedOrbit:
+	"""
+	Orbit of an affine map (q*n + r on odd values, see affine.AffineMap) stored as its packed parity sequence.
+	The values are rebuilt lazily from the parity bits, starting at the closest checkpoint: the value of every
+	checkpoint_every steps is kept, so any element is at most checkpoint_every - 1 steps away.
+	"""
+	def __init__(self, length, bits, checkpoints, checkpoint_every = DEFAULT_CHECKPOINT_EVERY, q = 3, r = 1,
+				short = False) -> None:
+		"""init method of EncodedOrbit class, use encode_orbit to build it from an orbit list.
+
+		Args:
+			length (int): number of values of the orbit.
+			bits (array): uint8 array with the packed parity of the first length - 1 values.
+			checkpoints (list): values of the orbit at the indexes 0, checkpoint_every, 2*checkpoint_every, ...
+			checkpoint_every (int, optional): steps between checkpoints. Defaults to DEFAULT_CHECKPOINT_EVERY.
+			q (int, optional): multiplier of odd values. Defaults to 3.
+			r (int, optional): constant added to odd values. Defaults to 1.
+			short (bool, optional): if True, q*n + r is divided by 2 in the same step. Defaults to False.
+		"""
+		self.length = length
+		self.bits = bits
+		self.checkpoints = checkpoints
+		self.checkpoint_every = checkpoint_every
+		self.q = q
+		self.r = r
+		self.short = short
+		pass
+
+
+	@property
+	def start(self):
+		return self.checkpoints[0]
+
+
+	@property
+	def period(self):
+		return self.length - 1
+
+
+	def __len__(self):
+		return self.length
+
+
+	def parity_sequence(self):
+		"""Parity sequence of the orbit, as collatz.parity_sequence (the last value is set to 0).
+
+		Returns:
+			list: list with 0 and 1.
+		"""
+		return np.unpackbits(self.bits, count = self.length - 1).tolist() + [0]
+
+
+	def _values(self, begin, end):
+		"""Generator of the values from index begin to end - 1."""
+		i = begin // self.checkpoint_every * self.checkpoint_every
+		n = self.checkpoints[i // self.checkpoint_every]
+		# only the bytes with the parity bits of [i, end) are unpacked
+		last = min(end, self.length - 1)
+		first_byte = i // 8
+		parities = np.unpackbits(self.bits[first_byte:-(-last // 8)])[i - 8*first_byte:last - 8*first_byte].tolist()
+		for parity in parities:
+			if i >= begin:
+				yield n
+			if parity:
+				n = (self.q*n + self.r) // 2 if self.short else self.q*n + self.r
+			else:
+				n //= 2
+			i += 1
+		if i < end:
+			# last value, it has no parity bit
+			yield n
+
+
+	def __getitem__(self, key):
+		if isinstance(key, slice):
+			start, stop, step = key.indices(self.length)
+			if step != 1:
+				return self.to_list()[key]
+			return list(self._values(start, stop)) if start < stop else []
+
+		if key < 0:
+			key += self.length
+		if not 0 <= key < self.length:
+			raise IndexError("orbit index out of range")
+		return next(self._values(key, key + 1))
+
+
+	def __iter__(self):
+		return self._values(0, self.length)
+
+
+	def to_list(self):
+		"""Decodes the whole orbit.
+
+		Returns:
+			list: list with the values of the orbit.
+		"""
+		return list(self._values(0, self.length))
+
+
+	def _write(self, parts):
+		"""Appends the length, the checkpoints and the parity bits as varints and bytes to parts."""
+		_write_varint(self.length, parts)
+		for checkpoint in self.checkpoints:
+			_write_varint(checkpoint, parts)
+		parts.append(self.bits.tobytes())
+
+
+	@classmethod
+	def _read(cls, data, offset, checkpoint_every, q, r, short):
+		"""Reads an orbit written by _write at offset.
+
+		Returns:
+			tuple: (EncodedOrbit, offset after the orbit).
+		"""
+		length, offset = _read_varint(data, offset)
+		checkpoints = []
+		for _ in range(-(-length // checkpoint_every)):
+			checkpoint, offset = _read_varint(data, offset)
+			checkpoints.append(checkpoint)
+		size = (length + 6) // 8
+		bits = np.frombuffer(data, dtype = np.uint8, offset = offset, count = size)
+		return cls(length, bits, checkpoints, checkpoint_every, q, r, short), offset + size
+
+
+	def to_bytes(self):
+		"""Serializes the encoded orbit: a fixed header with the map and checkpoint_every, the length and the
+		checkpoints as varints and the packed parity bits.
+
+		Returns:
+			bytes: serialized orbit.
+		"""
+		parts = [_HEADER.pack(CODEC_VERSION, self.checkpoint_every, self.q, self.r, self.short)]
+		self._write(parts)
+		return b''.join(parts)
+
+
+	@classmethod
+	def from_bytes(cls, data):
+		"""Loads an orbit serialized with to_bytes.
+
+		Returns:
+			EncodedOrbit: encoded orbit, values are not decoded until they are accessed.
+		"""
+		parameters, offset = _read_header(data, 0)
+		return cls._read(data, offset, *parameters)[0]
+
+
+def encode_orbit(orbit, checkpoint_every = DEFAULT_CHECKPOINT_EVERY, f = None):
+	"""Encodes an orbit as its packed parity sequence and a checkpoint every checkpoint_every values.
+
+	Args:
+		orbit (list): orbit of a value under f, as returned by collatz.orbit.
+		checkpoint_every (int, optional): steps between checkpoints. Defaults to DEFAULT_CHECKPOINT_EVERY.
+		f (AffineMap, optional): map of the orbit. Defaults to AffineMap(3, 1) (collatz_function).
+
+	Returns:
+		EncodedOrbit: encoded orbit.
+	"""
+	f = f or affine.AffineMap()
+	orbit = [int(n) for n in orbit]
+	bits = np.packbits(np.fromiter((n & 1 for n in orbit[:-1]), dtype = np.uint8, count = len(orbit) - 1))
+	return EncodedOrbit(len(orbit), bits, orbit[::checkpoint_every], checkpoint_every, f.q, f.r, f.short)
+
+
+def encode_block(dictionary, checkpoint_every = DEFAULT_CHECKPOINT_EVERY, f = None):
+	"""Encodes a block of orbits as saved by generate_collatz_data ({value: {"period": p, "orbit": [...]}}).
+	The header is written once for the whole block and the period is not stored, it is the length of the
+	orbit minus one.
+
+	Args:
+		dictionary (dict): dictionary with values as keys and dictionaries with the "orbit" as values.
+		checkpoint_every (int, optional): steps between checkpoints. Defaults to DEFAULT_CHECKPOINT_EVERY.
+		f (AffineMap, optional): map of the orbits. Defaults to AffineMap(3, 1) (collatz_function).
+
+	Returns:
+		bytes: serialized block.
+	"""
+	f = f or affine.AffineMap()
+	parts = [_HEADER.pack(CODEC_VERSION, checkpoint_every, f.q, f.r, f.short)]
+	_write_varint(len(dictionary), parts)
+	for value in dictionary.values():
+		encode_orbit(value["orbit"], checkpoint_every, f)._write(parts)
+	return b''.join(parts)
+
+
+def decode_block(data):
+	"""Loads a block serialized with encode_block.
+
+	Returns:
+		dict: dictionary with the start values (int) as keys and EncodedOrbits as values.
+	"""
+	parameters, offset = _read_header(data, 0)
+	count, offset = _read_varint(data, offset)
+	orbits = {}
+	for _ in range(count):
+		orbit, offset = EncodedOrbit._read(data, offset, *parameters)
+		orbits[orbit.start] = orbit
+	return orbits
@@ -1,12 +1,26 @@
-from collatz import functions, plot
+from collatz import functions, batch, aggregate, bigint, affine
+from collatz.lazy import lazy_import
+from collatz.affine import CONVERGED, CYCLED, DIVERGED, EXCEEDED
+from collections import namedtuple
 from itertools import groupby
 from operator import itemgetter
 from math import log
+from numbers import Integral
+import operator
+from collections.abc import Mapping
+from functools import wraps
+import threading
+import numpy as np
+
+# matplotlib and networkx are only loaded when something is plotted
+plot = lazy_import('collatz.plot')
 
 
 def orbit(n, f, *args, **kwargs):
 	"""Function to calculate the orbit an period of a given value under a given function.
-	f must reach 1 after some iterations, it will go into an infinite loop otherwise.
+	f must reach 1 after some iterations, it will go into an infinite loop otherwise (e.g. maps that cycle or 
+	diverge); use bounded_orbit or bounded_period for those, as CollatzProblem does by default for any f other
+	than collatz_function and collatz_function_short.
 
 	Args:
 		n (positive integer): Value to calculate orbit
@@ -27,9 +41,77 @@ def orbit(n, f, *args, **kwargs):
 	return orbit_list
 
 
+def _is_builtin(f):
+	"""Checks if f is collatz_function or collatz_function_short, which have specialized kernels."""
+	return f is functions.collatz_function or f is functions.collatz_function_short
+
+
+def _use_bigint(n, f, args, kwargs):
+	"""Checks if n is big enough to be iterated with the big integer engine, only for the built-in maps."""
+	return (not args and not kwargs and _is_builtin(f) 
+			and isinstance(n, int) and n.bit_length() > bigint.BIG_INT_BITS)
+
+
+def _builtin_int(n, f, args, kwargs):
+	"""n as a python int if it can be iterated with the specialized kernels of the built-in maps (integral values
+	such as numpy integers are converted), None otherwise (e.g. floats, which use the generic loop)."""
+	if args or kwargs or not _is_builtin(f):
+		return None
+	if type(n) is int:
+		return n
+	if isinstance(n, Integral):
+		return operator.index(n)
+	return None
+
+
+def _collatz_period(n, short):
+	"""Period of n under collatz_function (or collatz_function_short if short). All the factors of 2 
+	are removed in one shift and counted as steps."""
+	steps = 0
+	while True:
+		zeros = (n & -n).bit_length() - 1
+		n >>= zeros
+		steps += zeros
+		if n == 1:
+			return steps
+
+		if short:
+			n = (3*n + 1) >> 1
+		else:
+			n = 3*n + 1
+		steps += 1
+
+
+def _collatz_stopping_time(n, short):
+	"""Stopping time of n under collatz_function (or collatz_function_short if short). All the factors of 2
+	are removed in one shift unless the orbit drops below n among them."""
+	n0 = n
+	steps = 0
+	while True:
+		if n0 & 1:
+			if short:
+				n0 = (3*n0 + 1) >> 1
+			else:
+				n0 = 3*n0 + 1
+			steps += 1
+		else:
+			zeros = (n0 & -n0).bit_length() - 1
+			if (n0 >> zeros) > n:
+				n0 >>= zeros
+				steps += zeros
+			else:
+				# smallest number of halvings that takes n0 to n or below
+				halvings = max(n0.bit_length() - n.bit_length(), 1)
+				if (n0 >> halvings) > n:
+					halvings += 1
+				return steps + halvings
+
+
 def orbit_and_period(n, f, *args, **kwargs):
 	"""Function to calculate the orbit an period of a given value under a given function.
-	f must reach 1 after some iterations, it will go into an infinite loop otherwise.
+	f must reach 1 after some iterations, it will go into an infinite loop otherwise (e.g. maps that cycle or 
+	diverge); use bounded_orbit or bounded_period for those, as CollatzProblem does by default for any f other
+	than collatz_function and collatz_function_short.
 	Args:
 		n (positive integer): Value to calculate orbit.
 		f (function): function to iterate orbit.
@@ -38,6 +120,9 @@ def orbit_and_period(n, f, *args, **kwargs):
 	Returns:
 		tuple: integer with the period of orbit and list with the orbit of n under f
 	"""
+	if _use_bigint(n, f, args, kwargs):
+		return bigint.orbit_and_period_big(n, f is functions.collatz_function_short)
+
 	orbita = []
 	orbita.append(n)
 
@@ -52,7 +137,9 @@ def orbit_and_period(n, f, *args, **kwargs):
 
 def period(n, f, *args, **kwargs):
 	"""Function to calculate the period of a given value under a given function.
-	f must reach 1 after some iterations, it will go into an infinite loop otherwise.
+	f must reach 1 after some iterations, it will go into an infinite loop otherwise (e.g. maps that cycle or 
+	diverge); use bounded_orbit or bounded_period for those, as CollatzProblem does by default for any f other
+	than collatz_function and collatz_function_short.
 
 	Args:
 		n (positive integer): Value to calculate orbit.
@@ -62,6 +149,15 @@ def period(n, f, *args, **kwargs):
 	Returns:
 		integer: integer with the period of orbit
 	"""
+	integer = _builtin_int(n, f, args, kwargs)
+	if integer is not None and integer < 1:
+		# the orbits of 0 and the negative values never reach 1
+		raise ValueError("period is only defined for positive values, got " + str(n))
+	if _use_bigint(n, f, args, kwargs):
+		return bigint.period_big(n, f is functions.collatz_function_short)
+	if integer is not None:
+		return _collatz_period(integer, f is functions.collatz_function_short)
+
 	orbita = []
 	orbita.append(n)
 
@@ -75,6 +171,86 @@ def period(n, f, *args, **kwargs):
 	return i
 
 
+OrbitResult = namedtuple('OrbitResult', ['status', 'period', 'orbit'])
+OrbitResult.__doc__ = """Result of a bounded iteration. status is one of CONVERGED, CYCLED, DIVERGED or EXCEEDED,
+period is -1 unless the orbit converged and orbit is None for bounded_period."""
+
+
+def bounded_orbit(n, f, *args, max_steps = affine.DEFAULT_MAX_STEPS, max_bits = affine.DEFAULT_MAX_BITS, **kwargs):
+	"""Function to calculate the orbit and period of a given value under a given function with bounded execution.
+	The iteration stops when the orbit reaches 1, repeats a value, grows beyond 2^max_bits or max_steps are done.
+
+	Args:
+		n (positive integer): Value to calculate orbit.
+		f (function): function to iterate orbit.
+		*args and *kwars: parameters of the function.
+		max_steps (int, optional): max number of iterations. Defaults to affine.DEFAULT_MAX_STEPS.
+		max_bits (int, optional): max bit length of the values of the orbit. Defaults to affine.DEFAULT_MAX_BITS.
+
+	Returns:
+		OrbitResult: status, period and orbit of n under f. If the orbit cycled it ends at the first repeated value.
+	"""
+	bound = 1 << max_bits
+	orbit_list = [n]
+	seen = {n}
+
+	n0 = n
+	while len(orbit_list) <= max_steps and n0 != 1:
+		n0 = f(n0, *args, **kwargs)
+		orbit_list.append(n0)
+
+		if n0 == 1:
+			break
+		if n0 in seen:
+			return OrbitResult(CYCLED, -1, orbit_list)
+		if abs(n0) >= bound:
+			return OrbitResult(DIVERGED, -1, orbit_list)
+		seen.add(n0)
+
+	if n0 != 1:
+		return OrbitResult(EXCEEDED, -1, orbit_list)
+	return OrbitResult(CONVERGED, len(orbit_list) - 1, orbit_list)
+
+
+def bounded_period(n, f, *args, max_steps = affine.DEFAULT_MAX_STEPS, max_bits = affine.DEFAULT_MAX_BITS, **kwargs):
+	"""Function to calculate the period of a given value under a given function with bounded execution and 
+	without storing the orbit. Cycles are found with Brent's method: the orbit is compared against the value
+	saved at the last power of two step.
+
+	Args:
+		n (positive integer): Value to calculate orbit.
+		f (function): function to iterate orbit.
+		*args and *kwars: parameters of the function.
+		max_steps (int, optional): max number of iterations. Defaults to affine.DEFAULT_MAX_STEPS.
+		max_bits (int, optional): max bit length of the values of the orbit. Defaults to affine.DEFAULT_MAX_BITS.
+
+	Returns:
+		OrbitResult: status and period of n under f, orbit is None.
+	"""
+	bound = 1 << max_bits
+	reference = n
+	i = 0
+
+	n0 = n
+	while n0 != 1:
+		if i == max_steps:
+			return OrbitResult(EXCEEDED, -1, None)
+
+		n0 = f(n0, *args, **kwargs)
+		i += 1
+
+		if n0 == 1:
+			break
+		if n0 == reference:
+			return OrbitResult(CYCLED, -1, None)
+		if abs(n0) >= bound:
+			return OrbitResult(DIVERGED, -1, None)
+		if i & (i - 1) == 0:
+			reference = n0
+
+	return OrbitResult(CONVERGED, i, None)
+
+
 def stopping_time_ratio(n, period):
 	""" function to calculate the stopping time ratio of a given value under f.
 
@@ -119,7 +295,7 @@ def ones_ratio(n, f, *args, **kwargs):
 	return sum(sequence) / len(sequence)
 
 
-def stopping_time(n, f, *args, **kwargs):
+def stopping_time(n, f, *args, max_steps = None, **kwargs):
 	"""function to calculate the stopping time of a value n under f, i.e., 
 	the number of iterations k such that f^k(n) < n. 
 
@@ -127,23 +303,33 @@ def stopping_time(n, f, *args, **kwargs):
 		n (integer): Value to calculate the ones ratio.
 		f (function): F to calculate orbit under n.
 		*args and *kwars: parameters of the function.
+		max_steps (int, optional): max number of iterations. Defaults to None (no limit).
 
 	Returns:
-		integer: number k such that f^k(n) < n
+		integer: number k such that f^k(n) < n, 0 if max_steps were done before.
 	"""
+	integer = _builtin_int(n, f, args, kwargs) if max_steps is None else None
+	if integer is not None and integer >= 1:
+		return _collatz_stopping_time(integer, f is functions.collatz_function_short)
+	# 0 and the negative values take the generic loop as before, e.g. 0 is a fixed point with stopping time 1
+
 	n0 = f(n, *args, **kwargs)
 	i = 1
 	while(n < n0):
+		if i == max_steps:
+			return 0
 		n0 = f(n0, *args, **kwargs)
 		i += 1
 	return i
 
 
-def same_orbit_period(initial_list):
+def same_orbit_period(initial_list, f = functions.collatz_function, *args, **kwargs):
 	"""function to group numbers with the same orbit lenght (period)
 
 	Args:
 		initial_list (list): list with the numbers to calculate its period
+		f (function, optional): function to iterate orbit. Defaults to collatz_function.
+		*args and *kwars: parameters of the function.
 
 	Returns:
 		dict: dictionary with numbers grouped by period, e.g., same_orbit_length[10] has all
@@ -151,7 +337,7 @@ def same_orbit_period(initial_list):
 	"""
 	len_dict = {}
 	for i in initial_list:
-		len = period(i)
+		len = period(i, f, *args, **kwargs)
 		
 		if len in len_dict.keys():
 			len_dict[len].append(i)
@@ -161,17 +347,125 @@ def same_orbit_period(initial_list):
 	return len_dict
 
 
-def consecutive_orbits_length(initial_values):
-	"""function to group consecutive numbers with the same orbit lenght.
+def is_contiguous(values):
+	"""function to check if values are consecutive increasing integers, e.g. range(a, b).
+
+	Args:
+		values (iterable): values to check.
+
+	Returns:
+		bool: True if each value is the previous one plus 1, empty values are contiguous.
+	"""
+	if isinstance(values, range):
+		return values.step == 1 or len(values) == 0
+	values = np.asarray(values)
+	if values.ndim == 1 and values.size == 0:
+		return True
+	return values.ndim == 1 and values.dtype.kind in 'iu' and bool(np.all(np.diff(values) == 1))
+
+
+class ConsecutiveRuns(Mapping):
+	"""
+	Runs of consecutive values with the same period, stored as arrays. It also behaves as a read only
+	dictionary with the shape returned by consecutive_orbits_length (run lenght as keys and lists of runs
+	as values), that dictionary is only built the first time it is accessed.
+	"""
+	def __init__(self, starts, lengths, periods) -> None:
+		"""init method of ConsecutiveRuns class
+
+		Args:
+			starts (array): first value of each run.
+			lengths (array): number of values in each run.
+			periods (array): period shared by the values of each run.
+		"""
+		self.starts = starts
+		self.lengths = lengths
+		self.periods = periods
+		self._dict = None
+		pass
+
+
+	def as_dict(self):
+		"""Method to build the dictionary of runs grouped by lenght. Runs are grouped first by period 
+		(in order of first appearance) and then by start, as consecutive_orbits_length used to do.
+
+		Returns:
+			dict: dict with consecutive numbers grouped by run lenght.
+		"""
+		if self._dict is None:
+			_, first_run = np.unique(self.periods, return_index = True)
+			rank = np.empty(self.periods.size, dtype = np.int64)
+			rank[np.argsort(first_run)] = np.arange(first_run.size)
+			_, period_rank = np.unique(self.periods, return_inverse = True)
+
+			consecutive_same_len = {}
+			for i in np.lexsort((self.starts, rank[period_rank])):
+				start = int(self.starts[i])
+				n = int(self.lengths[i])
+				consecutive = list(range(start, start + n))
+
+				if n in consecutive_same_len.keys():
+					consecutive_same_len[n].append(consecutive)
+				else:
+					consecutive_same_len[n] = [consecutive]
+			self._dict = consecutive_same_len
+
+		return self._dict
+
+
+	def __getitem__(self, key):
+		return self.as_dict()[key]
+
+
+	def __iter__(self):
+		return iter(self.as_dict())
+
+
+	def __len__(self):
+		return len(self.as_dict())
+
+
+def consecutive_period_runs(periods, begin = 1):
+	"""function to find the runs of consecutive values with the same period in one vectorized pass.
+
+	Args:
+		periods (array): periods of the contiguous values begin, begin + 1, ...
+		begin (integer, optional): value with period periods[0]. Defaults to 1.
+
+	Returns:
+		ConsecutiveRuns: arrays with the start, lenght and period of each run.
+	"""
+	periods = np.asarray(periods, dtype = np.int64)
+	run_index = np.flatnonzero(np.diff(periods)) + 1
+	starts_index = np.r_[0, run_index] if periods.size else run_index
+	lengths = np.diff(np.r_[starts_index, periods.size])
+
+	return ConsecutiveRuns(begin + starts_index, lengths, periods[starts_index])
+
+
+def consecutive_orbits_length(initial_values, f = functions.collatz_function, *args, **kwargs):
+	"""function to group consecutive numbers with the same orbit lenght. If initial_values are contiguous
+	the runs are found over the array of periods, see consecutive_period_runs.
 
 	Args:
 		initial_values (list): List with the numbers to group by orbit lenght (period)
+		f (function, optional): function to iterate orbit. Defaults to collatz_function.
+		*args and *kwars: parameters of the function.
 
 	Returns:
 		dict: dict with consecutive numbers grouped by period, e.g., consecutive_orbits_lenght[10] has all
 		consecutive numbers from initial list with period equal to 10.
 	"""
-	same_len = same_orbit_period(initial_values) # Groups initial list by period
+	if is_contiguous(initial_values):
+		if len(initial_values) == 0:
+			return consecutive_period_runs([])
+		if not args and not kwargs and batch.is_batch_function(f):
+			periods = batch.function_metrics_array(f, initial_values, ('period',))['period']
+		else:
+			periods = [period(value, f, *args, **kwargs) for value in initial_values]
+		return consecutive_period_runs(periods, initial_values[0])
+
+	same_len = same_orbit_period(initial_values, f, *args, **kwargs) # Groups initial list by period
 	
 	consecutive_same_len = {}
 	for values in same_len.values():
@@ -188,11 +482,31 @@ def consecutive_orbits_length(initial_values):
 	return consecutive_same_len
 
 
+def _instrumented(lengths = None):
+	"""Decorator of the CollatzProblem methods that compute something for every value. If self.instrumentation is
+	set, the method is timed as the 'compute' stage and its values are counted as done. lengths is a function that
+	gets the orbit lengths from the result of the method, to track the max orbit length."""
+	def decorator(method):
+		@wraps(method)
+		def wrapper(self):
+			if self.instrumentation is None:
+				return method(self)
+			with self.instrumentation.stage('compute'):
+				result = method(self)
+			if lengths is not None and len(self.values):
+				self.instrumentation.observe_orbit_length(max(lengths(result)))
+			self.instrumentation.add_values(len(self.values))
+			return result
+		return wrapper
+	return decorator
+
+
 class CollatzProblem:
 	"""
 	Class to explore the Collatz conjecture, a.k.a 3x + 1 problem.
 	"""
-	def __init__(self, initial_values, start = 'orbit', f = functions.collatz_function, *args, **kwargs) -> None:
+	def __init__(self, initial_values, start = 'orbit', f = functions.collatz_function, *args, backend = 'python', 
+				max_steps = None, max_bits = None, bounded = None, instrumentation = None, cache = None, **kwargs) -> None:
 		"""init method of CollatzProblem class
 
 		Args:
@@ -204,7 +518,29 @@ class CollatzProblem:
 									Defaults to 'orbit'.
 			f (function, optional): function to iterate over. Defaults to collatz_function.
 			*args and *kwars: parameters of the function.
+			backend (str, optional): engine for periods and stopping times of the built-in maps:
+									- 'python': one value at a time.
+									- 'numpy': all values together as int64 arrays (see collatz.batch).
+									- 'numba': compiled parallel kernels (see collatz.jit), numba must be installed.
+									Other functions always use 'python'. Defaults to 'python'.
+			max_steps (int, optional): max number of iterations of each value with bounded execution. Defaults to None
+									(affine.DEFAULT_MAX_STEPS).
+			max_bits (int, optional): max bit length of the values of the orbits with bounded execution. Defaults to 
+									None (affine.DEFAULT_MAX_BITS).
+			bounded (bool, optional): if True, orbits are iterated with bounded execution (see bounded_orbit) and the
+									status of each value is stored in self.statuses. Defaults to None: bounded if 
+									max_steps or max_bits is set or f is not collatz_function nor 
+									collatz_function_short, since other maps may cycle or diverge. False opts out.
+			instrumentation (Instrumentation, optional): if given, orbits, periods and stopping times are timed as the
+									'compute' stage, the reuse of the periods is counted in the 'periods' cache and the
+									max orbit length is tracked (see collatz.instrument). Defaults to None.
+			cache (ComputationCache, optional): shared cache of the periods and stopping times of self.function (see
+									collatz.cache), used with any backend by the instances (in threads or processes)
+									that share it. Defaults to None.
 		"""
+		if backend not in ('python',) + batch.BACKENDS:
+			raise ValueError("backend must be one of " + str(('python',) + batch.BACKENDS))
+
 		self.values = initial_values
 		self.orbits = None
 		self.periods = None
@@ -213,6 +549,18 @@ class CollatzProblem:
 		self.function = f
 		self.args = args
 		self.kwargs = kwargs
+		self.backend = backend
+		if bounded is None:
+			bounded = max_steps is not None or max_bits is not None or not _is_builtin(f)
+		self.bounded = bounded
+		self.max_steps = affine.DEFAULT_MAX_STEPS if max_steps is None else max_steps
+		self.max_bits = affine.DEFAULT_MAX_BITS if max_bits is None else max_bits
+		self.statuses = None
+		self.columns = None
+		self.instrumentation = instrumentation
+		self.cache = cache
+		# guards the lazy fill of self.periods when the instance is shared by threads
+		self.lock = threading.Lock()
 
 		if start == 'orbit':
 			self.orbits = self.orbit()
@@ -227,6 +575,104 @@ class CollatzProblem:
 		pass
 
 
+	@classmethod
+	def from_store(cls, values, store = None):
+		"""Creates a CollatzProblem whose periods, stopping times and stopping time ratios are read from a column
+		store (see collatz.columns) instead of being calculated. They are ColumnMappings over the memory-mapped 
+		columns, so nothing is copied until a value is read.
+
+		Args:
+			values (range): consecutive values to explore, e.g. range(1, 10**6 + 1).
+			store (ColumnStore, optional): column store with the metrics of values. Defaults to ColumnStore().
+
+		Returns:
+			CollatzProblem: problem with self.periods, self.stopping_times and self.stopping_time_ratios filled
+			and the columns of the store in self.columns.
+		"""
+		from collatz.columns import ColumnStore, ColumnMapping
+
+		store = store or ColumnStore()
+		if not is_contiguous(values):
+			raise ValueError("values must be consecutive integers")
+		if not isinstance(values, range):
+			values = range(int(values[0]), int(values[-1]) + 1) if len(values) else range(1, 1)
+
+		f = functions.collatz_function_short if store.short else functions.collatz_function
+		problem = cls(values, None, f)
+		if len(values):
+			problem.columns = store.columns(values[0], values[-1])
+			problem.periods = ColumnMapping(values, problem.columns['period'])
+			problem.stopping_times = ColumnMapping(values, problem.columns['stopping_time'])
+			problem.stopping_time_ratios = ColumnMapping(values, problem.columns['period'], 
+									lambda value, period: None if period < 0 else stopping_time_ratio(value, period))
+		return problem
+
+
+	def _periods_cached(self):
+		"""Checks if self.periods is already filled, counting the hit or miss in self.instrumentation."""
+		cached = bool(self.periods)
+		if self.instrumentation is not None:
+			if cached:
+				self.instrumentation.cache_hit('periods')
+			else:
+				self.instrumentation.cache_miss('periods')
+		return cached
+
+
+	def _ensure_periods(self):
+		"""Fills self.periods if it is not cached. The fill runs under self.lock, so threads that share this instance
+		compute the periods once."""
+		if self._periods_cached():
+			return self.periods
+		with self.lock:
+			if not self.periods:
+				self.periods = self.period()
+		return self.periods
+
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		del state['lock']
+		return state
+
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.lock = threading.Lock()
+
+
+	def _use_cache(self):
+		"""Checks if the periods and stopping times of self.function can be read from self.cache. Values that do not
+		fit in int64 (python big integers) use the python engines instead."""
+		if (self.cache is None or self.bounded or self.args or self.kwargs or not self.cache.matches(self.function)):
+			return False
+		try:
+			np.asarray(self.values, dtype = np.int64)
+		except OverflowError:
+			return False
+		return True
+
+
+	def _use_batch(self, allow_python = False):
+		"""Checks if the batch kernels of self.backend can be used for self.function. If allow_python is True,
+		the numpy kernels are also used with the 'python' backend."""
+		return ((allow_python or self.backend != 'python') and not self.args and not self.kwargs 
+				and batch.is_batch_function(self.function))
+
+
+	def _batch_metrics(self, metrics, backend = None):
+		"""Calculates metrics of self.values with the batch kernels, or reads them from self.cache. If 'status' is in 
+		metrics, self.statuses is set."""
+		if self._use_cache():
+			metrics = self.cache.metrics(self.values, metrics)
+		else:
+			metrics = batch.function_metrics_array(self.function, self.values, metrics, backend or self.backend, 
+								self.max_steps if self.bounded else None, self.max_bits)
+		if 'status' in metrics:
+			self.statuses = {value : affine.STATUSES[code] for value, code in zip(self.values, metrics['status'].tolist())}
+		return metrics
+
+
 	def f(self):
 		"""Method to evaluate all self.values over self.function
 
@@ -237,6 +683,7 @@ class CollatzProblem:
 		return f_of_values
 
 
+	@_instrumented(lambda orbits: (len(orbit_list) - 1 for orbit_list in orbits.values()))
 	def orbit(self):
 		"""Method to calculate the orbits of self.values
 
@@ -244,11 +691,21 @@ class CollatzProblem:
 			dict: dictionary with self.values as keys and orbits (list) as dict values
 		"""
 		orbits_values = {}
+		if self.bounded:
+			self.statuses = {}
+			for value in self.values:
+				result = bounded_orbit(value, self.function, *self.args, max_steps = self.max_steps, 
+									max_bits = self.max_bits, **self.kwargs)
+				orbits_values[value] = result.orbit
+				self.statuses[value] = result.status
+			return orbits_values
+
 		for value in self.values:
 			orbits_values[value] = orbit(value, self.function, *self.args, **self.kwargs)
 		return orbits_values
 
 
+	@_instrumented(lambda periods: periods.values())
 	def period(self):
 		"""Method to calculate the periods of the orbits of self.values. If self.orbits is not none or empty dict, 
 		the calculation is made over the lenght of each orbit. Otherwise is calculated.
@@ -258,16 +715,31 @@ class CollatzProblem:
 		"""
 		period_values = {}
 
-		if self.orbits == {} or self.orbits is None:
+		if (self.orbits == {} or self.orbits is None) and (self._use_cache() or self._use_batch()):
+			metrics = self._batch_metrics(('period', 'status'))
+			period_values = dict(zip(self.values, metrics['period'].tolist()))
+		elif (self.orbits == {} or self.orbits is None) and self.bounded:
+			self.statuses = {}
+			for value in self.values:
+				result = bounded_period(value, self.function, *self.args, max_steps = self.max_steps, 
+									max_bits = self.max_bits, **self.kwargs)
+				period_values[value] = result.period
+				self.statuses[value] = result.status
+		elif self.orbits == {} or self.orbits is None:
 			for value in self.values:
 				period_values[value] = period(value, self.function, *self.args, **self.kwargs)
 		else:
 			for value in self.orbits.keys():
-				period_values[value] = len(self.orbits[value])
+				if self.bounded and self.statuses is not None and self.statuses.get(value, CONVERGED) != CONVERGED:
+					# the orbit cycled, diverged or was cut, it has no period
+					period_values[value] = -1
+				else:
+					period_values[value] = len(self.orbits[value])
 
 		return period_values
 
 
+	@_instrumented(lambda result: result[0].values())
 	def orbits_and_periods(self):
 		"""Method to calculate the orbits and periods of self.values
 
@@ -278,6 +750,16 @@ class CollatzProblem:
 		orbits_values = {}
 		period_values = {}
 
+		if self.bounded:
+			self.statuses = {}
+			for value in self.values:
+				result = bounded_orbit(value, self.function, *self.args, max_steps = self.max_steps, 
+									max_bits = self.max_bits, **self.kwargs)
+				orbits_values[value] = result.orbit
+				period_values[value] = result.period
+				self.statuses[value] = result.status
+			return period_values, orbits_values
+
 		for value in self.values:
 			period_value, orbit_value = orbit_and_period(value, self.function, *self.args, **self.kwargs)
 			orbits_values[value] = orbit_value
@@ -286,15 +768,21 @@ class CollatzProblem:
 		return period_values, orbits_values
 
 
+	@_instrumented()
 	def stopping_time(self):
 		"""Method to calculate the stopping times for all values. Self.values must exist
 
 		Returns:
 			dict: dictionary with values as key and stopping time as values
 		"""
+		if self._use_cache() or self._use_batch():
+			times = self._batch_metrics(('stopping_time',))['stopping_time']
+			return dict(zip(self.values, times.tolist()))
+
+		max_steps = self.max_steps if self.bounded else None
 		stopping_times = {}
 		for value in self.values:
-			stopping_times[value] = stopping_time(value, self.function, *self.args, *self.kwargs)
+			stopping_times[value] = stopping_time(value, self.function, *self.args, max_steps = max_steps, **self.kwargs)
 		return stopping_times
 
 
@@ -305,12 +793,15 @@ class CollatzProblem:
 			dict: dictionary with values as key and stopping time ratio as values
 		"""
 
-		if not self.periods:
-			self.periods = self.period()
+		self._ensure_periods()
 		
 		stopping_times_ratio = {}
 		for value in self.values:
-			stopping_times_ratio[value] = stopping_time_ratio(value, self.periods[value])
+			if self.periods[value] < 0:
+				# the orbit did not converge
+				stopping_times_ratio[value] = None
+			else:
+				stopping_times_ratio[value] = stopping_time_ratio(value, self.periods[value])
 		return stopping_times_ratio
 		
 
@@ -321,8 +812,7 @@ class CollatzProblem:
 			dict: dictionary with numbers grouped by period, e.g., same_orbit_length[10] has all
 			numbers from initial list with period equal to 10.
 		"""
-		if not self.periods:
-			self.periods = self.period()
+		self._ensure_periods()
 
 		len_dict = {}
 		for value in self.values:
@@ -336,12 +826,16 @@ class CollatzProblem:
 
 	
 	def consecutive_orbits_length(self):
-		"""Method to group consecutive numbers with the same orbit lenght. self.values must exists
+		"""Method to group consecutive numbers with the same orbit lenght. self.values must exists.
+		If self.values are contiguous the runs are found over the array of periods, see consecutive_runs.
 
 		Returns:
 			dict: dict with consecutive numbers grouped by period, e.g., consecutive_orbits_lenght[10] has all
 			consecutive numbers from initial list with period equal to 10.
 		"""
+		if is_contiguous(self.values):
+			return self.consecutive_runs()
+
 		same_len = self.same_orbit_period() # Groups values list by period
 		
 		consecutive_same_len = {}
@@ -359,6 +853,60 @@ class CollatzProblem:
 		return consecutive_same_len
 
 
+	def consecutive_runs(self):
+		"""Method to find the runs of consecutive values with the same period. self.values must be contiguous.
+
+		Returns:
+			ConsecutiveRuns: arrays with the start, lenght and period of each run.
+		"""
+		if not is_contiguous(self.values):
+			raise ValueError("values must be consecutive integers")
+		if len(self.values) == 0:
+			return consecutive_period_runs([])
+
+		if self.periods:
+			periods = [self.periods[value] for value in self.values]
+		elif self._use_batch(allow_python = True):
+			backend = 'numpy' if self.backend == 'python' else self.backend
+			periods = self._batch_metrics(('period',), backend)['period']
+		else:
+			periods = [self._ensure_periods()[value] for value in self.values]
+
+		return consecutive_period_runs(periods, self.values[0])
+
+
+	def period_statistics(self, chunk_size = 1000000):
+		"""Method to calculate the distribution of the periods of self.values chunk by chunk, without building
+		the period dictionaries. If self.function has a batch kernel (collatz_function, collatz_function_short
+		or an AffineMap) it is used, otherwise the periods are calculated one by one.
+
+		Args:
+			chunk_size (int, optional): number of values processed together. Defaults to 1000000.
+
+		Returns:
+			PeriodStatistics: histogram, records, stopping time ratio sketch and representatives of each period.
+		"""
+		statistics = aggregate.PeriodStatistics()
+		values = np.sort(np.asarray(self.values, dtype = np.int64))
+
+		for i in range(0, values.size, chunk_size):
+			chunk = values[i:i + chunk_size]
+			if self._use_batch(allow_python = True):
+				backend = 'numpy' if self.backend == 'python' else self.backend
+				metrics = batch.function_metrics_array(self.function, chunk, ('period', 'max_value', 'status'), backend,
+									self.max_steps if self.bounded else None, self.max_bits)
+				statistics.update(chunk, metrics['period'], metrics['max_value'], metrics['status'])
+			elif self.bounded:
+				results = [bounded_period(int(value), self.function, *self.args, max_steps = self.max_steps, 
+									max_bits = self.max_bits, **self.kwargs) for value in chunk]
+				statistics.update(chunk, [result.period for result in results], 
+								statuses = [affine.STATUSES.index(result.status) for result in results])
+			else:
+				periods = [period(int(value), self.function, *self.args, **self.kwargs) for value in chunk]
+				statistics.update(chunk, periods)
+
+		return statistics
+
 
 	def plot_orbits(self, function_name = 'Collatz', display_mode = 'show', label_data = False, savefig_name = None, 
 			legend = True, markers = None, title = None, figsize = (8,6), fontsize = (12,9)):
@@ -457,8 +1005,7 @@ class CollatzProblem:
 			savefig_name (str, optional): path and name to store the image. Defaults to None.
 			figsize (tuple, optional): size (x,y) of the plot. Defaults to (10,8).
 		"""
-		if self.periods is None:
-			self.periods = self.period()
+		self._ensure_periods()
 		ordered_periods = [self.periods[value] for value in self.values]
 		plot.plot_iterations(self.values, ordered_periods, display_mode = display_mode, savefig_name = None, 
 							figsize=figsize, *args, *kwargs)
\ No newline at end of file
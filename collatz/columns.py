@@ -0,0 +1,253 @@
+import io
+import os
+import json
+import operator
+from collections.abc import Mapping
+
+import numpy as np
+
+from collatz import batch, storage
+
+COLUMNS_VERSION = 1
+# Metrics stored for each block, one fixed width int64 .npy file per metric.
+COLUMNS = batch.METRICS
+
+
+def _save_npy(array, path, filename):
+	"""Saves array as filename in path atomically (see storage.atomic_write_bytes)."""
+	buffer = io.BytesIO()
+	np.save(buffer, array)
+	storage.atomic_write_bytes(buffer.getvalue(), path, filename)
+
+
+class ChunkedArray:
+	"""
+	Read only concatenation of 1-d arrays (e.g. memory-mapped blocks) that does not copy them. Integer indexing
+	and slices inside one chunk return views, the chunks can be scanned one by one with chunks.
+	"""
+	def __init__(self, chunks) -> None:
+		"""init method of ChunkedArray class
+
+		Args:
+			chunks (list): list of 1-d arrays with the same dtype.
+		"""
+		self.chunks = list(chunks)
+		self.offsets = np.cumsum([0] + [chunk.size for chunk in self.chunks])
+		self.dtype = self.chunks[0].dtype if self.chunks else np.dtype(np.int64)
+		pass
+
+
+	def __len__(self):
+		return int(self.offsets[-1])
+
+
+	@property
+	def size(self):
+		return len(self)
+
+
+	def __getitem__(self, key):
+		if isinstance(key, slice):
+			start, stop, step = key.indices(len(self))
+			if step == 1:
+				i = int(np.searchsorted(self.offsets, start, side = 'right')) - 1
+				if i < len(self.chunks) and stop <= self.offsets[i + 1]:
+					return self.chunks[i][start - self.offsets[i]:stop - self.offsets[i]]
+			return self.to_array()[key]
+
+		if key < 0:
+			key += len(self)
+		if not 0 <= key < len(self):
+			raise IndexError("index out of range")
+		i = int(np.searchsorted(self.offsets, key, side = 'right')) - 1
+		return self.chunks[i][key - self.offsets[i]]
+
+
+	def to_array(self):
+		"""Copies the chunks into one array."""
+		return np.concatenate(self.chunks) if self.chunks else np.zeros(0, dtype = self.dtype)
+
+
+	def __array__(self, dtype = None, copy = None):
+		array = self.to_array()
+		return array if dtype is None else array.astype(dtype)
+
+
+	def sum(self):
+		return sum(int(chunk.sum()) for chunk in self.chunks)
+
+
+	def min(self):
+		return min(chunk.min() for chunk in self.chunks if chunk.size)
+
+
+	def max(self):
+		return max(chunk.max() for chunk in self.chunks if chunk.size)
+
+
+class ColumnMapping(Mapping):
+	"""
+	Read only {value : metric} view of a column with the metrics of the consecutive values of a range. Each access
+	reads column[value - values.start] (and applies transform), nothing is copied.
+	"""
+	def __init__(self, values, column, transform = None) -> None:
+		"""init method of ColumnMapping class
+
+		Args:
+			values (range): consecutive values of the column.
+			column (ChunkedArray): metric of each value.
+			transform (function, optional): function called with (value, metric) on each access. Defaults to None 
+											(the metric as int).
+		"""
+		self.values = values
+		self.column = column
+		self.transform = transform
+		pass
+
+
+	def __getitem__(self, value):
+		try:
+			value = operator.index(value)
+		except TypeError:
+			raise KeyError(value) from None
+		if value not in self.values:
+			raise KeyError(value)
+		metric = int(self.column[value - self.values.start])
+		return metric if self.transform is None else self.transform(value, metric)
+
+
+	def __iter__(self):
+		return iter(self.values)
+
+
+	def __len__(self):
+		return len(self.values)
+
+
+class ColumnStore:
+	"""
+	Column store with the scalar metrics of blocks of consecutive values. Each block [begin, end] is a directory
+	root/<begin>_<end> with one .npy file per metric (see COLUMNS), that can be memory-mapped.
+	"""
+	def __init__(self, root = None, short = False) -> None:
+		"""init method of ColumnStore class
+
+		Args:
+			root (str, optional): directory of the store, created if it does not exist.
+								Defaults to storage.DEFAULT_ROOT/columns.
+			short (bool, optional): if True the metrics are of collatz_function_short, collatz_function otherwise.
+									Must match the store if it already exists. Defaults to False.
+		"""
+		self.root = os.path.abspath(os.path.expanduser(root or os.path.join(storage.DEFAULT_ROOT, "columns")))
+		os.makedirs(self.root, exist_ok = True)
+
+		meta_path = os.path.join(self.root, "columns.json")
+		if os.path.exists(meta_path):
+			with open(meta_path, 'r') as f:
+				meta = json.load(f)
+			if meta["format_version"] != COLUMNS_VERSION:
+				raise ValueError("Unsupported column store version " + str(meta["format_version"]))
+			if meta["short"] != short:
+				raise ValueError("The column store at " + self.root + " has short = " + str(meta["short"]))
+		else:
+			storage.atomic_write_bytes(storage.encode_dict({"format_version": COLUMNS_VERSION, "short": short}),
+									self.root, "columns.json")
+		self.short = short
+		pass
+
+
+	def _block_path(self, begin, end):
+		return os.path.join(self.root, str(begin) + "_" + str(end))
+
+
+	def save_block(self, begin, end, metrics):
+		"""Saves the metrics of the values [begin, end]. The files are written before the block directory is
+		renamed to its final name, so a block is either complete or absent.
+
+		Args:
+			begin (integer): first value of the block.
+			end (integer): last value of the block (inclusive).
+			metrics (dict): dictionary with COLUMNS as keys and arrays of end - begin + 1 values.
+		"""
+		path = self._block_path(begin, end)
+		tmp_path = path + ".tmp"
+		os.makedirs(tmp_path, exist_ok = True)
+		for name in COLUMNS:
+			column = np.asarray(metrics[name], dtype = np.int64)
+			if column.size != end - begin + 1:
+				raise ValueError(name + " must have " + str(end - begin + 1) + " values")
+			_save_npy(column, tmp_path, name + ".npy")
+		if os.path.exists(path):
+			for filename in os.listdir(path):
+				os.remove(os.path.join(path, filename))
+			os.rmdir(path)
+		os.replace(tmp_path, path)
+
+
+	def fill(self, begin, end, block_size = 1000000, backend = 'numpy'):
+		"""Computes the metrics of [begin, end] with the batch kernels and saves them in blocks of block_size values.
+
+		Args:
+			begin (integer): first value of the range.
+			end (integer): last value of the range (inclusive).
+			block_size (int, optional): number of values of each block. Defaults to 1000000.
+			backend (str, optional): 'numpy' or 'numba'. Defaults to 'numpy'.
+		"""
+		for values in batch.range_chunks(begin, end, block_size):
+			metrics = batch.orbit_metrics_array(values, self.short, COLUMNS, backend)
+			self.save_block(int(values[0]), int(values[-1]), metrics)
+
+
+	def list_blocks(self):
+		"""List of (begin, end) of the stored blocks, sorted by begin."""
+		blocks = []
+		for name in os.listdir(self.root):
+			parts = name.split("_")
+			if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
+				blocks.append((int(parts[0]), int(parts[1])))
+		return sorted(blocks)
+
+
+	def load_block(self, begin, end, mmap = True):
+		"""Loads the metrics of the block [begin, end].
+
+		Args:
+			mmap (bool, optional): if True the arrays are memory-mapped read only. Defaults to True.
+
+		Returns:
+			dict: dictionary with COLUMNS as keys and int64 arrays as values.
+		"""
+		path = self._block_path(begin, end)
+		return {name : np.load(os.path.join(path, name + ".npy"), mmap_mode = 'r' if mmap else None)
+				for name in COLUMNS}
+
+
+	def columns(self, begin, end, names = COLUMNS):
+		"""Metrics of the values [begin, end] as ChunkedArrays of memory-mapped slices of the blocks, nothing
+		is copied. Every value of the range must be in a stored block.
+
+		Args:
+			begin (integer): first value of the range.
+			end (integer): last value of the range (inclusive).
+			names (iterable, optional): metrics to load. Defaults to COLUMNS.
+
+		Returns:
+			dict: dictionary with names as keys and ChunkedArrays as values.
+		"""
+		chunks = {name : [] for name in names}
+		covered = begin - 1
+		for block_begin, block_end in self.list_blocks():
+			if block_end <= covered or block_begin > end:
+				continue
+			if block_begin > covered + 1:
+				break
+			block = self.load_block(block_begin, block_end)
+			first = covered + 1 - block_begin
+			last = min(end, block_end) - block_begin + 1
+			for name in names:
+				chunks[name].append(block[name][first:last])
+			covered = min(end, block_end)
+
+		if covered < end:
+			raise KeyError("values from " + str(covered + 1) + " to " + str(end) + " are not in the column store")
+		return {name : ChunkedArray(chunks[name]) for name in names}
@@ -0,0 +1,182 @@
+import os
+import sqlite3
+
+import numpy as np
+
+from collatz import batch, affine, aggregate
+
+# Columns of the results table, in insertion order.
+COLUMNS = ('n', 'period', 'stopping_time', 'max_value', 'ones_ratio', 'stopping_time_ratio', 'status')
+
+
+class ResultsDatabase:
+	"""
+	Indexed database (SQLite in WAL mode) with the scalar metrics of each value: period, stopping time, max value,
+	ones ratio and stopping time ratio (period / log(n), as collatz.stopping_time_ratio). It is filled in bulk
+	from the batch kernels and answers range queries without loading the orbits.
+	"""
+	def __init__(self, path, batch_size = 100000) -> None:
+		"""init method of ResultsDatabase class
+
+		Args:
+			path (str): path of the database file, created if it does not exist. ':memory:' for a temporary database.
+			batch_size (int, optional): number of rows inserted by each executemany. Defaults to 100000.
+		"""
+		self.path = path if path == ":memory:" else os.path.abspath(os.path.expanduser(path))
+		self.batch_size = batch_size
+		self.connection = sqlite3.connect(self.path, isolation_level = None, check_same_thread = False)
+		self.connection.execute("PRAGMA journal_mode=WAL")
+		self.connection.execute("PRAGMA synchronous=NORMAL")
+		self.connection.execute("CREATE TABLE IF NOT EXISTS results (n INTEGER PRIMARY KEY, period INTEGER, "
+								"stopping_time INTEGER, max_value INTEGER, ones_ratio REAL, stopping_time_ratio REAL, "
+								"status INTEGER)")
+		self.connection.execute("CREATE INDEX IF NOT EXISTS results_period ON results (period, n)")
+		self.connection.execute("CREATE INDEX IF NOT EXISTS results_ratio ON results (stopping_time_ratio)")
+		pass
+
+
+	def insert(self, values, metrics):
+		"""Inserts (or replaces) the metrics of values, in executemany batches inside one transaction.
+
+		Args:
+			values (array): int64 array with the values.
+			metrics (dict): output of batch.orbit_metrics_array with 'period', 'stopping_time', 'max_value',
+							'odd_steps' and 'status'.
+		"""
+		values = np.asarray(values, dtype = np.int64)
+		periods = np.asarray(metrics['period'], dtype = np.int64)
+		converged = periods >= 0
+		# orbit length is period + 1 and the last 1 counts as even, as in collatz.ones_ratio
+		ones_ratios = np.where(converged, metrics['odd_steps'] / np.maximum(periods + 1, 1), np.nan)
+		with np.errstate(divide = 'ignore', invalid = 'ignore'):
+			ratios = np.where(converged & (values > 1), periods / np.log(values), np.nan)
+
+		rows = zip(values.tolist(), np.where(converged, periods, -1).tolist(),
+					np.asarray(metrics['stopping_time']).tolist(), np.asarray(metrics['max_value']).tolist(),
+					[None if np.isnan(x) else x for x in ones_ratios.tolist()],
+					[None if np.isnan(x) else x for x in ratios.tolist()],
+					np.asarray(metrics['status']).tolist())
+
+		self.connection.execute("BEGIN")
+		try:
+			while True:
+				rows_batch = [row for _, row in zip(range(self.batch_size), rows)]
+				if not rows_batch:
+					break
+				self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", rows_batch)
+		except BaseException:
+			self.connection.execute("ROLLBACK")
+			raise
+		self.connection.execute("COMMIT")
+
+
+	def fill(self, begin, end, chunk_size = 1000000, short = False, backend = 'numpy', max_steps = None):
+		"""Computes the metrics of every value in [begin, end] with the batch kernels and inserts them.
+
+		Args:
+			begin (integer): first value of the range.
+			end (integer): last value of the range (inclusive).
+			chunk_size (int, optional): number of values computed and inserted together. Defaults to 1000000.
+			short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+			backend (str, optional): 'numpy' or 'numba'. Defaults to 'numpy'.
+			max_steps (int, optional): max number of iterations of each value. Defaults to None.
+		"""
+		for values in batch.range_chunks(begin, end, chunk_size):
+			metrics = batch.orbit_metrics_array(values, short, batch.METRICS + ('status',), backend,
+												max_steps = max_steps)
+			self.insert(values, metrics)
+
+
+	def count(self):
+		return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+	def get(self, n):
+		"""Metrics of n.
+
+		Returns:
+			dict: dictionary with COLUMNS as keys (status as its name), None if n is not in the database.
+		"""
+		row = self.connection.execute("SELECT * FROM results WHERE n = ?", (n,)).fetchone()
+		if row is None:
+			return None
+		result = dict(zip(COLUMNS, row))
+		result['status'] = affine.STATUSES[result['status']]
+		return result
+
+
+	def column(self, name, begin, end):
+		"""Values in [begin, end] stored in the database and their column name.
+
+		Returns:
+			tuple: (values, column) arrays, sorted by value.
+		"""
+		if name not in COLUMNS:
+			raise ValueError("Unknown column " + str(name))
+		rows = self.connection.execute("SELECT n, " + name + " FROM results WHERE n BETWEEN ? AND ? ORDER BY n",
+										(begin, end)).fetchall()
+		dtype = np.float64 if name.endswith('ratio') else np.int64
+		return (np.array([row[0] for row in rows], dtype = np.int64),
+				np.array([np.nan if row[1] is None else row[1] for row in rows], dtype = dtype))
+
+
+	def values_with_period(self, period, begin = 1, end = None):
+		"""Values in [begin, end] with the given period.
+
+		Returns:
+			array: int64 array with the values, sorted.
+		"""
+		end = end if end is not None else np.iinfo(np.int64).max
+		rows = self.connection.execute("SELECT n FROM results WHERE period = ? AND n BETWEEN ? AND ? ORDER BY n",
+										(period, begin, end))
+		return np.fromiter((row[0] for row in rows), dtype = np.int64)
+
+
+	def top_stopping_time_ratios(self, k, begin = 1, end = None):
+		"""k values in [begin, end] with the biggest stopping time ratio.
+
+		Returns:
+			tuple: (values, ratios) arrays, sorted by decreasing ratio.
+		"""
+		end = end if end is not None else np.iinfo(np.int64).max
+		rows = self.connection.execute("SELECT n, stopping_time_ratio FROM results WHERE stopping_time_ratio IS NOT NULL "
+										"AND n BETWEEN ? AND ? ORDER BY stopping_time_ratio DESC LIMIT ?",
+										(begin, end, k)).fetchall()
+		return (np.array([row[0] for row in rows], dtype = np.int64),
+				np.array([row[1] for row in rows], dtype = np.float64))
+
+
+	def first_with_period_above(self, period):
+		"""Smallest value in the database whose period is bigger than period.
+
+		Returns:
+			int: value, None if there is no such value.
+		"""
+		row = self.connection.execute("SELECT MIN(n) FROM results WHERE period > ?", (period,)).fetchone()
+		return row[0]
+
+
+	def records(self, kind = 'delay', begin = 1, end = None, chunk_size = 1000000):
+		"""Values of [begin, end] whose period ('delay') or max value ('path') is bigger than the one of every
+		smaller value in the database. The range is scanned chunk_size values at a time.
+
+		Returns:
+			tuple: (values, metric) arrays of the records, sorted by value.
+		"""
+		if kind not in ('delay', 'path'):
+			raise ValueError("kind must be 'delay' or 'path'")
+		end = end if end is not None else self.connection.execute("SELECT MAX(n) FROM results").fetchone()[0] or 0
+
+		records = []
+		for chunk_begin in range(begin, end + 1, chunk_size):
+			values, metric = self.column('period' if kind == 'delay' else 'max_value', chunk_begin, 
+										min(chunk_begin + chunk_size - 1, end))
+			converged = metric >= 0
+			if converged.any():
+				records = aggregate.merge_records(records, aggregate.chunk_records(values[converged], metric[converged]))
+		return (np.array([value for value, _ in records], dtype = np.int64),
+				np.array([metric for _, metric in records], dtype = np.int64))
+
+
+	def close(self):
+		self.connection.close()
@@ -1,7 +1,12 @@
+import threading
+
 import numpy as np
 
-from collatz import plot
-from scipy.optimize import newton, bisect
+from collatz.lazy import lazy_import
+
+# matplotlib, networkx and scipy are only loaded when they are used
+plot = lazy_import('collatz.plot')
+optimize = lazy_import('scipy.optimize')
 
 def orbit(x0, function, iterations, *args, **kwargs):
 	"""This function computes the orbit of a initial value x_0 over a 
@@ -179,7 +184,17 @@ def same_orbit_length(values, function, stop_iterations, *args, **kwargs):
 	return len_dict
 
 
-def mandelbrot_set(function, xrange, yrange, stop_iterations, threshold = 1, diverge_method = 'abs', julia = False, *args, **kwargs):
+# Extra outputs that mandelbrot_set can collect in the same pass.
+FRACTAL_OUTPUTS = ('final_abs', 'smooth', 'trap', 'status')
+
+# Codes of the 'status' output of mandelbrot_set.
+FRACTAL_DIVERGED = 0
+FRACTAL_BOUNDED = 1
+FRACTAL_CAP = 2
+
+
+def mandelbrot_set(function, xrange, yrange, stop_iterations, threshold = 1, diverge_method = 'abs', julia = False, *args, 
+					outputs = None, traps = (0,), dtypes = None, escape_degree = 2, periodicity_tolerance = None, **kwargs):
 	"""Function to calculate the number of iterations of a mandelbrot (or julia) set. 
 
 	Args:
@@ -204,28 +219,64 @@ def mandelbrot_set(function, xrange, yrange, stop_iterations, threshold = 1, div
 
 		julia (bool, optional): If True, returns the iterations over f(z), if false it calculates the initial constants c
 		and iterates over f(z) + c. Defaults to False.
+		outputs (iterable, optional): extra arrays computed in the same pass, any of FRACTAL_OUTPUTS:
+										'final_abs' for |z| when the point diverged (or after the last iteration),
+										'smooth' for the continuous escape value 
+												i + 1 - log(log|z| / log(threshold)) / log(escape_degree),
+												stop_iterations for the points that did not diverge,
+										'trap' for the min distance of the orbit to the points of traps,
+										'status' for FRACTAL_DIVERGED, FRACTAL_BOUNDED (cycle found by the 
+												periodicity check) or FRACTAL_CAP (stop_iterations reached).
+										Defaults to None (only the iterations are returned).
+		traps (iterable, optional): complex points of the orbit traps. Defaults to (0,).
+		dtypes (dict, optional): dtypes of the returned arrays by name ('iterations' or an output). Defaults to None
+								(int for iterations and float64 for the outputs).
+		escape_degree (float, optional): growth degree of function used by the 'smooth' output. Defaults to 2.
+		periodicity_tolerance (float, optional): if given, each orbit is compared against a reference value saved at 
+								the power of two iterations (Brent's method), and points that come back within this 
+								distance of their reference are bounded: they stop iterating and keep stop_iterations 
+								as iterations, as if they reached the cap. Defaults to None (no check).
 
 	Returns:
 		array: Numpy array with the number of iterations that f took to diverge, array has the shapes determined by 
-		third element of xrange and yrange
+		third element of xrange and yrange. If outputs is given, a tuple with the iterations and a dictionary with 
+		the outputs as keys and arrays of the same shape as values.
 	"""
+	outputs = tuple(outputs) if outputs is not None else ()
+	for name in outputs:
+		if name not in FRACTAL_OUTPUTS:
+			raise ValueError("Unknown output " + str(name) + ", options are " + str(FRACTAL_OUTPUTS))
+	dtypes = dtypes or {}
+
 	# Grid with the values to iterate over lower limit : upper limit : number of values
 	x, y = np.ogrid[xrange[0]: xrange[1]: xrange[2]*1j, yrange[0]: yrange[1]: yrange[2]*1j]
 
 	# Creation of the matrix with numbers to iterate 
 	z = np.transpose(x + y*1j)
-
-	if julia:
-		c = np.zeros(z.shape, dtype = z.dtype)
-	else:
-		c = z 
+	shape = z.shape
 
 	# If number is never reached, then divergence is assumed
-	iterations = stop_iterations + np.zeros(z.shape, dtype=np.dtype(int))
-	not_diverged = np.full(z.shape, True) # Auxiliar for numbers that haven't diverged yet
-	diverged = np.full(z.shape, False) # Auxiliar for numers that diverged.
+	iterations = np.full(shape, stop_iterations, dtype = np.dtype(int))
+	status = np.full(shape, FRACTAL_CAP, dtype = np.int8)
+	final_abs = np.zeros(shape)
+	trap_points = np.asarray(traps, dtype = complex)
+	trap = np.full(shape, np.inf)
+	if 'trap' in outputs:
+		trap = np.ascontiguousarray(np.min(np.abs(z[..., None] - trap_points), axis = -1))
+
+	# Only the points that have not diverged (nor been found bounded) are iterated, flattened with their indexes
+	active = np.arange(z.size)
+	z = z.ravel()
+	c = np.zeros(z.shape, dtype = z.dtype) if julia else z.copy()
+	reference = z.copy()
+	flat_iterations = iterations.reshape(-1)
+	flat_status = status.reshape(-1)
+	flat_final_abs = final_abs.reshape(-1)
+	flat_trap = trap.reshape(-1)
 
 	for i in range(stop_iterations):
+		if active.size == 0:
+			break
 		z = function(z, *args, **kwargs) + c #f^i(z) + c
 		if diverge_method == 'abs':
 			diverging = abs(z) > threshold
@@ -237,15 +288,259 @@ def mandelbrot_set(function, xrange, yrange, stop_iterations, threshold = 1, div
 			diverging = abs(np.imag(z)) > threshold
 		elif diverge_method == 'real_and_imag':
 			diverging = (abs(np.real(z)) > threshold) & (abs(np.imag(z)) > threshold)
-			
-		new_diverging = diverging & not_diverged
-		iterations[new_diverging] = i
-		not_diverged = np.invert(new_diverging) & not_diverged
-		
-		# prevent overflow for diverging numbers
-		diverged = diverged | new_diverging
-		z[diverged] = np.inf
-	return iterations
+
+		flat_iterations[active[diverging]] = i
+		flat_status[active[diverging]] = FRACTAL_DIVERGED
+		if outputs:
+			flat_final_abs[active[diverging]] = abs(z[diverging])
+		keep = ~diverging
+
+		if periodicity_tolerance is not None:
+			bounded = keep & (abs(z - reference) <= periodicity_tolerance)
+			flat_status[active[bounded]] = FRACTAL_BOUNDED
+			keep &= ~bounded
+
+		if not keep.all():
+			if outputs:
+				# bounded points also get their last |z| and trap distance
+				removed = ~keep & ~diverging
+				flat_final_abs[active[removed]] = abs(z[removed])
+				if 'trap' in outputs and removed.any():
+					flat_trap[active[removed]] = np.minimum(flat_trap[active[removed]], 
+												np.min(np.abs(z[removed][:, None] - trap_points), axis = -1))
+			active, z, c, reference = active[keep], z[keep], c[keep], reference[keep]
+
+		if 'trap' in outputs and active.size:
+			# only the points of the orbit before it diverges
+			flat_trap[active] = np.minimum(flat_trap[active], np.min(np.abs(z[:, None] - trap_points), axis = -1))
+
+		# Brent's method, the reference is the value at the last power of two iteration
+		if periodicity_tolerance is not None and (i + 1) & i == 0:
+			reference = z.copy()
+
+	iterations = iterations.astype(dtypes.get('iterations', iterations.dtype), copy = False)
+	if not outputs:
+		return iterations
+
+	flat_final_abs[active] = abs(z)
+	extra = {'final_abs': final_abs, 'trap': trap, 'status': status}
+	if 'smooth' in outputs:
+		log_threshold = np.log(threshold) if threshold > 1 else 1.0
+		smooth = np.full(shape, float(stop_iterations))
+		escaped = status == FRACTAL_DIVERGED
+		with np.errstate(divide = 'ignore', invalid = 'ignore'):
+			smooth[escaped] = (iterations[escaped] + 1 
+								- np.log(np.log(final_abs[escaped]) / log_threshold) / np.log(escape_degree))
+		# |z| can be inf or barely above the threshold, those points keep the integer escape time
+		bad = escaped & ~np.isfinite(smooth)
+		smooth[bad] = iterations[bad]
+		extra['smooth'] = smooth
+	default_dtypes = {'status': np.int8}
+	return iterations, {name : extra[name].astype(dtypes.get(name, default_dtypes.get(name, np.float64)), copy = False)
+						for name in outputs}
+
+
+# Labels of attraction_basins for the points that do not reach a known attractor.
+BASIN_DIVERGED = -1
+BASIN_UNRESOLVED = -2
+
+
+def attractor_points(attractors):
+	"""Flattens a list of attractors (fixed points or cycles given as sequences of points) into sorted points and
+	the index of the attractor of each point.
+
+	Returns:
+		tuple: (points, owners) float64 and int32 arrays sorted by point.
+	"""
+	points, owners = [], []
+	for index, attractor in enumerate(attractors):
+		cycle = list(attractor) if np.ndim(attractor) else [attractor]
+		points.extend(float(point) for point in cycle)
+		owners.extend([index]*len(cycle))
+	points = np.asarray(points, dtype = np.float64)
+	order = np.argsort(points, kind = 'stable')
+	return points[order], np.asarray(owners, dtype = np.int32)[order]
+
+
+def _nearest_attractor(x, points, owners, middles, tolerance):
+	"""Label of the attractor point within tolerance of each x (the nearest one, found by binary search over the 
+	middles between consecutive points), -1 if there is none."""
+	nearest = np.searchsorted(middles, x)
+	return np.where(np.abs(x - points[nearest]) <= tolerance, owners[nearest], -1)
+
+
+def attraction_basins(function, values, attractors, stop_iterations = 100, tolerance = 1e-6, threshold = 10**10, 
+					chunk_size = 2**20, *args, **kwargs):
+	"""Classifies real initial values by the attractor their orbit goes to. The values are iterated together as 
+	float64 arrays, chunk_size values at a time and only the ones still unresolved, so dense grids of 10^7 values 
+	run in bounded memory. A value is resolved at the first iteration its orbit comes within tolerance of a point 
+	of an attractor (the nearest one is found by binary search over the sorted attractor points) or when |f^i(x)|
+	is above threshold (or not finite).
+
+	Args:
+		function (function): numpy vectorized function of the DDS (e.g. collatz_extension or collatz_lines).
+		values (array): initial values.
+		attractors (iterable): attractors, each a fixed point or a sequence with the points of a cycle, e.g. the 
+								values of DDS.search_fixed_points.
+		stop_iterations (int, optional): max number of iterations. Defaults to 100.
+		tolerance (float, optional): distance to an attractor point that counts as convergence. Defaults to 1e-6.
+		threshold (float, optional): |x| above this is divergence. Defaults to 10**10.
+		chunk_size (int, optional): number of values iterated together. Defaults to 2**20.
+		*args and **kwars: parameters of the function.
+
+	Returns:
+		tuple: (labels, times) arrays with the shape of values. labels (int32) has the index of the attractor of each
+		value, BASIN_DIVERGED or BASIN_UNRESOLVED (stop_iterations reached), and times (int32) the number of 
+		iterations until the value was resolved (stop_iterations if it was not).
+	"""
+	values = np.asarray(values, dtype = np.float64)
+	points, owners = attractor_points(attractors)
+	middles = (points[1:] + points[:-1]) / 2
+
+	labels = np.full(values.size, BASIN_UNRESOLVED, dtype = np.int32)
+	times = np.full(values.size, stop_iterations, dtype = np.int32)
+	flat_values = values.reshape(-1)
+
+	for begin in range(0, values.size, chunk_size):
+		x = flat_values[begin:begin + chunk_size].copy()
+		active = np.arange(begin, begin + x.size)
+		with np.errstate(all = 'ignore'):
+			for i in range(stop_iterations + 1):
+				if points.size:
+					label = _nearest_attractor(x, points, owners, middles, tolerance)
+				else:
+					label = np.full(x.size, -1, dtype = np.int32)
+				diverged = ~(np.abs(x) <= threshold)
+				label[diverged] = BASIN_DIVERGED
+				done = diverged | (label >= 0)
+				labels[active[done]] = label[done]
+				times[active[done]] = i
+
+				keep = ~done
+				if not keep.all():
+					active, x = active[keep], x[keep]
+				if active.size == 0 or i == stop_iterations:
+					break
+				x = function(x, *args, **kwargs)
+
+	return labels.reshape(values.shape), times.reshape(values.shape)
+
+
+def lyapunov_exponent(function, fprime, values, iterations = 1000, transient = 0, parameters = None, threshold = 10**10, 
+					chunk_size = 2**20, *args, **kwargs):
+	"""Lyapunov exponents of many initial values at once: the mean of log|fprime(f^i(x))| over iterations steps of
+	the orbit of each x, after a transient of discarded steps. The orbits are iterated together as float64 arrays 
+	(chunk_size values at a time) and never stored. Values whose orbit goes above threshold (or is not finite) stop 
+	early and get nan as exponent.
+
+	With parameters, the exponents are computed in a parameter sweep: function and fprime are called as 
+	function(x, parameter, *args, **kwargs) and values and parameters are broadcast against each other, e.g. one 
+	initial value with a parameter array, or values[:, None] with parameters[None, :] for a grid.
+
+	Args:
+		function (function): numpy vectorized function of the DDS (e.g. collatz_extension).
+		fprime (function): numpy vectorized derivative of function (e.g. collatz_extension_prime).
+		values (array): initial values.
+		iterations (int, optional): number of steps whose log|fprime| is averaged. Defaults to 1000.
+		transient (int, optional): number of steps discarded before them. Defaults to 0.
+		parameters (array, optional): parameter of function of the sweep. Defaults to None (no parameter).
+		threshold (float, optional): |f^i(x)| above this is divergence. Defaults to 10**10.
+		chunk_size (int, optional): number of orbits iterated together. Defaults to 2**20.
+		*args and **kwars: parameters of the function.
+
+	Returns:
+		tuple: (exponents, steps) arrays with the broadcast shape of values and parameters: float64 exponents and the
+		int32 number of steps averaged (less than iterations if the orbit diverged).
+	"""
+	values = np.asarray(values, dtype = np.float64)
+	if parameters is not None:
+		parameters = np.asarray(parameters)
+		shape = np.broadcast_shapes(values.shape, parameters.shape)
+		parameters = np.broadcast_to(parameters, shape)
+	else:
+		shape = values.shape
+	values = np.broadcast_to(values, shape)
+	size = int(np.prod(shape))
+
+	exponents = np.full(size, np.nan)
+	steps = np.zeros(size, dtype = np.int32)
+
+	for begin in range(0, size, chunk_size):
+		active = np.arange(begin, min(begin + chunk_size, size))
+		x = values.flat[active]
+		extra = (parameters.flat[active],) if parameters is not None else ()
+		total = np.zeros(x.size)
+		with np.errstate(all = 'ignore'):
+			for i in range(transient + iterations):
+				if i >= transient:
+					total += np.log(np.abs(fprime(x, *extra, *args, **kwargs)))
+				x = function(x, *extra, *args, **kwargs)
+
+				diverged = ~(np.abs(x) <= threshold)
+				if diverged.any():
+					steps[active[diverged]] = max(i + 1 - transient, 0)
+					keep = ~diverged
+					active, x, total = active[keep], x[keep], total[keep]
+					extra = tuple(parameter[keep] for parameter in extra)
+					if active.size == 0:
+						break
+		exponents[active] = total / max(iterations, 1)
+		steps[active] = iterations
+
+	return exponents.reshape(shape), steps.reshape(shape)
+
+
+def bifurcation(function, parameters, values, iterations = 100, transient = 1000, threshold = 10**10, chunk_size = 2**20, 
+				out = None, *args, **kwargs):
+	"""Bifurcation data of a parameter sweep: iterates every initial value with every parameter as one float64 array, 
+	discards the first transient iterations and writes the next iterations points of each orbit to a float32 buffer
+	(no orbit lists nor one DDS per parameter). The parameters are processed in blocks of about chunk_size orbits, 
+	so out can be a memmap (e.g. np.lib.format.open_memmap) bigger than memory. function is called as 
+	function(x, parameter, *args, **kwargs). Orbits that go above threshold (or are not finite) stop and their 
+	remaining points are nan.
+
+	Args:
+		function (function): numpy vectorized function with the parameter as second argument.
+		parameters (array): 1-D array with the parameters of the sweep.
+		values (array): 1-D array with the initial values, used with every parameter.
+		iterations (int, optional): number of points kept of each orbit. Defaults to 100.
+		transient (int, optional): number of iterations discarded before them. Defaults to 1000.
+		threshold (float, optional): |x| above this is divergence. Defaults to 10**10.
+		chunk_size (int, optional): approximate number of orbits iterated together. Defaults to 2**20.
+		out (array, optional): C-contiguous buffer of shape (len(parameters), len(values), iterations). Defaults to 
+								None (a new float32 array).
+		*args and **kwars: parameters of the function.
+
+	Returns:
+		array: out, with out[i, j] the asymptotic points of values[j] with parameters[i].
+	"""
+	parameters = np.asarray(parameters, dtype = np.float64).reshape(-1)
+	values = np.asarray(values, dtype = np.float64).reshape(-1)
+	shape = (parameters.size, values.size, iterations)
+	if out is None:
+		out = np.empty(shape, dtype = np.float32)
+	elif out.shape != shape or not out.flags.c_contiguous:
+		raise ValueError("out must be a C-contiguous array of shape " + str(shape))
+
+	rows = max(1, chunk_size // max(values.size, 1))
+	for begin in range(0, parameters.size, rows):
+		end = min(begin + rows, parameters.size)
+		points = out[begin:end].reshape(-1, iterations)
+		points[:] = np.nan
+		active = np.arange(points.shape[0])
+		x = np.tile(values, end - begin)
+		parameter = np.repeat(parameters[begin:end], values.size)
+		with np.errstate(all = 'ignore'):
+			for i in range(transient + iterations):
+				x = function(x, parameter, *args, **kwargs)
+				keep = np.abs(x) <= threshold
+				if not keep.all():
+					active, x, parameter = active[keep], x[keep], parameter[keep]
+					if active.size == 0:
+						break
+				if i >= transient:
+					points[active, i - transient] = x
+	return out
 
 
 
@@ -278,6 +573,8 @@ class DDS:
 
 		self.orbits = None
 		self.periods = None
+		# guards the lazy fill of self.orbits when the instance is shared by threads
+		self.lock = threading.Lock()
 
 		if start == 'orbit':
 			self.orbits = self.orbit()
@@ -288,6 +585,17 @@ class DDS:
 		pass
 
 
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		del state['lock']
+		return state
+
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.lock = threading.Lock()
+
+
 	def f(self):
 		"""Method that iterates all initial values over self.function
 
@@ -318,7 +626,9 @@ class DDS:
 			false otherwise.
 		"""
 		if not self.orbits:
-			self.orbits = self.orbit()
+			with self.lock:
+				if not self.orbits:
+					self.orbits = self.orbit()
 
 		is_periodic_dict = {}
 		for value in self.values:
@@ -376,17 +686,17 @@ class DDS:
 		aux_roots_prime = lambda x: self.fprime(x, *self.args, **self.kwargs) - 1
 
 		if method == 'newton':
-			fixed_dict = {value : newton(aux_roots, value, fprime = aux_roots_prime, tol = tol, maxiter = self.stop_iterations, 
+			fixed_dict = {value : optimize.newton(aux_roots, value, fprime = aux_roots_prime, tol = tol, maxiter = self.stop_iterations, 
 							disp = False)
 							for value in self.values}
 
 		elif method == 'secant':
-			fixed_dict = {value : newton(aux_roots, x0 = value - sec_epsilon, x1 = value + sec_epsilon, tol = tol, 
+			fixed_dict = {value : optimize.newton(aux_roots, x0 = value - sec_epsilon, x1 = value + sec_epsilon, tol = tol, 
 							maxiter = self.stop_iterations, disp = False)
 							for value in self.values}
 
 		elif method == 'bisect':
-			fixed_dict = {values : bisect(aux_roots, values[0], values[1], xtol=tol, maxiter=self.stop_iterations, disp=False)
+			fixed_dict = {values : optimize.bisect(aux_roots, values[0], values[1], xtol=tol, maxiter=self.stop_iterations, disp=False)
 							for values in bisect_values}
 
 		else:
@@ -395,7 +705,8 @@ class DDS:
 		return fixed_dict
 
 	
-	def mandelbrot_set(self, xrange, yrange, threshold = 1, diverge_method = 'abs', julia = False):
+	def mandelbrot_set(self, xrange, yrange, threshold = 1, diverge_method = 'abs', julia = False, outputs = None, 
+					traps = (0,), dtypes = None, escape_degree = 2, periodicity_tolerance = None):
 		"""Function to calculate the number of iterations of a mandelbrot (or julia) set. 
 
 	Args:
@@ -418,6 +729,8 @@ class DDS:
 
 		julia (bool, optional): If True, returns the iterations over f(z), if false it calculates the initial constants c
 		and iterates over f(z) + c. Defaults to False.
+		outputs, traps, dtypes, escape_degree: extra outputs of the same pass, see dynamical.mandelbrot_set.
+		periodicity_tolerance (float, optional): stops the points whose orbit cycles, see dynamical.mandelbrot_set.
 
 	Returns:
 		array: Numpy array with the number of iterations that f took to diverge, array has the shapes determined by 
@@ -427,9 +740,83 @@ class DDS:
 		#vfunction = np.vectorize(self.function)
 
 		return mandelbrot_set(self.function, xrange, yrange, self.stop_iterations, threshold, diverge_method,
-			julia, *self.args, **self.kwargs)
+			julia, *self.args, outputs = outputs, traps = traps, dtypes = dtypes, escape_degree = escape_degree, 
+			periodicity_tolerance = periodicity_tolerance, **self.kwargs)
+
+
+	def attraction_basins(self, values = None, attractors = None, tolerance = 1e-6, threshold = 10**10, chunk_size = 2**20, 
+						method = 'newton'):
+		"""Classifies initial values by the attractor their orbit goes to, see dynamical.attraction_basins.
+
+		Args:
+			values (array, optional): initial values to classify. Defaults to None (self.values).
+			attractors (iterable, optional): fixed points or cycles (sequences of points). Cycles (e.g. 1 -> 4 -> 2 of 
+											collatz_extension) are not found by search_fixed_points and must be passed 
+											here. Defaults to None, the distinct fixed points found by 
+											self.search_fixed_points(method) from self.values.
+			tolerance, threshold, chunk_size: see dynamical.attraction_basins.
+			method (string, optional): method of search_fixed_points when attractors is None, 'secant' is used instead
+										of 'newton' if self.fprime is not set. Defaults to 'newton'.
+
+		Returns:
+			tuple: (labels, times, attractors) with the label (index of attractors, BASIN_DIVERGED or BASIN_UNRESOLVED)
+			and convergence time of each value and the list of attractors used.
+		"""
+		if attractors is None:
+			if method == 'newton' and self.fprime is None:
+				method = 'secant'
+			with np.errstate(all = 'ignore'):
+				found = [float(x) for x in self.search_fixed_points(method).values() if x is not None and np.isfinite(x)
+						and abs(self.function(x, *self.args, **self.kwargs) - x) <= tolerance]
+			attractors = []
+			for x in sorted(found):
+				if not attractors or x - attractors[-1] > tolerance:
+					attractors.append(x)
+			if not attractors:
+				raise ValueError("search_fixed_points(" + repr(method) + ") found no fixed point, pass the attractors")
+		attractors = list(attractors)
+		labels, times = attraction_basins(self.function, self.values if values is None else values, attractors, 
+										self.stop_iterations, tolerance, threshold, chunk_size, *self.args, **self.kwargs)
+		return labels, times, attractors
+
+
+	def lyapunov_exponent(self, values = None, iterations = None, transient = 0, parameters = None, threshold = 10**10, 
+						chunk_size = 2**20):
+		"""Lyapunov exponents of the initial values using self.fprime, see dynamical.lyapunov_exponent.
+
+		Args:
+			values (array, optional): initial values. Defaults to None (self.values).
+			iterations (int, optional): number of steps averaged. Defaults to None (self.iterations).
+			transient, parameters, threshold, chunk_size: see dynamical.lyapunov_exponent.
+
+		Returns:
+			tuple: (exponents, steps) arrays, see dynamical.lyapunov_exponent.
+		"""
+		if self.fprime is None:
+			raise ValueError("fprime must be set to compute Lyapunov exponents")
+		return lyapunov_exponent(self.function, self.fprime, self.values if values is None else values, 
+								self.iterations if iterations is None else iterations, transient, parameters, threshold, 
+								chunk_size, *self.args, **self.kwargs)
 
 
+	def bifurcation(self, parameters, values = None, iterations = None, transient = 1000, threshold = 10**10, 
+					chunk_size = 2**20, out = None):
+		"""Bifurcation data of self.function over parameters, see dynamical.bifurcation. self.function must take the
+		parameter as second argument, before self.args.
+
+		Args:
+			parameters (array): parameters of the sweep.
+			values (array, optional): initial values. Defaults to None (self.values).
+			iterations (int, optional): number of points kept of each orbit. Defaults to None (self.iterations).
+			transient, threshold, chunk_size, out: see dynamical.bifurcation.
+
+		Returns:
+			array: float32 array of shape (len(parameters), len(values), iterations).
+		"""
+		return bifurcation(self.function, parameters, self.values if values is None else values, 
+						self.iterations if iterations is None else iterations, transient, threshold, chunk_size, out,
+						*self.args, **self.kwargs)
+
 
 	def plot_f(self, display_mode = 'show', savefig_name = 'image.png', title = None, range = (-10,10), num = 100, 
 					figsize=(10,8),xlim = (-10,10),ylim = (-10,10)):
@@ -588,3 +975,9 @@ class DDS:
 		cmap = 'inferno', labels_size = (20, 20), ticks_size = (20, 20)):
 
 		plot.plot_fractal(set, xrange, yrange, display_mode, savefig_name, figsize, cmap, labels_size, ticks_size)
+
+
+	def plot_bifurcation(self, parameters, points, bins = (1000, 800), yrange = None, display_mode = 'show', 
+						savefig_name = 'image.png', figsize = (12,8), cmap = 'inferno', fontsize = (12,9)):
+
+		plot.plot_bifurcation(parameters, points, bins, yrange, display_mode, savefig_name, figsize, cmap, fontsize)
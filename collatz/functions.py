@@ -17,6 +17,10 @@ def collatz_function_short(n):
 
 
 def collatz_lines(x):
+	if isinstance(x, np.ndarray):
+		# vectorized version of the same lines, for the array engines of collatz.dynamical
+		n = np.floor(x)
+		return np.where(n % 2 == 0, 0.5*x*(5*n + 8) - 0.5*n*(5*n + 7), -0.5*x*(5*n+1) + 0.5*n*(5*n + 7) + 1)
 	n = math.floor(x)
 	if(n % 2 == 0):
 		return 0.5*x*(5*n + 8) - 0.5*n*(5*n + 7)
@@ -40,26 +44,90 @@ def collatz_extension_prime(x):
 
 
 
-def generate_collatz_data(num_files = 0):
-	last_begin_end = utils.load_last_begin_end()
-	begin = last_begin_end["begin"]
-	end = last_begin_end["end"]
-
-	interval = 10000
-	files_created = 0
-
-	while(files_created < num_files):
-		collatz = {}
-		begin = end + 1
-		end = end + interval
-
-		for i in range(end - begin + 1):
-			num = i + begin
-			period, orbit = utils.orbit_and_period(num)
-			collatz[num] = {"period" : period , "orbit" : orbit}
-
-		utils.save_collatz_orbit_and_period(begin, end, collatz)
-		utils.save_last_begin_end(begin, end)
+def generate_collatz_data(num_files = 0, interval = 10000, verify = False, storage = None, database = None, 
+							workers = 0, queue_size = 2, instrumentation = None):
+	"""Computes orbits and periods by blocks of interval values and saves each block in storage. Completed
+	blocks are listed in a manifest (range, checksum and format version) and every block is written atomically,
+	so the sweep can be interrupted at any time. When it restarts, gaps, duplicated and (if verify is True)
+	corrupt blocks are detected and deleted, and only the missing blocks up to the end of the last block of the
+	manifest are computed, followed by num_files new blocks.
+	Blocks are computed and written in a pipeline (see collatz.pipeline): a writer thread serializes and saves
+	each block while the next ones are computed.
+
+	Args:
+		num_files (int, optional): number of new blocks after the last saved one. Defaults to 0.
+		interval (int, optional): number of values of each block of a new manifest. Defaults to 10000.
+		verify (bool, optional): if True, the checksum of every saved block is checked. Defaults to False.
+		storage (Storage, optional): storage backend (see collatz.storage). Defaults to the default storage.
+		database (ResultsDatabase, optional): if given, the metrics of each new block are also inserted in it 
+											(see collatz.database). Defaults to None.
+		workers (int, optional): number of processes that compute blocks, 0 computes them in this process. 
+								Defaults to 0.
+		queue_size (int, optional): max number of computed blocks waiting to be written. Defaults to 2.
+		instrumentation (Instrumentation, optional): if given, the compute, serialize and write stages are timed,
+													blocks already saved are counted as hits of the 'blocks' cache 
+													and the max orbit length is tracked (see collatz.instrument).
+													Defaults to None.
+
+	Returns:
+		PipelineMetrics: time the computation waited on the writes and the writes waited on the computation.
+	"""
+	from collatz.pipeline import run_pipeline
+	from collatz.storage import get_default_storage, encode_dict
+
+	storage = storage or get_default_storage()
+	manifest = utils.load_manifest(storage)
+	if manifest is None:
+		manifest = utils.manifest_from_storage(interval, storage)
+
+	# the run target counts every block, so dropped blocks at the end are computed again before the new ones
+	last_end = max([block["end"] for block in manifest["blocks"]], default = 0)
+	report = utils.check_manifest(manifest, verify, storage)
+	for block in report["duplicates"]:
+		print("Duplicated block from " + str(block["begin"]) + " to " + str(block["end"]) + " removed from manifest")
+		manifest["blocks"].remove(block)
+	for block in report["corrupt"]:
+		print("Corrupt block from " + str(block["begin"]) + " to " + str(block["end"]) + " will be recomputed")
+		manifest["blocks"].remove(block)
+	kept = {(block["begin"], block["end"]) for block in manifest["blocks"]}
+	for block in report["duplicates"] + report["corrupt"]:
+		if (block["begin"], block["end"]) not in kept:
+			# otherwise loaders that list the stored blocks would still read it
+			storage.delete_block(block["begin"], block["end"])
+	if report["duplicates"] or report["corrupt"]:
+		utils.save_manifest(manifest, storage)
+
+	blocks = utils.missing_blocks(manifest, last_end + num_files*manifest["interval"])
+
+	if instrumentation is not None:
+		instrumentation.cache_hit('blocks', len(manifest["blocks"]))
+		instrumentation.cache_miss('blocks', len(blocks))
+
+	last_end = [last_end]
+	def write_block(begin, end, collatz):
+		# block, manifest and last block are committed together on transactional backends
+		if instrumentation is None:
+			data = encode_dict(collatz)
+		else:
+			with instrumentation.stage('serialize'):
+				data = encode_dict(collatz)
+		with storage.transaction():
+			if instrumentation is None:
+				checksum = storage.save_block_bytes(begin, end, data)
+			else:
+				with instrumentation.stage('write'):
+					checksum = storage.save_block_bytes(begin, end, data)
+			utils.record_block(manifest, begin, end, utils.make_dict_filename(begin, end), checksum)
+			utils.save_manifest(manifest, storage)
+			if end > last_end[0]:
+				last_end[0] = end
+				utils.save_last_begin_end(begin, end, storage)
+		if database is not None:
+			database.fill(begin, end)
+		if instrumentation is not None:
+			instrumentation.observe_orbit_length(max(value["period"] for value in collatz.values()))
+			instrumentation.add_values(end - begin + 1)
 		print("Saved orbits and periods from " + str(begin) + " to " + str(end))
 
-		files_created += 1
\ No newline at end of file
+	return run_pipeline(blocks, write_block, workers = workers, queue_size = queue_size, 
+						instrumentation = instrumentation)
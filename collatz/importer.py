@@ -0,0 +1,172 @@
+import os
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from collatz import affine, batch, codec, storage as storage_backends
+from collatz.pipeline import worker_pool
+
+try:
+	import orjson
+	HAS_ORJSON = True
+except ImportError:
+	orjson = None
+	HAS_ORJSON = False
+
+
+def _loads(data):
+	"""Parses json bytes with orjson if it is installed, json otherwise."""
+	return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+
+def block_metrics(begin, end, orbits):
+	"""Scalar metrics of the orbits of [begin, end], the same metrics as batch.orbit_metrics_array.
+
+	Args:
+		begin (integer): first value of the block.
+		end (integer): last value of the block (inclusive).
+		orbits (dict): dictionary with the values (int) as keys and their orbits (list) as values.
+
+	Returns:
+		dict: dictionary with batch.METRICS as keys and int64 arrays as values.
+	"""
+	size = end - begin + 1
+	metrics = {name : np.zeros(size, dtype = np.int64) for name in batch.METRICS}
+	for i, n in enumerate(range(begin, end + 1)):
+		orbit = orbits[n]
+		metrics['period'][i] = len(orbit) - 1
+		# saturated like batch.orbit_metrics_array, the orbit can grow beyond int64
+		metrics['max_value'][i] = min(max(orbit), np.iinfo(np.int64).max)
+		metrics['odd_steps'][i] = sum(value & 1 for value in orbit[:-1])
+		stopping = next((k for k in range(1, len(orbit)) if orbit[k] <= n), 0)
+		if n == 1:
+			# the orbit of 1 is [1], its stopping time is the length of the cycle 1, 4, 2
+			stopping = affine.AffineMap().metrics(1)[2]
+		metrics['stopping_time'][i] = stopping
+	return metrics
+
+
+def parse_legacy_file(path, checkpoint_every = codec.DEFAULT_CHECKPOINT_EVERY, with_metrics = True):
+	"""Parses a collatz_<begin>_<end>.json file saved by save_dict_json and checks that it has every value of
+	the range, with orbits that start at the value, end at 1 and match the period.
+
+	Args:
+		path (str): path of the file.
+		checkpoint_every (int, optional): checkpoints of the encoded orbits (see codec).
+										Defaults to codec.DEFAULT_CHECKPOINT_EVERY.
+		with_metrics (bool, optional): if True the column metrics are also computed. Defaults to True.
+
+	Returns:
+		tuple: (begin, end, encoded block bytes, metrics dict or None, size of the file in bytes).
+	"""
+	filename = os.path.basename(path)
+	block = storage_backends.parse_block_filename(filename)
+	if block is None:
+		raise ValueError(filename + " is not a collatz_<begin>_<end>.json file")
+	begin, end = block
+	with open(path, 'rb') as f:
+		data = f.read()
+	dictionary = {int(key) : value for key, value in _loads(data).items()}
+
+	if sorted(dictionary) != list(range(begin, end + 1)):
+		raise ValueError("values of the file do not match the range " + str(begin) + "-" + str(end))
+	for n, value in dictionary.items():
+		orbit = value["orbit"]
+		if orbit[0] != n or orbit[-1] != 1 or value["period"] != len(orbit) - 1:
+			raise ValueError("invalid orbit of " + str(n))
+
+	encoded = codec.encode_block(dictionary, checkpoint_every)
+	metrics = None
+	if with_metrics:
+		metrics = block_metrics(begin, end, {n : value["orbit"] for n, value in dictionary.items()})
+	return begin, end, encoded, metrics, len(data)
+
+
+def _parse_task(task):
+	"""Worker of import_legacy_files, errors are returned instead of raised so one file does not stop the import."""
+	path, checkpoint_every, with_metrics = task
+	try:
+		return path, parse_legacy_file(path, checkpoint_every, with_metrics), None
+	except Exception as error:
+		return path, None, repr(error)
+
+
+def _bounded_results(pool, tasks, max_pending):
+	"""Results of _parse_task over tasks in order, with at most max_pending tasks submitted and not consumed."""
+	pending = deque()
+	tasks = iter(tasks)
+	for task in tasks:
+		pending.append(pool.apply_async(_parse_task, (task,)))
+		if len(pending) == max_pending:
+			break
+	while pending:
+		result = pending.popleft().get()
+		task = next(tasks, None)
+		if task is not None:
+			pending.append(pool.apply_async(_parse_task, (task,)))
+		yield result
+
+
+def import_legacy_files(source, storage = None, column_store = None, processes = None,
+						checkpoint_every = codec.DEFAULT_CHECKPOINT_EVERY):
+	"""Imports the collatz_<begin>_<end>.json files of a directory into the compact formats: the orbits are saved
+	encoded (see codec) in storage and, if column_store is given, their metrics in the column store. Files are
+	parsed in parallel, one file at a time per worker, and only the encoded blocks are sent back, so the memory
+	of each worker is bounded by one file. At most 2*processes files are parsed ahead of the writes, so parsed
+	blocks do not pile up when the writes are slower than the workers.
+
+	Args:
+		source (str): directory with the json files.
+		storage (Storage, optional): storage for the encoded orbits. Defaults to the default storage.
+		column_store (ColumnStore, optional): column store for the metrics. Defaults to None.
+		processes (int, optional): number of worker processes, 1 parses in this process. Defaults to os.cpu_count().
+		checkpoint_every (int, optional): checkpoints of the encoded orbits. Defaults to codec.DEFAULT_CHECKPOINT_EVERY.
+
+	Returns:
+		dict: report with the number of "files", "values" and "bytes" imported, "seconds", "values_per_second",
+		"mb_per_second" and the list of "corrupt" files as (path, error) tuples.
+	"""
+	storage = storage or storage_backends.get_default_storage()
+	processes = processes or os.cpu_count()
+	paths = [os.path.join(source, storage_backends.make_block_filename(begin, end))
+			for begin, end in storage_backends.list_block_files(source)]
+	tasks = [(path, checkpoint_every, column_store is not None) for path in paths]
+
+	report = {"files": 0, "values": 0, "bytes": 0, "corrupt": []}
+	start = time.perf_counter()
+
+	if processes == 1:
+		results = map(_parse_task, tasks)
+		pool = None
+	else:
+		pool = worker_pool(processes)
+		results = _bounded_results(pool, tasks, 2*processes)
+
+	try:
+		for path, result, error in results:
+			if error is not None:
+				report["corrupt"].append((path, error))
+				print("Corrupt file " + path + ": " + error)
+				continue
+			begin, end, encoded, metrics, size = result
+			storage.save_encoded_block(begin, end, encoded)
+			if column_store is not None:
+				column_store.save_block(begin, end, metrics)
+			report["files"] += 1
+			report["values"] += end - begin + 1
+			report["bytes"] += size
+	finally:
+		if pool is not None:
+			pool.close()
+			pool.join()
+
+	seconds = time.perf_counter() - start
+	report["seconds"] = seconds
+	report["values_per_second"] = report["values"] / seconds if seconds else 0.0
+	report["mb_per_second"] = report["bytes"] / 1e6 / seconds if seconds else 0.0
+	print("Imported " + str(report["files"]) + " files (" + str(report["values"]) + " values) in "
+		+ "{:.2f}".format(seconds) + " s, " + "{:.0f}".format(report["values_per_second"]) + " values/s, "
+		+ "{:.2f}".format(report["mb_per_second"]) + " MB/s, " + str(len(report["corrupt"])) + " corrupt files")
+	return report
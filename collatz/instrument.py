@@ -0,0 +1,137 @@
+import os
+import time
+from contextlib import contextmanager
+
+from collatz import storage
+
+
+class Instrumentation:
+	"""
+	Timers, counters and progress of a long run (generate_collatz_data, CollatzProblem). It is passed explicitly
+	as instrumentation to the functions that support it, which skip every measure when it is None, so there is no
+	overhead when it is disabled.
+	"""
+	def __init__(self, total = None, progress = None, use_tqdm = False, prometheus_path = None) -> None:
+		"""init method of Instrumentation class
+
+		Args:
+			total (int, optional): number of values expected, used by the progress bar. Defaults to None.
+			progress (function, optional): function called with this instance each time values are done. Defaults to None.
+			use_tqdm (bool, optional): if True shows a tqdm progress bar (tqdm must be installed). Defaults to False.
+			prometheus_path (str, optional): if given, the measures are written to this file (see dump_prometheus)
+											each time values are done. Defaults to None.
+		"""
+		self.stage_seconds = {}
+		self.stage_calls = {}
+		self.values = 0
+		self.cache_hits = {}
+		self.cache_misses = {}
+		self.max_orbit_length = 0
+		self.total = total
+		self.progress = progress
+		self.prometheus_path = prometheus_path
+		self.start_time = time.perf_counter()
+		self.bar = None
+		if use_tqdm:
+			from tqdm import tqdm
+			self.bar = tqdm(total = total, unit = 'values')
+		pass
+
+
+	@contextmanager
+	def stage(self, name):
+		"""Context manager that adds the time spent inside it to the stage name (e.g. 'compute', 'serialize', 'write')."""
+		start = time.perf_counter()
+		try:
+			yield self
+		finally:
+			self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + time.perf_counter() - start
+			self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+
+
+	def add_values(self, count):
+		"""Counts count values as done, updates the progress bar, calls progress and dumps the measures."""
+		self.values += count
+		if self.bar is not None:
+			self.bar.update(count)
+		if self.progress is not None:
+			self.progress(self)
+		if self.prometheus_path is not None:
+			self.dump_prometheus(self.prometheus_path)
+
+
+	def cache_hit(self, name, count = 1):
+		self.cache_hits[name] = self.cache_hits.get(name, 0) + count
+
+
+	def cache_miss(self, name, count = 1):
+		self.cache_misses[name] = self.cache_misses.get(name, 0) + count
+
+
+	def cache_hit_rate(self, name):
+		"""Fraction of hits of the cache name, None if it was never used."""
+		total = self.cache_hits.get(name, 0) + self.cache_misses.get(name, 0)
+		return self.cache_hits.get(name, 0) / total if total else None
+
+
+	def observe_orbit_length(self, length):
+		"""Keeps the max orbit length (period) seen."""
+		if length > self.max_orbit_length:
+			self.max_orbit_length = length
+
+
+	def elapsed(self):
+		return time.perf_counter() - self.start_time
+
+
+	def values_per_second(self):
+		elapsed = self.elapsed()
+		return self.values / elapsed if elapsed else 0.0
+
+
+	def summary(self):
+		"""Snapshot of the measures.
+
+		Returns:
+			dict: dictionary with the measures.
+		"""
+		return {"elapsed": self.elapsed(), "values": self.values, "values_per_second": self.values_per_second(),
+				"stage_seconds": dict(self.stage_seconds), "stage_calls": dict(self.stage_calls),
+				"cache_hit_rates": {name : self.cache_hit_rate(name) for name in set(self.cache_hits) | set(self.cache_misses)},
+				"max_orbit_length": self.max_orbit_length}
+
+
+	def to_prometheus(self, prefix = "collatz"):
+		"""Measures in the Prometheus text exposition format.
+
+		Returns:
+			str: text with one sample per line.
+		"""
+		lines = ["# TYPE " + prefix + "_stage_seconds_total counter"]
+		for name, seconds in sorted(self.stage_seconds.items()):
+			lines.append(prefix + '_stage_seconds_total{stage="' + name + '"} ' + repr(seconds))
+		lines.append("# TYPE " + prefix + "_stage_calls_total counter")
+		for name, calls in sorted(self.stage_calls.items()):
+			lines.append(prefix + '_stage_calls_total{stage="' + name + '"} ' + str(calls))
+		lines.append("# TYPE " + prefix + "_cache_requests_total counter")
+		for name in sorted(set(self.cache_hits) | set(self.cache_misses)):
+			lines.append(prefix + '_cache_requests_total{cache="' + name + '",result="hit"} ' + str(self.cache_hits.get(name, 0)))
+			lines.append(prefix + '_cache_requests_total{cache="' + name + '",result="miss"} ' + str(self.cache_misses.get(name, 0)))
+		lines.append("# TYPE " + prefix + "_values_total counter")
+		lines.append(prefix + "_values_total " + str(self.values))
+		lines.append("# TYPE " + prefix + "_values_per_second gauge")
+		lines.append(prefix + "_values_per_second " + repr(self.values_per_second()))
+		lines.append("# TYPE " + prefix + "_max_orbit_length gauge")
+		lines.append(prefix + "_max_orbit_length " + str(self.max_orbit_length))
+		return "\n".join(lines) + "\n"
+
+
+	def dump_prometheus(self, path, prefix = "collatz"):
+		"""Writes to_prometheus atomically to the file path, e.g. for the node exporter textfile collector."""
+		directory, filename = os.path.split(os.path.abspath(path))
+		storage.atomic_write_bytes(self.to_prometheus(prefix).encode(), directory, filename)
+
+
+	def close(self):
+		if self.bar is not None:
+			self.bar.close()
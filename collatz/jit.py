@@ -0,0 +1,122 @@
+import numpy as np
+
+from collatz import batch, affine
+
+try:
+	import numba
+	HAS_NUMBA = True
+except ImportError:
+	numba = None
+	HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+	@numba.njit(parallel = True, cache = True)
+	def _metrics_kernel(values, short, q, r, limit, max_steps, detect_cycles, period, stopping, max_value, 
+						odd_steps, status, overflow):
+		"""Iterates each value on its own lane. Lanes that would overflow int64 are flagged in overflow.
+		max_steps < 0 means no limit."""
+		for i in numba.prange(values.size):
+			n = values[i]
+			if n == 1:
+				overflow[i] = True
+				continue
+
+			n0 = n
+			steps = 0
+			stop = 0
+			peak = n
+			odd = 0
+			reference = n
+			code = 3
+			while max_steps < 0 or steps < max_steps:
+				if n0 & 1:
+					if n0 > limit:
+						overflow[i] = True
+						break
+					n0 = q*n0 + r
+					if short:
+						n0 >>= 1
+					odd += 1
+				else:
+					n0 >>= 1
+				steps += 1
+
+				if n0 > peak:
+					peak = n0
+				if stop == 0 and n0 <= n:
+					stop = steps
+
+				if n0 == 1:
+					code = 0
+					break
+				if detect_cycles:
+					if n0 == reference:
+						code = 1
+						break
+					# Brent's method, the value is saved at the power of two steps
+					if steps & (steps - 1) == 0:
+						reference = n0
+
+			period[i] = steps if code == 0 else -1
+			stopping[i] = stop
+			max_value[i] = peak
+			odd_steps[i] = odd
+			status[i] = code
+
+
+def available():
+	"""Checks if the numba backend can be used.
+
+	Returns:
+		bool: True if numba is installed.
+	"""
+	return HAS_NUMBA
+
+
+def orbit_metrics_array(values, short = False, metrics = batch.METRICS, q = 3, r = 1, max_steps = None, 
+						max_bits = affine.DEFAULT_MAX_BITS):
+	"""Computes orbit metrics of many values with a numba kernel that runs the values in parallel.
+	Values whose orbit overflows int64 are computed with python integers. Same interface as
+	batch.orbit_metrics_array.
+
+	Args:
+		values (array-like): positive integers to iterate.
+		short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+		metrics (iterable, optional): names of the metrics to compute, any of 'period', 'stopping_time',
+									'max_value', 'odd_steps' and 'status'. Defaults to batch.METRICS.
+		q (int, optional): multiplier of odd values. Defaults to 3.
+		r (int, optional): constant added to odd values. Defaults to 1.
+		max_steps (int, optional): max number of iterations of each value. Defaults to None (no limit).
+		max_bits (int, optional): max bit length of the values iterated with python integers. 
+								Defaults to affine.DEFAULT_MAX_BITS.
+
+	Returns:
+		dict: dictionary with metric names as keys and int64 arrays (same shape as values) as values.
+	"""
+	if not HAS_NUMBA:
+		raise ImportError("numba is required for the numba backend")
+
+	n = np.ascontiguousarray(np.asarray(values, dtype = np.int64).ravel())
+	if n.size and n.min() < 1:
+		raise ValueError("values must be positive integers")
+
+	period = np.zeros(n.shape, dtype = np.int64)
+	stopping = np.zeros(n.shape, dtype = np.int64)
+	max_value = np.zeros(n.shape, dtype = np.int64)
+	odd_steps = np.zeros(n.shape, dtype = np.int64)
+	status = np.zeros(n.shape, dtype = np.int8)
+	overflow = np.zeros(n.shape, dtype = np.bool_)
+
+	limit = (int(np.iinfo(np.int64).max) - abs(r)) // q
+	_metrics_kernel(n, short, q, r, limit, -1 if max_steps is None else max_steps, (q, r) != (3, 1), 
+					period, stopping, max_value, odd_steps, status, overflow)
+
+	for i in np.flatnonzero(overflow):
+		status[i], period[i], stopping[i], max_value[i], odd_steps[i] = batch._scalar_fallback(int(n[i]), q, r, short, 
+																						max_steps, max_bits)
+
+	shape = np.shape(values)
+	result = {'period': period, 'stopping_time': stopping, 'max_value': max_value, 'odd_steps': odd_steps, 
+			'status': status}
+	return {name : result[name].reshape(shape) for name in metrics}
@@ -0,0 +1,40 @@
+import sys
+import types
+import importlib
+import importlib.util
+
+
+class _DeferredModule(types.ModuleType):
+	"""Placeholder of a submodule whose package is not imported yet, the module is imported on the first
+	attribute access and every access is forwarded to it."""
+	def __getattr__(self, attribute):
+		return getattr(importlib.import_module(self.__name__), attribute)
+
+
+def lazy_import(name):
+	"""Module name that is executed on the first attribute access, so heavy dependencies (matplotlib, networkx,
+	scipy) are only loaded by the code that uses them. If the module is already imported it is returned as is.
+
+	Args:
+		name (str): absolute name of the module, e.g. 'collatz.plot'.
+
+	Returns:
+		module: lazy module.
+	"""
+	if name in sys.modules:
+		return sys.modules[name]
+
+	parent = name.rpartition('.')[0]
+	if parent and parent not in sys.modules:
+		# finding the spec of name would import its package (e.g. scipy for scipy.optimize)
+		return _DeferredModule(name)
+
+	spec = importlib.util.find_spec(name)
+	if spec is None:
+		raise ImportError("No module named " + repr(name), name = name)
+	loader = importlib.util.LazyLoader(spec.loader)
+	spec.loader = loader
+	module = importlib.util.module_from_spec(spec)
+	sys.modules[name] = module
+	loader.exec_module(module)
+	return module
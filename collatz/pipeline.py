@@ -0,0 +1,168 @@
+import time
+import queue
+import threading
+import multiprocessing
+from collections import deque
+
+# Marks the end of the blocks in the write queue.
+_DONE = None
+
+
+def compute_orbits_block(block):
+	"""Computes the orbits and periods of the values of block, as saved by generate_collatz_data.
+
+	Args:
+		block (tuple): (begin, end) of the block.
+
+	Returns:
+		tuple: (begin, end, dictionary with values as keys and {"period", "orbit"} as values).
+	"""
+	from collatz.collatz import orbit_and_period
+	from collatz.functions import collatz_function
+
+	begin, end = block
+	collatz = {}
+	for num in range(begin, end + 1):
+		period, orbit = orbit_and_period(num, collatz_function)
+		collatz[num] = {"period" : period , "orbit" : orbit}
+	return begin, end, collatz
+
+
+class PipelineMetrics:
+	"""
+	Times of a pipelined run. compute_wait is the time the compute side was blocked because the write queue
+	was full (compute waits on I/O) and write_wait is the time the writer was idle because the queue was
+	empty (I/O waits on compute).
+	"""
+	def __init__(self) -> None:
+		"""init method of PipelineMetrics class"""
+		self.blocks = 0
+		self.compute_wait = 0.0
+		self.write_wait = 0.0
+		self.write_time = 0.0
+		self.max_queue_size = 0
+		self.seconds = 0.0
+		pass
+
+
+	def __repr__(self):
+		return ("PipelineMetrics(blocks=" + str(self.blocks) + ", seconds=" + "{:.3f}".format(self.seconds)
+				+ ", compute_wait=" + "{:.3f}".format(self.compute_wait) + ", write_wait="
+				+ "{:.3f}".format(self.write_wait) + ", write_time=" + "{:.3f}".format(self.write_time)
+				+ ", max_queue_size=" + str(self.max_queue_size) + ")")
+
+
+	def as_dict(self):
+		return {"blocks": self.blocks, "seconds": self.seconds, "compute_wait": self.compute_wait,
+				"write_wait": self.write_wait, "write_time": self.write_time, "max_queue_size": self.max_queue_size}
+
+
+def worker_pool(processes):
+	"""Pool of processes started with forkserver (spawn where it is not available) instead of fork. The process
+	that creates the pool may run threads (a pipeline writer, the thread pool of the numba kernels) and forking it
+	can leave the locks of those threads held forever in the workers.
+
+	Args:
+		processes (int): number of worker processes.
+
+	Returns:
+		multiprocessing.pool.Pool: pool of workers, the functions sent to it must be module level functions.
+	"""
+	method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+	return multiprocessing.get_context(method).Pool(processes)
+
+
+def _writer(write_queue, write_block, metrics, errors):
+	"""Writer thread: takes computed blocks from write_queue and writes them until _DONE."""
+	while True:
+		start = time.perf_counter()
+		item = write_queue.get()
+		metrics.write_wait += time.perf_counter() - start
+		if item is _DONE:
+			return
+		if errors:
+			# a previous write failed, the rest of the blocks are drained without writing
+			continue
+		start = time.perf_counter()
+		try:
+			write_block(*item)
+		except BaseException as error:
+			errors.append(error)
+		else:
+			metrics.blocks += 1
+		metrics.write_time += time.perf_counter() - start
+
+
+def run_pipeline(blocks, write_block, compute_block = compute_orbits_block, workers = 0, queue_size = 2, 
+				instrumentation = None):
+	"""Computes blocks and writes them in a separate thread, so the computation of the next blocks overlaps
+	the serialization and sync of the previous ones. Blocks are written in order. At most queue_size computed
+	blocks wait to be written and at most workers blocks are being computed, so memory does not grow when the
+	writes are slower than the computation (backpressure).
+
+	Args:
+		blocks (list): list of (begin, end) blocks.
+		write_block (function): function called by the writer thread with (begin, end, data) of each block.
+		compute_block (function, optional): function that returns (begin, end, data) of a (begin, end) block, must be
+											a module level function if workers > 0. Defaults to compute_orbits_block.
+		workers (int, optional): number of compute processes, 0 computes in this thread. Defaults to 0.
+		queue_size (int, optional): max number of computed blocks waiting to be written. Defaults to 2.
+		instrumentation (Instrumentation, optional): if given, the computation (or the wait for the workers) is timed
+													as the 'compute' stage. Defaults to None.
+
+	Returns:
+		PipelineMetrics: times of the run.
+	"""
+	metrics = PipelineMetrics()
+	errors = []
+	write_queue = queue.Queue(maxsize = queue_size)
+	writer = threading.Thread(target = _writer, args = (write_queue, write_block, metrics, errors), daemon = True)
+
+	def put(item):
+		start = time.perf_counter()
+		write_queue.put(item)
+		metrics.compute_wait += time.perf_counter() - start
+		metrics.max_queue_size = max(metrics.max_queue_size, write_queue.qsize())
+
+	start = time.perf_counter()
+	pool = worker_pool(workers) if workers > 0 else None
+	writer.start()
+	try:
+		if pool is None:
+			for block in blocks:
+				if errors:
+					break
+				if instrumentation is None:
+					put(compute_block(block))
+				else:
+					with instrumentation.stage('compute'):
+						result = compute_block(block)
+					put(result)
+		else:
+			pending = deque()
+			tasks = iter(blocks)
+			for block in tasks:
+				pending.append(pool.apply_async(compute_block, (block,)))
+				if len(pending) == workers:
+					break
+			while pending and not errors:
+				if instrumentation is None:
+					result = pending.popleft().get()
+				else:
+					with instrumentation.stage('compute'):
+						result = pending.popleft().get()
+				block = next(tasks, None)
+				if block is not None:
+					pending.append(pool.apply_async(compute_block, (block,)))
+				put(result)
+	finally:
+		write_queue.put(_DONE)
+		writer.join()
+		if pool is not None:
+			pool.terminate()
+			pool.join()
+	metrics.seconds = time.perf_counter() - start
+
+	if errors:
+		raise errors[0]
+	return metrics
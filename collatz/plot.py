@@ -375,4 +375,79 @@ def plot_fractal(mandelbrot_set, xrange, yrange, display_mode = 'show', savefig_
 	if display_mode == 'show':
 		plt.show()
 	else:
-		plt.savefig(savefig_name)
\ No newline at end of file
+		plt.savefig(savefig_name)
+
+def plot_period_histogram(histogram, display_mode = 'show', savefig_name = 'image.png', title = '', figsize = (10,8), 
+		fontsize = (12,9), *args, **kwargs):
+
+	periods = np.flatnonzero(histogram)
+
+	fig = plt.figure(figsize=figsize)
+	ax = fig.add_subplot(1, 1, 1)
+	ax.set_title(title, fontsize = figsize[0]*2)
+	ax.grid()
+
+	plt.bar(periods, np.asarray(histogram)[periods], *args, **kwargs)
+	plt.xlabel("Periodo", fontsize = fontsize[0])
+	plt.ylabel("Cantidad de valores", fontsize = fontsize[1])
+	plt.xticks(fontsize = fontsize[0])
+	plt.yticks(fontsize = fontsize[1])
+
+	if display_mode == 'show':
+		plt.show()
+	else:
+		plt.savefig(savefig_name)
+
+
+def bifurcation_density(parameters, points, bins = (1000, 800), yrange = None, chunk_size = 2**24):
+	"""Counts the points of a bifurcation buffer (see dynamical.bifurcation) in a bins[0] x bins[1] grid of 
+	parameter x value cells, a block of parameters at a time so memmap buffers are not loaded at once.
+
+	Returns:
+		tuple: (density, yrange) with the int64 counts of shape (bins[1], bins[0]) and the value range used.
+	"""
+	parameters = np.asarray(parameters, dtype = np.float64).reshape(-1)
+	points_per_row = int(np.prod(points.shape[1:]))
+	rows = max(1, chunk_size // max(points_per_row, 1))
+	if yrange is None:
+		low, high = np.inf, -np.inf
+		for begin in range(0, parameters.size, rows):
+			block = np.asarray(points[begin:begin + rows])
+			if np.isfinite(block).any():
+				low, high = min(low, np.nanmin(block)), max(high, np.nanmax(block))
+		yrange = (float(low), float(high)) if low <= high else (0.0, 1.0)
+
+	xbins, ybins = bins
+	pmin, pmax = parameters.min(), parameters.max()
+	pscale = xbins / (pmax - pmin) if pmax > pmin else 0.0
+	yscale = ybins / (yrange[1] - yrange[0]) if yrange[1] > yrange[0] else 0.0
+	density = np.zeros(xbins*ybins, dtype = np.int64)
+	for begin in range(0, parameters.size, rows):
+		block = np.asarray(points[begin:begin + rows], dtype = np.float64).reshape(-1, points_per_row)
+		ix = np.minimum(((parameters[begin:begin + rows] - pmin)*pscale).astype(np.int64), xbins - 1)
+		inside = (block >= yrange[0]) & (block <= yrange[1])
+		iy = np.minimum(((block[inside] - yrange[0])*yscale).astype(np.int64), ybins - 1)
+		ix = np.broadcast_to(ix[:, None], block.shape)[inside]
+		density += np.bincount(iy*xbins + ix, minlength = xbins*ybins)
+	return density.reshape(ybins, xbins), yrange
+
+
+def plot_bifurcation(parameters, points, bins = (1000, 800), yrange = None, display_mode = 'show', savefig_name = 'image.png', 
+		figsize = (12,8), cmap = 'inferno', fontsize = (12,9)):
+
+	density, yrange = bifurcation_density(parameters, points, bins, yrange)
+
+	fig = plt.figure(figsize=figsize)
+	ax = fig.add_subplot(1, 1, 1)
+	ax.imshow(np.log1p(density), cmap = cmap, origin = 'lower', aspect = 'auto', interpolation = 'nearest',
+			extent = (np.min(parameters), np.max(parameters), yrange[0], yrange[1]))
+
+	plt.xlabel("Parametro", fontsize = fontsize[0])
+	plt.ylabel("x", fontsize = fontsize[1])
+	plt.xticks(fontsize = fontsize[0])
+	plt.yticks(fontsize = fontsize[1])
+
+	if display_mode == 'show':
+		plt.show()
+	else:
+		plt.savefig(savefig_name)
@@ -0,0 +1,152 @@
+import os
+import json
+from bisect import bisect_right
+
+from collatz import storage
+
+KINDS = ('delay', 'path')
+
+
+def _step(n, short):
+	"""One iteration of collatz_function (or collatz_function_short if short)."""
+	if n % 2 == 0:
+		return n // 2
+	elif short:
+		return (3*n + 1) // 2
+	else:
+		return 3*n + 1
+
+
+def can_be_record(n, kind = 'delay', is_record = None):
+	"""function that sieves values that provably can not be records. The rules hold for both
+	collatz_function and collatz_function_short:
+		- delay: an even n = 2m has delay(m) + 1, so it is a record only if m is a record.
+		  8k + 5 (k >= 1) reaches 6k + 4 (3k + 2 on the short map) in the same number of steps as 8k + 4.
+		- path: an even n > 2 never goes higher than n - 1 or n / 2. 4k + 1 (k >= 1) goes up to
+		  12k + 4 at most before dropping below itself, and 4k - 1 already reaches 18k - 2.
+
+	Args:
+		n (integer): value to check.
+		kind (str, optional): 'delay' for period records, 'path' for max value records. Defaults to 'delay'.
+		is_record (function, optional): function that tells if a value smaller than n is a record, used for
+										even values of delay records. Defaults to None (even values are kept).
+
+	Returns:
+		bool: False if n can not be a record, True if it has to be checked.
+	"""
+	if n <= 3:
+		return True
+
+	if kind == 'delay':
+		if n % 2 == 0:
+			return is_record is None or is_record(n // 2)
+		return n % 8 != 5
+	else:
+		return n % 4 == 3
+
+
+def _record_at(records_values, records_metrics, n):
+	"""Max metric among values smaller or equal than n, i.e. the metric of the last record <= n."""
+	return records_metrics[bisect_right(records_values, n) - 1]
+
+
+def _save_checkpoint(checkpoint, kind, short, next_value, records):
+	"""Writes the checkpoint atomically (see storage.atomic_write_bytes), so it is never left half written."""
+	dictionary = {"kind": kind, "short": short, "next": next_value, "records": records}
+	directory, filename = os.path.split(os.path.abspath(checkpoint))
+	storage.atomic_write_bytes(json.dumps(dictionary).encode(), directory, filename)
+
+
+def load_checkpoint(checkpoint):
+	"""Loads a record search checkpoint.
+
+	Args:
+		checkpoint (str): path of the checkpoint file.
+
+	Returns:
+		dict: dictionary with kind, short, next (first value not searched yet) and records (list of [value, metric]).
+	"""
+	with open(checkpoint, 'r') as f:
+		return json.load(f)
+
+
+def search_records(end, kind = 'delay', short = False, checkpoint = None, checkpoint_every = 1000000):
+	"""Searches for the delay (period) records or the path (max value) records up to end. A value is a record
+	if its metric is bigger than the metric of every smaller value. Values rejected by can_be_record are
+	skipped and the orbit of the remaining values is only followed until it drops below its start value,
+	when the record of that smaller value bounds the rest of the orbit. The search always starts at 1, if
+	checkpoint exists the search is resumed from it.
+
+	Args:
+		end (integer): last value to search (inclusive).
+		kind (str, optional): 'delay' for period records, 'path' for max value records. Defaults to 'delay'.
+		short (bool, optional): if True uses collatz_function_short, collatz_function otherwise. Defaults to False.
+		checkpoint (str, optional): path of the checkpoint file, it is written every checkpoint_every values
+									and at the end of the search. Defaults to None.
+		checkpoint_every (int, optional): number of values between checkpoints. Defaults to 1000000.
+
+	Returns:
+		list: list of tuples (value, metric) with the records up to end (even if checkpoint went further).
+	"""
+	if kind not in KINDS:
+		raise ValueError("kind must be one of " + str(KINDS))
+
+	records = [(1, 0)] if kind == 'delay' else [(1, 1)]
+	n = 2
+	if checkpoint is not None and os.path.exists(checkpoint):
+		state = load_checkpoint(checkpoint)
+		if state["kind"] != kind or state["short"] != short:
+			raise ValueError("checkpoint " + checkpoint + " belongs to a different search")
+		records = [tuple(record) for record in state["records"]]
+		n = state["next"]
+
+	records_values = [value for value, _ in records]
+	records_metrics = [metric for _, metric in records]
+	record_metric = dict(records)
+	is_record = record_metric.__contains__
+
+	next_checkpoint = n + checkpoint_every
+	while n <= end:
+		if can_be_record(n, kind, is_record):
+			current = records_metrics[-1]
+			metric = None
+
+			if kind == 'delay' and n % 2 == 0:
+				metric = record_metric[n // 2] + 1
+			elif kind == 'delay':
+				# follows the orbit until it drops below n
+				n0 = _step(n, short)
+				steps = 1
+				while n0 >= n:
+					n0 = _step(n0, short)
+					steps += 1
+
+				if steps + _record_at(records_values, records_metrics, n0) > current:
+					while n0 != 1:
+						n0 = _step(n0, short)
+						steps += 1
+					metric = steps
+			else:
+				n0 = n
+				peak = n
+				while n0 >= n:
+					n0 = _step(n0, short)
+					peak = max(peak, n0)
+				# the rest of the orbit is bounded by the record at n0, which is at most current
+				metric = peak
+
+			if metric is not None and metric > current:
+				records_values.append(n)
+				records_metrics.append(metric)
+				record_metric[n] = metric
+
+		n += 1
+		if checkpoint is not None and n >= next_checkpoint:
+			_save_checkpoint(checkpoint, kind, short, n, list(zip(records_values, records_metrics)))
+			next_checkpoint = n + checkpoint_every
+
+	if checkpoint is not None:
+		_save_checkpoint(checkpoint, kind, short, n, list(zip(records_values, records_metrics)))
+
+	# a checkpoint can be ahead of end, its records above end are not returned
+	return [(value, metric) for value, metric in zip(records_values, records_metrics) if value <= end]
@@ -0,0 +1,447 @@
+import os
+import json
+import uuid
+import sqlite3
+import hashlib
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+# Root used by the default storage if COLLATZ_DATA_ROOT is not set.
+DEFAULT_ROOT = os.path.join(os.path.expanduser("~"), "Documentos/MAC/Tesis/software/collatz_data")
+
+_default_storage = None
+
+
+def atomic_write_bytes(data, path, filename):
+	"""Writes data to a temporary file in path, syncs it and renames it to filename, so filename is either the old
+	file or the complete new one, never a partial write.
+
+	Args:
+		data (bytes): content of the file.
+		path (str): directory of the file.
+		filename (str): name of the file.
+
+	Returns:
+		str: sha256 of data.
+	"""
+	while True:
+		tmp_path = os.path.join(path, "." + filename + "." + uuid.uuid4().hex + ".tmp")
+		try:
+			# created as 0666 so the kernel applies the umask, like open() does
+			fd = os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+			break
+		except FileExistsError:
+			continue
+	try:
+		with os.fdopen(fd, 'wb') as f:
+			f.write(data)
+			f.flush()
+			os.fsync(f.fileno())
+		os.replace(tmp_path, os.path.join(path, filename))
+	except BaseException:
+		if os.path.exists(tmp_path):
+			os.remove(tmp_path)
+		raise
+	return hashlib.sha256(data).hexdigest()
+
+
+def encode_dict(dictionary):
+	"""Serializes a dictionary as the json bytes stored by every backend."""
+	return json.dumps(dictionary).encode()
+
+
+def make_block_filename(begin, end, extension = ".json"):
+	return "collatz_"+ str(begin)+"_"+str(end)+extension
+
+
+def parse_block_filename(filename, extension = ".json"):
+	"""(begin, end) of a file name made by make_block_filename, None if filename is not a block file."""
+	if not (filename.startswith("collatz_") and filename.endswith(extension)):
+		return None
+	parts = filename[len("collatz_"):len(filename) - len(extension)].split("_")
+	if len(parts) != 2 or not (parts[0].isdigit() and parts[1].isdigit()):
+		return None
+	return int(parts[0]), int(parts[1])
+
+
+def list_block_files(path, extension = ".json"):
+	"""List of (begin, end) of the collatz_<begin>_<end> files of path, sorted by begin."""
+	blocks = [parse_block_filename(filename, extension) for filename in os.listdir(path)]
+	return sorted(block for block in blocks if block is not None)
+
+
+class Storage(ABC):
+	"""
+	Base class of the storage backends. Blocks are dictionaries of a range [begin, end] of values stored as json,
+	so they load with string keys on every backend. Metadata (manifest, last block saved, ...) are small
+	dictionaries stored by name. Backends implement the abstract methods, a backend that misses one cannot be 
+	created.
+	"""
+	def save_block(self, begin, end, dictionary):
+		"""Saves the block of values [begin, end].
+
+		Returns:
+			str: sha256 of the stored bytes.
+		"""
+		return self.save_block_bytes(begin, end, encode_dict(dictionary))
+
+
+	def save_block_bytes(self, begin, end, data):
+		"""Saves the block of values [begin, end] already serialized with encode_dict.
+
+		Returns:
+			str: sha256 of data.
+		"""
+		return self._put_block(begin, end, data)
+
+
+	def load_block(self, begin, end):
+		"""Loads the block of values [begin, end].
+
+		Returns:
+			dict: dictionary of the block (string keys).
+		"""
+		return json.loads(self._get_block(begin, end))
+
+
+	def delete_block(self, begin, end):
+		"""Deletes the block of values [begin, end], nothing is done if it does not exist."""
+		self._delete_block(begin, end)
+
+
+	def block_checksum(self, begin, end):
+		"""sha256 of the stored block, None if the block does not exist."""
+		try:
+			return hashlib.sha256(self._get_block(begin, end)).hexdigest()
+		except KeyError:
+			return None
+
+
+	@abstractmethod
+	def list_blocks(self):
+		"""List of (begin, end) of the stored blocks, sorted by begin."""
+		pass
+
+
+	def save_encoded_block(self, begin, end, data):
+		"""Saves the orbits of the values [begin, end] encoded with codec.encode_block.
+
+		Returns:
+			str: sha256 of data.
+		"""
+		self._put_encoded(begin, end, data)
+		return hashlib.sha256(data).hexdigest()
+
+
+	def load_encoded_block(self, begin, end):
+		"""Loads the encoded orbits of the block [begin, end].
+
+		Returns:
+			dict: dictionary with values (int) as keys and codec.EncodedOrbits as values.
+		"""
+		from collatz import codec
+		return codec.decode_block(self._get_encoded(begin, end))
+
+
+	@abstractmethod
+	def list_encoded_blocks(self):
+		"""List of (begin, end) of the stored encoded blocks, sorted by begin."""
+		pass
+
+
+	@abstractmethod
+	def save_meta(self, name, dictionary):
+		pass
+
+
+	@abstractmethod
+	def load_meta(self, name):
+		"""Loads the metadata dictionary name, None if it does not exist."""
+		pass
+
+
+	@contextmanager
+	def transaction(self):
+		"""Context manager that groups the writes inside it, backends without transactions write them at once."""
+		yield self
+
+
+	def close(self):
+		pass
+
+
+	@abstractmethod
+	def _put_block(self, begin, end, data):
+		pass
+
+
+	@abstractmethod
+	def _get_block(self, begin, end):
+		"""Stored bytes of the block, raises KeyError if it does not exist."""
+		pass
+
+
+	@abstractmethod
+	def _delete_block(self, begin, end):
+		pass
+
+
+	@abstractmethod
+	def _put_encoded(self, begin, end, data):
+		pass
+
+
+	@abstractmethod
+	def _get_encoded(self, begin, end):
+		"""Stored bytes of the encoded block, raises KeyError if it does not exist."""
+		pass
+
+
+class LocalStorage(Storage):
+	"""
+	Storage in a local directory, with the layout used since the first sweeps:
+	root/orbits_and_periods/collatz_<begin>_<end>.json for blocks and root/<name>.json for metadata.
+	Encoded blocks are saved in root/encoded_orbits/collatz_<begin>_<end>.orbits. Every file is written atomically.
+	"""
+	def __init__(self, root = None) -> None:
+		"""init method of LocalStorage class
+
+		Args:
+			root (str, optional): data directory, created if it does not exist. Defaults to DEFAULT_ROOT.
+		"""
+		self.root = os.path.abspath(os.path.expanduser(root or DEFAULT_ROOT))
+		self.blocks_path = os.path.join(self.root, "orbits_and_periods")
+		self.encoded_path = os.path.join(self.root, "encoded_orbits")
+		os.makedirs(self.blocks_path, exist_ok = True)
+		os.makedirs(self.encoded_path, exist_ok = True)
+		pass
+
+
+	def _put_block(self, begin, end, data):
+		return atomic_write_bytes(data, self.blocks_path, make_block_filename(begin, end))
+
+
+	def _get_block(self, begin, end):
+		try:
+			with open(os.path.join(self.blocks_path, make_block_filename(begin, end)), 'rb') as f:
+				return f.read()
+		except FileNotFoundError:
+			raise KeyError((begin, end))
+
+
+	def _delete_block(self, begin, end):
+		try:
+			os.remove(os.path.join(self.blocks_path, make_block_filename(begin, end)))
+		except FileNotFoundError:
+			pass
+
+
+	def _put_encoded(self, begin, end, data):
+		atomic_write_bytes(data, self.encoded_path, make_block_filename(begin, end, ".orbits"))
+
+
+	def _get_encoded(self, begin, end):
+		try:
+			with open(os.path.join(self.encoded_path, make_block_filename(begin, end, ".orbits")), 'rb') as f:
+				return f.read()
+		except FileNotFoundError:
+			raise KeyError((begin, end))
+
+
+	def list_blocks(self):
+		return list_block_files(self.blocks_path)
+
+
+	def list_encoded_blocks(self):
+		return list_block_files(self.encoded_path, ".orbits")
+
+
+	def save_meta(self, name, dictionary):
+		atomic_write_bytes(encode_dict(dictionary), self.root, name + ".json")
+
+
+	def load_meta(self, name):
+		try:
+			with open(os.path.join(self.root, name + ".json"), 'r') as f:
+				return json.load(f)
+		except FileNotFoundError:
+			return None
+
+
+class SQLiteStorage(Storage):
+	"""
+	Storage in a single SQLite file (WAL mode). Writes inside transaction() are committed together, so many small
+	blocks can be saved with one sync.
+	"""
+	def __init__(self, path) -> None:
+		"""init method of SQLiteStorage class
+
+		Args:
+			path (str): path of the database file, created if it does not exist.
+		"""
+		self.path = os.path.abspath(os.path.expanduser(path))
+		self.connection = sqlite3.connect(self.path, isolation_level = None, check_same_thread = False)
+		self.connection.execute("PRAGMA journal_mode=WAL")
+		self.connection.execute("PRAGMA synchronous=NORMAL")
+		self.connection.execute("CREATE TABLE IF NOT EXISTS blocks (begin INTEGER, end INTEGER, data BLOB, "
+								"PRIMARY KEY (begin, end))")
+		self.connection.execute("CREATE TABLE IF NOT EXISTS encoded_blocks (begin INTEGER, end INTEGER, data BLOB, "
+								"PRIMARY KEY (begin, end))")
+		self.connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, data BLOB)")
+		self._depth = 0
+		pass
+
+
+	@contextmanager
+	def transaction(self):
+		if self._depth == 0:
+			self.connection.execute("BEGIN")
+		self._depth += 1
+		try:
+			yield self
+		except BaseException:
+			self._depth -= 1
+			if self._depth == 0:
+				self.connection.execute("ROLLBACK")
+			raise
+		self._depth -= 1
+		if self._depth == 0:
+			self.connection.execute("COMMIT")
+
+
+	def _put_block(self, begin, end, data):
+		self.connection.execute("INSERT OR REPLACE INTO blocks VALUES (?, ?, ?)", (begin, end, data))
+		return hashlib.sha256(data).hexdigest()
+
+
+	def _get_block(self, begin, end):
+		row = self.connection.execute("SELECT data FROM blocks WHERE begin = ? AND end = ?", (begin, end)).fetchone()
+		if row is None:
+			raise KeyError((begin, end))
+		return bytes(row[0])
+
+
+	def _delete_block(self, begin, end):
+		self.connection.execute("DELETE FROM blocks WHERE begin = ? AND end = ?", (begin, end))
+
+
+	def _put_encoded(self, begin, end, data):
+		self.connection.execute("INSERT OR REPLACE INTO encoded_blocks VALUES (?, ?, ?)", (begin, end, data))
+
+
+	def _get_encoded(self, begin, end):
+		row = self.connection.execute("SELECT data FROM encoded_blocks WHERE begin = ? AND end = ?", 
+									(begin, end)).fetchone()
+		if row is None:
+			raise KeyError((begin, end))
+		return bytes(row[0])
+
+
+	def list_blocks(self):
+		return [tuple(row) for row in self.connection.execute("SELECT begin, end FROM blocks ORDER BY begin, end")]
+
+
+	def list_encoded_blocks(self):
+		return [tuple(row) for row in self.connection.execute("SELECT begin, end FROM encoded_blocks ORDER BY begin, end")]
+
+
+	def save_meta(self, name, dictionary):
+		self.connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, encode_dict(dictionary)))
+
+
+	def load_meta(self, name):
+		row = self.connection.execute("SELECT data FROM meta WHERE name = ?", (name,)).fetchone()
+		return None if row is None else json.loads(row[0])
+
+
+	def close(self):
+		self.connection.close()
+
+
+class MemoryStorage(Storage):
+	"""
+	Storage in memory, for tests and short explorations. Blocks are kept serialized so they load as from disk.
+	"""
+	def __init__(self) -> None:
+		"""init method of MemoryStorage class"""
+		self.blocks = {}
+		self.encoded_blocks = {}
+		self.meta = {}
+		pass
+
+
+	def _put_block(self, begin, end, data):
+		self.blocks[(begin, end)] = data
+		return hashlib.sha256(data).hexdigest()
+
+
+	def _get_block(self, begin, end):
+		return self.blocks[(begin, end)]
+
+
+	def _delete_block(self, begin, end):
+		self.blocks.pop((begin, end), None)
+
+
+	def _put_encoded(self, begin, end, data):
+		self.encoded_blocks[(begin, end)] = data
+
+
+	def _get_encoded(self, begin, end):
+		return self.encoded_blocks[(begin, end)]
+
+
+	def list_blocks(self):
+		return sorted(self.blocks)
+
+
+	def list_encoded_blocks(self):
+		return sorted(self.encoded_blocks)
+
+
+	def save_meta(self, name, dictionary):
+		self.meta[name] = encode_dict(dictionary)
+
+
+	def load_meta(self, name):
+		return json.loads(self.meta[name]) if name in self.meta else None
+
+
+def open_storage(location):
+	"""Opens the storage of location: ':memory:' for MemoryStorage, a path ending in .sqlite or .db for
+	SQLiteStorage and a directory for LocalStorage.
+
+	Args:
+		location (str): location of the storage.
+
+	Returns:
+		Storage: storage backend.
+	"""
+	if location == ":memory:":
+		return MemoryStorage()
+	elif location.endswith(".sqlite") or location.endswith(".db"):
+		return SQLiteStorage(location)
+	return LocalStorage(location)
+
+
+def get_default_storage():
+	"""Storage used by utils when no storage is given. It is opened from the COLLATZ_DATA_ROOT environment
+	variable (see open_storage), or LocalStorage(DEFAULT_ROOT) if it is not set.
+
+	Returns:
+		Storage: default storage.
+	"""
+	global _default_storage
+	if _default_storage is None:
+		_default_storage = open_storage(os.environ.get("COLLATZ_DATA_ROOT", DEFAULT_ROOT))
+	return _default_storage
+
+
+def set_default_storage(storage):
+	"""Sets the storage used by utils when no storage is given.
+
+	Args:
+		storage (Storage or str): storage backend, or location to open with open_storage.
+	"""
+	global _default_storage
+	_default_storage = open_storage(storage) if isinstance(storage, str) else storage
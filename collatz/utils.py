@@ -1,21 +1,28 @@
 import os
 import json
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 import random
 from itertools import groupby
 from operator import itemgetter
 
+from collatz import storage as storage_backends
+
 def generate_complex(xrange, yrange):
     x, y = np.ogrid[xrange[0]: xrange[1]: xrange[2]*1j, yrange[0]: yrange[1]: yrange[2]*1j]
     return x + y*1j
 
 
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest"
+LAST_BEGIN_END_NAME = "last_begin_end_saved"
+
+atomic_write_bytes = storage_backends.atomic_write_bytes
+
 def save_dict_json(dictionary, path, filename):
-	with open(os.path.join(path, filename), 'w') as f:
-		json.dump(dictionary, f)
-		print("File " + filename + " created")
+	checksum = atomic_write_bytes(json.dumps(dictionary).encode(), path, filename)
+	print("File " + filename + " created")
+	return checksum
 
 def load_dict_json(path, filename):
 	with open(os.path.join(path, filename), 'r') as f:
@@ -25,7 +32,7 @@ def load_dict_json(path, filename):
 	return dictionary
 
 def make_dict_filename(begin, end):
-	return "collatz_"+ str(begin)+"_"+str(end)+".json"
+	return storage_backends.make_block_filename(begin, end)
 
 def make_path(dir_name):
 	home = os.path.expanduser("~")
@@ -37,51 +44,109 @@ def make_path(dir_name):
 
 	return path
 
-def save_collatz_orbit_and_period(begin, end, dictionary):
-	dir_name = "Documentos/MAC/Tesis/software/collatz_data/orbits_and_periods"
-	path = make_path(dir_name)
-	filename = make_dict_filename(begin,end)
-	save_dict_json(dictionary, path, filename)
+def save_collatz_orbit_and_period(begin, end, dictionary, storage = None):
+	storage = storage or storage_backends.get_default_storage()
+	return storage.save_block(begin, end, dictionary)
 
-def load_single_collatz_orbit_and_period(begin, end):
-	dir_name = "Documentos/MAC/Tesis/software/collatz_data/orbits_and_periods"
-	path = make_path(dir_name)
-	filename = make_dict_filename(begin,end)
-	dictionary = load_dict_json(path, filename)
+def load_single_collatz_orbit_and_period(begin, end, storage = None):
+	storage = storage or storage_backends.get_default_storage()
+	return storage.load_block(begin, end)
 
-	return dictionary
-
-def load_all_collatz_orbit_and_period():
-	dir_name = "Documentos/MAC/Tesis/software/collatz_data/orbits_and_periods"
-	path = make_path(dir_name)
+def load_all_collatz_orbit_and_period(storage = None):
+	storage = storage or storage_backends.get_default_storage()
 	dictionary = {}
-	_, _, filenames = next(os.walk(path))
-	for filename in filenames:
-		dictionary.update(load_dict_json(path, filename))
+	for begin, end in storage.list_blocks():
+		dictionary.update(storage.load_block(begin, end))
 
 	return dictionary
 
-def load_collatz_orbit_and_period(num_files):
-	dir_name = "Documentos/MAC/Tesis/software/collatz_data/orbits_and_periods"
-	path = make_path(dir_name)
+def load_collatz_orbit_and_period(num_files, storage = None):
+	storage = storage or storage_backends.get_default_storage()
 	dictionary = {}
-	_, _, filenames = next(os.walk(path))
-	for i in range(num_files):
-		dictionary.update(load_dict_json(path, filenames[i]))
+	for begin, end in storage.list_blocks()[:num_files]:
+		dictionary.update(storage.load_block(begin, end))
 
 	return dictionary
 
-def save_last_begin_end(begin, end):
-	dictionary = {"begin": begin, "end": end}
-	dir_name = "Documentos/MAC/Tesis/software/collatz_data"
-	path = make_path(dir_name)
-	filename = "last_begin_end_saved.json"
-	save_dict_json(dictionary, path, filename)
-
-def load_last_begin_end():
-	dir_name = "Documentos/MAC/Tesis/software/collatz_data/"
-	path = make_path(dir_name)
-	filename = "last_begin_end_saved.json"
-	dictionary = load_dict_json(path, filename)
-
-	return dictionary
\ No newline at end of file
+def save_last_begin_end(begin, end, storage = None):
+	storage = storage or storage_backends.get_default_storage()
+	storage.save_meta(LAST_BEGIN_END_NAME, {"begin": begin, "end": end})
+
+def load_last_begin_end(storage = None):
+	storage = storage or storage_backends.get_default_storage()
+	return storage.load_meta(LAST_BEGIN_END_NAME)
+
+def new_manifest(interval):
+	return {"format_version": MANIFEST_VERSION, "interval": interval, "blocks": []}
+
+def save_manifest(manifest, storage = None):
+	storage = storage or storage_backends.get_default_storage()
+	storage.save_meta(MANIFEST_NAME, manifest)
+
+def load_manifest(storage = None):
+	"""Loads the sweep manifest, None if there is no manifest yet."""
+	storage = storage or storage_backends.get_default_storage()
+	manifest = storage.load_meta(MANIFEST_NAME)
+	if manifest is not None and manifest.get("format_version") != MANIFEST_VERSION:
+		raise ValueError("Unsupported manifest format version " + str(manifest.get("format_version")))
+	return manifest
+
+def record_block(manifest, begin, end, filename, checksum):
+	"""Adds a completed block to manifest, replacing any previous entry of the same range."""
+	manifest["blocks"] = [block for block in manifest["blocks"] if (block["begin"], block["end"]) != (begin, end)]
+	manifest["blocks"].append({"begin": begin, "end": end, "filename": filename, "sha256": checksum})
+	manifest["blocks"].sort(key = lambda block: block["begin"])
+
+def check_manifest(manifest, verify = False, storage = None):
+	"""Checks the blocks of manifest. Blocks that overlap a previous block are duplicates, and if verify is True 
+	blocks that are missing in storage or have a different checksum are corrupt.
+
+	Returns:
+		dict: dictionary with the lists of "gaps" (begin, end) between blocks, "duplicates" and "corrupt" blocks.
+	"""
+	storage = storage or storage_backends.get_default_storage()
+
+	gaps, duplicates, corrupt = [], [], []
+	covered_end = 0
+	for block in sorted(manifest["blocks"], key = lambda block: (block["begin"], block["end"])):
+		if block["begin"] <= covered_end:
+			duplicates.append(block)
+			continue
+		if verify and storage.block_checksum(block["begin"], block["end"]) != block["sha256"]:
+			corrupt.append(block)
+			continue
+		if block["begin"] > covered_end + 1:
+			gaps.append((covered_end + 1, block["begin"] - 1))
+		covered_end = block["end"]
+
+	return {"gaps": gaps, "duplicates": duplicates, "corrupt": corrupt}
+
+def missing_blocks(manifest, end):
+	"""Blocks of manifest["interval"] values that have to be computed to cover [1, end].
+	Duplicated and corrupt blocks must be removed from manifest before (see check_manifest).
+
+	Returns:
+		list: list of (begin, end) tuples.
+	"""
+	interval = manifest["interval"]
+
+	missing = []
+	begin = 1
+	for block in sorted(manifest["blocks"], key = lambda block: block["begin"]):
+		while begin < block["begin"]:
+			missing.append((begin, min(begin + interval - 1, block["begin"] - 1)))
+			begin = missing[-1][1] + 1
+		begin = max(begin, block["end"] + 1)
+	while begin <= end:
+		missing.append((begin, begin + interval - 1))
+		begin += interval
+
+	return missing
+
+def manifest_from_storage(interval, storage = None):
+	"""Builds a manifest with the blocks already saved, used the first time a sweep runs with a manifest."""
+	storage = storage or storage_backends.get_default_storage()
+	manifest = new_manifest(interval)
+	for begin, end in storage.list_blocks():
+		record_block(manifest, begin, end, make_dict_filename(begin, end), storage.block_checksum(begin, end))
+	return manifest
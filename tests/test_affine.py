@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from collatz import affine, collatz
+
+
+def test_known_orbits():
+	f = affine.AffineMap(5, 1)
+	assert f.metrics(13)[0] == affine.CYCLED
+	assert f.cycle(13) == [13, 66, 33, 166, 83, 416, 208, 104, 52, 26]
+	assert f.metrics(7, max_bits = 64)[0] == affine.DIVERGED
+	assert f.metrics(7, max_steps = 10)[0] == affine.EXCEEDED
+	assert f.metrics(3) == (affine.CONVERGED, 5, 4, 16, 1)
+	assert affine.AffineMap(3, -1).cycle(7) == [5, 14, 7, 20, 10]
+	assert affine.AffineMap().cycle(27) == [1, 4, 2]
+
+
+@pytest.mark.parametrize("q, r, short", [(3, 1, False), (3, 1, True), (5, 1, False), (3, -1, False), (7, 3, True)])
+def test_scalar_and_batch_statuses_agree(q, r, short):
+	f = affine.AffineMap(q, r, short)
+	values = list(range(1, 300))
+	max_steps, max_bits = 2000, 128
+	metrics = f.metrics_array(values, ('period', 'status'), max_steps, max_bits)
+	for i, n in enumerate(values):
+		status, period = f.metrics(n, max_steps, max_bits)[:2]
+		assert (affine.STATUSES[metrics['status'][i]], metrics['period'][i]) == (status, period), n
+
+		result = collatz.bounded_period(n, f, max_steps = max_steps, max_bits = max_bits)
+		assert (result.status, result.period) == (status, period), n
+		if n == 1:
+			# metrics treats 1 as the end of every orbit, orbit iterates it
+			continue
+		orbit_status = f.orbit(n, max_steps, max_bits)[0]
+		# orbit detects a cycle at the first repeated value, metrics a few steps later
+		assert orbit_status == status or {orbit_status, status} == {affine.CYCLED, affine.EXCEEDED}, n
+
+
+def test_collatz_map_matches_builtin_function():
+	f = affine.AffineMap()
+	assert f.is_collatz() and not affine.AffineMap(5, 1).is_collatz()
+	assert [f(n) for n in range(1, 100)] == [n // 2 if n % 2 == 0 else 3*n + 1 for n in range(1, 100)]
+	assert f.int64_limit() == (int(np.iinfo(np.int64).max) - 1) // 3
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from collatz import aggregate, batch
+
+
+def test_histogram_matches_periods():
+	statistics = aggregate.period_statistics(1, 20000, chunk_size = 3000)
+	periods = batch.period_array(np.arange(1, 20001))
+	assert statistics.count == 20000
+	assert np.array_equal(statistics.histogram, np.bincount(periods))
+	for p, (low, high) in statistics.representatives().items():
+		assert (low, high) == (np.flatnonzero(periods == p)[0] + 1, np.flatnonzero(periods == p)[-1] + 1)
+	assert statistics.delay_records == aggregate.chunk_records(np.arange(1, 20001), periods)
+
+
+@pytest.mark.parametrize("split", [1, 4999, 10000])
+def test_merge_equals_single_pass(split):
+	whole = aggregate.period_statistics(1, 20000, chunk_size = 4096)
+	merged = aggregate.period_statistics(split + 1, 20000).merge(aggregate.period_statistics(1, split))
+	assert merged.count == whole.count
+	assert np.array_equal(merged.status_counts, whole.status_counts)
+	assert np.array_equal(merged.histogram, whole.histogram)
+	assert merged.representatives() == whole.representatives()
+	assert merged.delay_records == whole.delay_records
+	assert merged.path_records == whole.path_records
+	assert np.array_equal(merged.ratio_histogram, whole.ratio_histogram)
+
+
+def test_merge_rejects_different_sketches():
+	with pytest.raises(ValueError):
+		aggregate.PeriodStatistics(ratio_bins = 10).merge(aggregate.PeriodStatistics())
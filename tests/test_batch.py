@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from collatz import affine, batch, collatz, functions
+
+
+def scalar_metrics(n, f):
+	orbit = collatz.orbit(n, f)
+	return {'period': len(orbit) - 1, 'stopping_time': collatz.stopping_time(n, f), 'max_value': max(orbit),
+			'odd_steps': sum(x % 2 for x in orbit[:-1])}
+
+
+def check_against_scalar(values, short, backend):
+	f = functions.collatz_function_short if short else functions.collatz_function
+	metrics = batch.orbit_metrics_array(values, short, batch.METRICS + ('status',), backend)
+	for i, n in enumerate(values.tolist()):
+		expected = scalar_metrics(n, f)
+		expected['max_value'] = min(expected['max_value'], np.iinfo(np.int64).max)
+		assert {name : int(metrics[name][i]) for name in batch.METRICS} == expected, n
+	assert (metrics['status'] == 0).all()
+
+
+@pytest.mark.parametrize("short", [False, True])
+def test_numpy_kernels_match_scalar_code(short):
+	check_against_scalar(np.arange(2, 3000), short, 'numpy')
+
+
+def test_int64_overflow_orbits():
+	# the orbits of these values grow beyond int64 and are finished with python integers
+	values = np.array([2**62 + 1, 2**62 - 1, 2**61 - 1, batch.INT64_SAFE_LIMIT], dtype = np.int64)
+	check_against_scalar(values, False, 'numpy')
+	check_against_scalar(values, True, 'numpy')
+	metrics = batch.orbit_metrics_array(values, metrics = ('max_value',))
+	assert (metrics['max_value'][:3] == np.iinfo(np.int64).max).all()
+
+
+@pytest.mark.parametrize("short", [False, True])
+def test_numba_kernels_match_numpy(short):
+	pytest.importorskip("numba")
+	values = np.r_[np.arange(1, 5000), [batch.INT64_SAFE_LIMIT, 2**62 + 1, 2**62 - 1]]
+	names = batch.METRICS + ('status',)
+	expected = batch.orbit_metrics_array(values, short, names, 'numpy')
+	result = batch.orbit_metrics_array(values, short, names, 'numba')
+	for name in names:
+		assert np.array_equal(result[name], expected[name]), name
+
+
+def test_period_and_stopping_time_arrays():
+	values = np.arange(1, 500)
+	assert batch.period_array(values).tolist() == [collatz.period(n, functions.collatz_function) for n in range(1, 500)]
+	assert (batch.stopping_time_array(values[1:]).tolist()
+			== [collatz.stopping_time(n, functions.collatz_function) for n in range(2, 500)])
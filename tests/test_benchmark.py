@@ -0,0 +1,44 @@
+import pytest
+
+from collatz import benchmark
+
+
+def _allocate(size, workers):
+	data = bytearray(size)
+	return len(data)
+
+
+def test_measure():
+	result = benchmark.measure(_allocate, 10**6, repeat = 2)
+	assert result["seconds"] > 0 and result["throughput"] == pytest.approx(10**6 / result["seconds"])
+	assert result["peak_memory"] >= 10**6
+	# the memory of the workers is not seen by tracemalloc
+	assert benchmark.measure(_allocate, 10**6, workers = 2, repeat = 1)["peak_memory"] is None
+
+
+def results(cases):
+	return {"format_version": benchmark.BENCHMARK_VERSION, "results": {key : {"seconds": seconds, "throughput": 1.0,
+			"peak_memory": memory} for key, (seconds, memory) in cases.items()}}
+
+
+def test_compare():
+	baseline = results({"a": (1.0, 100), "b": (1.0, 100), "c": (1.0, None), "old": (1.0, 100)})
+	new = results({"a": (1.05, 150), "b": (1.5, 50), "c": (0.5, None), "new": (1.0, 100)})
+	comparison = benchmark.compare(new, baseline, tolerance = 0.1)
+	assert sorted(comparison) == ["a", "b", "c"]
+	assert comparison["a"] == {"ratio": pytest.approx(1.05), "memory_ratio": 1.5, "regression": False}
+	assert comparison["b"] == {"ratio": 1.5, "memory_ratio": 0.5, "regression": True}
+	assert comparison["c"] == {"ratio": 0.5, "memory_ratio": None, "regression": False}
+
+
+def test_baseline_round_trip(tmp_path):
+	measured = benchmark.run_benchmarks(["periodic_orbit", "period_statistics"], workers = (1, 2), repeat = 1)
+	assert sorted(measured["results"]) == ["period_statistics[size=100000,workers=1]",
+										"period_statistics[size=100000,workers=2]", "periodic_orbit[size=1000,workers=1]"]
+	assert measured["results"]["period_statistics[size=100000,workers=2]"]["peak_memory"] is None
+	benchmark.save_baseline(measured, str(tmp_path / "baseline.json"))
+	assert benchmark.load_baseline(str(tmp_path / "baseline.json")) == measured
+
+	(tmp_path / "old.json").write_text('{"format_version": 0, "results": {}}')
+	with pytest.raises(ValueError):
+		benchmark.load_baseline(str(tmp_path / "old.json"))
@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from collatz import bigint, collatz, functions
+
+
+def scalar_orbit(n, short):
+	f = functions.collatz_function_short if short else functions.collatz_function
+	orbit = [n]
+	while n != 1:
+		n = f(n)
+		orbit.append(n)
+	return orbit
+
+
+@pytest.fixture(params = ["int", "gmpy2"])
+def engine(request, monkeypatch):
+	if request.param == "gmpy2":
+		pytest.importorskip("gmpy2")
+	else:
+		monkeypatch.setattr(bigint, "HAS_GMPY2", False)
+	# the jump table keeps the integer type of the engine that built it
+	monkeypatch.setattr(bigint, "_jump_table", None)
+	return request.param
+
+
+def random_values():
+	rng = random.Random(2024)
+	values = [rng.getrandbits(bits) | (1 << (bits - 1)) for bits in (65, 100, 257, 600) for _ in range(5)]
+	return values + [2**64 + 1, 2**300 - 1, 2**(bigint.JUMP_BITS + 1), 2**(bigint.JUMP_BITS + 1) + 1]
+
+
+@pytest.mark.parametrize("short", [False, True])
+def test_big_values_match_scalar_kernel(engine, short):
+	for n in random_values():
+		orbit = scalar_orbit(n, short)
+		assert bigint.period_big(n, short) == collatz._collatz_period(n, short) == len(orbit) - 1, n
+		assert bigint.orbit_and_period_big(n, short) == (len(orbit) - 1, orbit), n
+
+
+def test_jump_table(engine):
+	table = bigint._get_jump_table()
+	assert len(table) == 2**bigint.JUMP_BITS
+	for b in (0, 1, 7, 27, 2**bigint.JUMP_BITS - 1):
+		multiplier, d, c = table[b]
+		a = 12345
+		n = a*2**bigint.JUMP_BITS + b
+		assert scalar_orbit(n, True)[bigint.JUMP_BITS] == multiplier*a + d
+		assert multiplier == 3**c
+
+
+def test_period_dispatches_big_values(engine):
+	n = 2**(bigint.BIG_INT_BITS + 10) + 3
+	assert collatz.period(n, functions.collatz_function) == len(scalar_orbit(n, False)) - 1
+	assert collatz.orbit_and_period(n, functions.collatz_function_short)[1] == scalar_orbit(n, True)
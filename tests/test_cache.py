@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from collatz import batch
+from collatz.cache import ComputationCache
+from collatz.collatz import CollatzProblem
+
+
+def test_cache_matches_batch_kernels():
+	with ComputationCache(5000, block_size = 512) as cache:
+		values = np.arange(1, 6001)
+		metrics = cache.metrics(values, ('period', 'stopping_time'))
+		expected = batch.orbit_metrics_array(values, metrics = ('period', 'stopping_time'))
+		assert np.array_equal(metrics['period'], expected['period'])
+		assert np.array_equal(metrics['stopping_time'], expected['stopping_time'])
+		cache.metrics(np.arange(100, 200))
+		assert cache.hits > 0
+
+
+def test_problems_share_the_cache():
+	with ComputationCache(2000, block_size = 256) as cache:
+		first = CollatzProblem(list(range(2, 1500)), start = 'periods', cache = cache)
+		misses = cache.misses
+		second = CollatzProblem(list(range(1000, 2000)), start = 'periods', cache = cache)
+		assert cache.misses == misses + 2
+		reference = CollatzProblem(list(range(1000, 2000)), start = 'periods')
+		assert second.periods == reference.periods and second.stopping_times == reference.stopping_times
+		assert first.periods[1200] == second.periods[1200]
+
+
+def test_big_values_skip_the_cache():
+	with ComputationCache(100) as cache:
+		problem = CollatzProblem([2**70], start = 'periods', cache = cache)
+		assert problem.periods == CollatzProblem([2**70], start = 'periods').periods
+		with pytest.raises(ValueError):
+			cache.metrics([2**70])
+
+
+def test_closed_cache():
+	cache = ComputationCache(100)
+	cache.close()
+	with pytest.raises(ValueError):
+		cache.metrics([5])
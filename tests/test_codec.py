@@ -0,0 +1,19 @@
+from collatz import codec, collatz, functions
+
+
+def test_random_access_matches_the_orbit():
+	orbit = collatz.orbit(837799, functions.collatz_function)
+	for checkpoint_every in (1, 5, 8, 13, 256):
+		encoded = codec.encode_orbit(orbit, checkpoint_every)
+		assert encoded.to_list() == orbit
+		assert [encoded[i] for i in range(len(orbit))] == orbit
+		assert encoded[-1] == 1
+		assert encoded[100:131] == orbit[100:131]
+		assert encoded[len(orbit) - 3:] == orbit[-3:]
+
+
+def test_block_round_trip():
+	dictionary = {n : {"period": p, "orbit": o} for n in range(1, 300)
+				for p, o in [collatz.orbit_and_period(n, functions.collatz_function)]}
+	decoded = codec.decode_block(codec.encode_block(dictionary))
+	assert {n : orbit.to_list() for n, orbit in decoded.items()} == {n : value["orbit"] for n, value in dictionary.items()}
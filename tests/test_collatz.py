@@ -0,0 +1,83 @@
+from itertools import groupby
+
+import numpy as np
+import pytest
+
+from collatz import collatz, functions
+from collatz.affine import AffineMap, CONVERGED, CYCLED, DIVERGED, EXCEEDED
+from collatz.collatz import CollatzProblem
+from collatz.instrument import Instrumentation
+
+
+def test_period_and_stopping_time_of_numpy_and_float_values():
+	assert collatz.period(np.int64(27), functions.collatz_function) == 111
+	assert collatz.period(27.0, functions.collatz_function) == 111
+	assert collatz.stopping_time(np.int64(27), functions.collatz_function) == 96
+	assert collatz.stopping_time(27.0, functions.collatz_function) == 96
+	assert collatz.period(np.int32(27), functions.collatz_function_short) == collatz.period(27, functions.collatz_function_short)
+
+
+def test_values_below_one():
+	for f in (functions.collatz_function, functions.collatz_function_short):
+		assert collatz.stopping_time(0, f) == 1
+		assert collatz.stopping_time(np.int64(0), f) == 1
+		assert collatz.stopping_time(-5, f) == 1
+		with pytest.raises(ValueError):
+			collatz.period(0, f)
+		with pytest.raises(ValueError):
+			collatz.period(-2**100, f)
+
+
+def test_collatz_problem_numpy_and_float_values():
+	problem = CollatzProblem(np.arange(2, 6), start = 'periods')
+	assert [problem.periods[value] for value in problem.values] == [1, 7, 2, 5]
+	assert CollatzProblem([27.0], start = 'periods').periods == {27.0: 111}
+
+
+def test_bounded_periods_from_orbits():
+	problem = CollatzProblem([5, 7], f = AffineMap(5, 1), max_steps = 1000)
+	assert problem.statuses[5] == CYCLED and problem.statuses[7] != CONVERGED
+	assert problem.period() == {5: -1, 7: -1}
+	assert problem.stopping_time_ratio() == {5: None, 7: None}
+
+
+def test_other_maps_are_bounded_by_default():
+	problem = CollatzProblem([7], f = AffineMap(5, 1), start = 'periods')
+	assert problem.bounded
+	assert problem.periods == {7: -1}
+	assert problem.statuses[7] in (DIVERGED, EXCEEDED)
+	assert not CollatzProblem([7], f = functions.collatz_function).bounded
+	assert not CollatzProblem([7], f = AffineMap(3, 1), start = None, bounded = False).bounded
+
+
+def test_instrumentation_with_numpy_values():
+	instrumentation = Instrumentation()
+	problem = CollatzProblem(np.arange(2, 100), start = 'periods', backend = 'numpy', instrumentation = instrumentation)
+	assert instrumentation.values >= 98
+	assert instrumentation.max_orbit_length == max(problem.periods.values())
+
+
+def groupby_runs(values, f):
+	# consecutive_orbits_length before the vectorized runs
+	same_len = {}
+	for value in values:
+		same_len.setdefault(collatz.period(value, f), []).append(value)
+	runs = {}
+	for same in same_len.values():
+		for _, g in groupby(enumerate(same), lambda ix : ix[0] - ix[1]):
+			consecutive = [value for _, value in g]
+			runs.setdefault(len(consecutive), []).append(consecutive)
+	return runs
+
+
+@pytest.mark.parametrize("values", [range(2, 3000), list(range(100, 1000)), np.arange(7, 500), range(1, 1), [], 
+									list(range(2, 50)) + list(range(60, 300)), [27, 5, 6, 7, 100]])
+@pytest.mark.parametrize("f", [functions.collatz_function, functions.collatz_function_short, AffineMap()])
+def test_consecutive_runs_match_groupby(values, f):
+	expected = groupby_runs(list(values), f)
+	assert dict(collatz.consecutive_orbits_length(values, f)) == expected
+	assert dict(CollatzProblem(values, f = f, start = None).consecutive_orbits_length()) == expected
+	if collatz.is_contiguous(values):
+		runs = CollatzProblem(values, f = f, start = None).consecutive_runs()
+		assert isinstance(runs, collatz.ConsecutiveRuns)
+		assert int(np.sum(runs.lengths)) == len(values)
@@ -0,0 +1,44 @@
+import os
+import stat
+
+import numpy as np
+
+from collatz import batch
+from collatz.columns import ColumnStore, COLUMNS
+
+
+def test_store_matches_batch_kernels(tmp_path):
+	store = ColumnStore(str(tmp_path))
+	store.fill(1, 2500, block_size = 1000)
+	assert store.list_blocks() == [(1, 1000), (1001, 2000), (2001, 2500)]
+	columns = store.columns(500, 2200)
+	expected = batch.orbit_metrics_array(np.arange(500, 2201), metrics = COLUMNS)
+	for name in COLUMNS:
+		assert np.array_equal(columns[name].to_array(), expected[name])
+
+
+def test_block_files_mode(tmp_path):
+	umask = os.umask(0o022)
+	try:
+		store = ColumnStore(str(tmp_path))
+		store.fill(1, 100)
+	finally:
+		os.umask(umask)
+	for filename in os.listdir(tmp_path / "1_100"):
+		assert stat.S_IMODE(os.stat(tmp_path / "1_100" / filename).st_mode) == 0o644
+
+
+def test_problem_from_store(tmp_path):
+	from collatz.collatz import CollatzProblem
+	from collatz.columns import ColumnMapping
+
+	store = ColumnStore(str(tmp_path))
+	store.fill(1, 3000, block_size = 1000)
+	problem = CollatzProblem.from_store(range(2, 2501), store)
+	reference = CollatzProblem(list(range(2, 2501)), start = 'periods')
+	assert isinstance(problem.periods, ColumnMapping)
+	assert dict(problem.periods) == reference.periods
+	assert dict(problem.stopping_times) == reference.stopping_times
+	assert dict(problem.stopping_time_ratios) == reference.stopping_time_ratios
+	assert problem.same_orbit_period() == reference.same_orbit_period()
+	assert 1 not in problem.periods and problem.periods[np.int64(27)] == 111
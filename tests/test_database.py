@@ -0,0 +1,13 @@
+from collatz import records
+from collatz.database import ResultsDatabase
+
+
+def test_database_records_match_the_record_search():
+	database = ResultsDatabase(":memory:")
+	database.fill(1, 20000, chunk_size = 3000)
+	assert database.count() == 20000
+	for kind in records.KINDS:
+		values, metric = database.records(kind, 1, 20000, chunk_size = 777)
+		assert list(zip(values.tolist(), metric.tolist())) == records.search_records(20000, kind)
+	assert database.get(27)["period"] == 111
+	database.close()
@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+import pytest
+
+from collatz import dynamical, functions
+
+
+def test_attraction_basins_match_scalar_iteration():
+	values = np.linspace(-3, 5, 401)
+	attractors = [0.0, (1.0, 4.0, 2.0)]
+	labels, times = dynamical.attraction_basins(functions.collatz_extension, values, attractors, 100)
+	for value, label, time in zip(values.tolist(), labels.tolist(), times.tolist()):
+		x = value
+		expected = (dynamical.BASIN_UNRESOLVED, 100)
+		for i in range(101):
+			if not abs(x) <= 10**10:
+				expected = (dynamical.BASIN_DIVERGED, i)
+				break
+			if abs(x) <= 1e-6:
+				expected = (0, i)
+				break
+			if min(abs(x - point) for point in attractors[1]) <= 1e-6:
+				expected = (1, i)
+				break
+			if i < 100:
+				x = functions.collatz_extension(x)
+		assert (label, time) == expected
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_dds_attraction_basins_default_attractors():
+	dds = dynamical.DDS(list(np.linspace(-3, 5, 17)), functions.collatz_extension, 10, 100, 
+						functions.collatz_extension_prime, None)
+	labels, times, attractors = dds.attraction_basins(np.array([0.0, 1e-9]))
+	assert attractors and any(abs(x) < 1e-6 for x in attractors)
+	assert (labels >= 0).all()
+
+	dds = dynamical.DDS([0.5], lambda x: x + 1, 10, 100, None, None)
+	with pytest.raises(ValueError):
+		dds.attraction_basins()
+
+
+def test_lyapunov_exponent_of_the_logistic_map():
+	f = lambda x, r: r*x*(1 - x)
+	fprime = lambda x, r: r*(1 - 2*x)
+	exponents, steps = dynamical.lyapunov_exponent(f, fprime, 0.1234, 20000, 100, parameters = np.array([4.0, 2.5]))
+	assert abs(exponents[0] - math.log(2)) < 1e-2
+	assert abs(exponents[1] - math.log(0.5)) < 1e-2
+	assert steps.tolist() == [20000, 20000]
+
+
+def test_bifurcation_matches_scalar_iteration():
+	f = lambda x, r: r*x*(1 - x)
+	parameters = np.linspace(2.5, 4, 7)
+	points = dynamical.bifurcation(f, parameters, [0.2, 0.7], 20, 50, chunk_size = 4)
+	for i, r in enumerate(parameters.tolist()):
+		for j, x in enumerate([0.2, 0.7]):
+			orbit = []
+			for k in range(70):
+				x = r*x*(1 - x)
+				orbit.append(x)
+			assert np.allclose(points[i, j], np.float32(orbit[50:]))
+
+
+def escape_time(z0, function, stop_iterations, threshold, julia, traps, tolerance = None):
+	# plain escape-time loop of one point
+	distance = lambda z: min(abs(z - point) for point in traps)
+	c = np.complex128(0) if julia else z0
+	z = reference = z0
+	trap = distance(z0)
+	for i in range(stop_iterations):
+		z = function(z) + c
+		if abs(z) > threshold:
+			return i, dynamical.FRACTAL_DIVERGED, abs(z), trap
+		trap = min(trap, distance(z))
+		if tolerance is not None and abs(z - reference) <= tolerance:
+			return stop_iterations, dynamical.FRACTAL_BOUNDED, abs(z), trap
+		if tolerance is not None and (i + 1) & i == 0:
+			reference = z
+	return stop_iterations, dynamical.FRACTAL_CAP, abs(z), trap
+
+
+@pytest.mark.parametrize("julia", [False, True])
+@pytest.mark.parametrize("tolerance", [None, 1e-9])
+def test_mandelbrot_set_outputs_match_escape_time_loop(julia, tolerance):
+	function = (lambda z: z*z - 0.4 + 0.6j) if julia else (lambda z: z*z)
+	xrange, yrange, stop_iterations, threshold, traps = (-2, 1, 31), (-1.2, 1.2, 23), 60, 2.0, (0, 0.5j)
+	iterations, outputs = dynamical.mandelbrot_set(function, xrange, yrange, stop_iterations, threshold, 'abs', julia,
+												outputs = dynamical.FRACTAL_OUTPUTS, traps = traps,
+												periodicity_tolerance = tolerance)
+	x, y = np.ogrid[xrange[0]: xrange[1]: xrange[2]*1j, yrange[0]: yrange[1]: yrange[2]*1j]
+	grid = np.transpose(x + y*1j)
+	assert iterations.shape == grid.shape == (23, 31)
+
+	for index, z0 in np.ndenumerate(grid):
+		i, status, final_abs, trap = escape_time(z0, function, stop_iterations, threshold, julia, traps, tolerance)
+		assert (iterations[index], outputs['status'][index]) == (i, status), index
+		assert outputs['final_abs'][index] == pytest.approx(final_abs)
+		assert outputs['trap'][index] == pytest.approx(trap)
+		if status == dynamical.FRACTAL_DIVERGED:
+			smooth = i + 1 - math.log(math.log(final_abs) / math.log(threshold)) / math.log(2)
+			assert outputs['smooth'][index] == pytest.approx(smooth)
+		else:
+			assert outputs['smooth'][index] == stop_iterations
+	assert outputs['status'].dtype == np.int8
+
+
+def test_periodicity_check_only_stops_bounded_points():
+	square = lambda z: z*z
+	plain = dynamical.mandelbrot_set(square, (-2, 1, 61), (-1.2, 1.2, 41), 200, 2.0)
+	checked, outputs = dynamical.mandelbrot_set(square, (-2, 1, 61), (-1.2, 1.2, 41), 200, 2.0, outputs = ('status',),
+												periodicity_tolerance = 1e-12)
+	assert np.array_equal(checked, plain)
+	bounded = outputs['status'] == dynamical.FRACTAL_BOUNDED
+	assert bounded.any() and np.all(plain[bounded] == 200)
+	assert np.array_equal(dynamical.mandelbrot_set(square, (-2, 1, 61), (-1.2, 1.2, 41), 200, 2.0,
+												dtypes = {'iterations': np.int16}), plain.astype(np.int16))
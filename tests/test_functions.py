@@ -0,0 +1,57 @@
+import pytest
+
+from collatz import collatz, functions, storage, utils
+
+
+def expected_block(begin, end):
+	return {str(n) : {"period": p, "orbit": o} for n in range(begin, end + 1)
+			for p, o in [collatz.orbit_and_period(n, functions.collatz_function)]}
+
+
+def check_sweep(backend, end):
+	blocks = [(begin, begin + 99) for begin in range(1, end, 100)]
+	assert backend.list_blocks() == blocks
+	manifest = utils.load_manifest(backend)
+	assert [(block["begin"], block["end"]) for block in manifest["blocks"]] == blocks
+	assert utils.check_manifest(manifest, True, backend) == {"gaps": [], "duplicates": [], "corrupt": []}
+	assert utils.load_last_begin_end(backend) == {"begin": end - 99, "end": end}
+	assert utils.load_all_collatz_orbit_and_period(backend) == expected_block(1, end)
+
+
+@pytest.fixture(params = ["local", "memory"])
+def backend(request, tmp_path):
+	backend = storage.LocalStorage(str(tmp_path)) if request.param == "local" else storage.MemoryStorage()
+	functions.generate_collatz_data(3, interval = 100, storage = backend)
+	check_sweep(backend, 300)
+	return backend
+
+
+def test_corrupt_blocks_at_the_end_are_recomputed(backend):
+	backend.save_block_bytes(101, 200, b"{}")
+	backend.save_block_bytes(201, 300, b"{}")
+	functions.generate_collatz_data(1, interval = 100, verify = True, storage = backend)
+	check_sweep(backend, 400)
+
+
+def test_gaps_are_filled(backend):
+	manifest = utils.load_manifest(backend)
+	manifest["blocks"] = [block for block in manifest["blocks"] if block["begin"] != 101]
+	utils.save_manifest(manifest, backend)
+	backend.delete_block(101, 200)
+	functions.generate_collatz_data(0, interval = 100, storage = backend)
+	check_sweep(backend, 300)
+
+
+def test_duplicated_blocks_are_removed(backend):
+	manifest = utils.load_manifest(backend)
+	checksum = backend.save_block(150, 250, expected_block(150, 250))
+	utils.record_block(manifest, 150, 250, utils.make_dict_filename(150, 250), checksum)
+	utils.save_manifest(manifest, backend)
+	functions.generate_collatz_data(1, interval = 100, storage = backend)
+	check_sweep(backend, 400)
+
+
+def test_missing_block_is_recomputed_with_verify(backend):
+	backend.delete_block(201, 300)
+	functions.generate_collatz_data(0, interval = 100, verify = True, storage = backend)
+	check_sweep(backend, 300)
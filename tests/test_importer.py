@@ -0,0 +1,72 @@
+import numpy as np
+
+from collatz import batch, collatz, functions, importer, storage, utils
+from collatz.columns import ColumnStore, COLUMNS
+
+
+def write_legacy_block(path, begin, end):
+	block = {n : {"period": p, "orbit": o} for n in range(begin, end + 1)
+			for p, o in [collatz.orbit_and_period(n, functions.collatz_function)]}
+	utils.save_dict_json(block, str(path), utils.make_dict_filename(begin, end))
+	return block
+
+
+def test_import_matches_the_legacy_files(tmp_path):
+	source = tmp_path / "legacy"
+	source.mkdir()
+	blocks = [write_legacy_block(source, begin, begin + 99) for begin in range(1, 500, 100)]
+	(source / utils.make_dict_filename(501, 600)).write_text('{"501": {"period": 3, "orbit": [501]}}')
+
+	for processes in (1, 2):
+		target = storage.MemoryStorage()
+		store = ColumnStore(str(tmp_path / ("columns_" + str(processes))))
+		report = importer.import_legacy_files(str(source), target, store, processes = processes)
+		assert (report["files"], report["values"]) == (5, 500)
+		assert [path for path, _ in report["corrupt"]] == [str(source / utils.make_dict_filename(501, 600))]
+
+		assert target.list_encoded_blocks() == [(begin, begin + 99) for begin in range(1, 500, 100)]
+		for block in blocks:
+			begin = min(block)
+			encoded = target.load_encoded_block(begin, begin + 99)
+			assert {n : encoded[n].to_list() for n in block} == {n : value["orbit"] for n, value in block.items()}
+
+		columns = store.columns(1, 500)
+		expected = batch.orbit_metrics_array(np.arange(1, 501), metrics = COLUMNS)
+		for name in COLUMNS:
+			assert np.array_equal(columns[name].to_array(), expected[name]), name
+
+
+def test_block_metrics_saturate_max_value():
+	values = [2**62 + 1, 2**62 + 2]
+	orbits = {n : collatz.orbit(n, functions.collatz_function) for n in values}
+	metrics = importer.block_metrics(values[0], values[-1], orbits)
+	expected = batch.orbit_metrics_array(np.array(values), metrics = batch.METRICS)
+	for name in batch.METRICS:
+		assert np.array_equal(metrics[name], expected[name]), name
+	assert metrics['max_value'][0] == np.iinfo(np.int64).max
+
+
+def test_parsing_stays_bounded():
+	class RecordingPool:
+		def __init__(self):
+			self.submitted = 0
+
+		def apply_async(self, function, args):
+			self.submitted += 1
+			return RecordingResult(args[0])
+
+	class RecordingResult:
+		def __init__(self, task):
+			self.task = task
+
+		def get(self):
+			return self.task
+
+	pool = RecordingPool()
+	consumed = 0
+	for task in importer._bounded_results(pool, range(100), 4):
+		assert task == consumed
+		consumed += 1
+		# at most max_pending parsed files wait to be written
+		assert pool.submitted - consumed <= 4
+	assert consumed == pool.submitted == 100
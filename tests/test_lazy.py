@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+import pytest
+
+from collatz import lazy
+
+HEAVY = ('matplotlib', 'networkx', 'scipy')
+
+
+def loaded_after(code):
+	script = code + "\nimport sys\nprint(' '.join(name for name in " + repr(HEAVY) + " if name in sys.modules))"
+	return subprocess.run([sys.executable, "-c", script], capture_output = True, text = True, check = True).stdout.split()
+
+
+def test_import_does_not_load_plotting_nor_scipy():
+	assert loaded_after("import collatz") == []
+	modules = [name for name in __import__('collatz')._SUBMODULES if name not in ('plot', 'jit')]
+	assert loaded_after("import collatz\n" + "\n".join("import collatz." + name for name in modules)) == []
+
+
+def test_dependencies_are_loaded_on_use():
+	assert loaded_after("from collatz import dynamical\ndynamical.optimize.brentq") == ['scipy']
+	assert 'matplotlib' in loaded_after("from collatz import collatz\ncollatz.plot.plt")
+
+
+def test_lazy_import():
+	assert lazy.lazy_import('collatz.storage') is sys.modules['collatz.storage']
+	assert lazy.lazy_import('json.decoder').JSONDecoder is __import__('json.decoder').decoder.JSONDecoder
+	with pytest.raises(ImportError):
+		lazy.lazy_import('collatz.missing_module')
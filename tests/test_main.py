@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pytest
+
+from collatz import collatz, dynamical, functions, storage
+from collatz.__main__ import main
+
+
+def last_json(capsys):
+	return json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("workers", ["0", "2"])
+def test_sweep_and_query(tmp_path, capsys, workers):
+	data, database = str(tmp_path / "data"), str(tmp_path / "results.db")
+	assert main(["sweep", "--storage", data, "--database", database, "--blocks", "2", "--interval", "100",
+				"--workers", workers]) == 0
+	assert main(["sweep", "--storage", data, "--database", database, "--blocks", "1", "--interval", "100",
+				"--workers", workers, "--verify"]) == 0
+	assert storage.LocalStorage(data).list_blocks() == [(1, 100), (101, 200), (201, 300)]
+	capsys.readouterr()
+
+	assert main(["query", database]) == 0
+	assert last_json(capsys) == {"values": 300}
+	assert main(["query", database, "--value", "27"]) == 0
+	assert last_json(capsys)["period"] == 111
+	assert main(["query", database, "--period", "111", "--range", "1", "100"]) == 0
+	assert last_json(capsys) == [n for n in range(1, 101) if collatz.period(n, functions.collatz_function) == 111]
+	assert main(["query", database, "--first-period-above", "100"]) == 0
+	assert last_json(capsys) == 27
+	assert main(["query", database, "--records", "delay", "--range", "1", "30"]) == 0
+	assert last_json(capsys) == [[1, 0], [2, 1], [3, 7], [6, 8], [7, 16], [9, 19], [18, 20], [25, 23], [27, 111]]
+	assert main(["query", database, "--top-ratios", "2"]) == 0
+	assert len(last_json(capsys)) == 2
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_fractal(tmp_path, workers):
+	output = tmp_path / "fractal.npy"
+	assert main(["fractal", str(output), "--xrange", "-2", "2", "30", "--yrange", "-1", "1", "11", "--iterations", "20",
+				"--tile-rows", "3", "--workers", workers]) == 0
+	with np.errstate(all = 'ignore'):
+		expected = dynamical.mandelbrot_set(functions.collatz_extension, (-2, 2, 30), (-1, 1, 11), 20, 10**10)
+	assert np.array_equal(np.load(output), expected)
+
+	image = tmp_path / "fractal.png"
+	assert main(["fractal", str(image), "--xrange", "-2", "2", "30", "--yrange", "-1", "1", "11", "--iterations", "20",
+				"--workers", workers]) == 0
+	assert sorted(path.name for path in tmp_path.iterdir()) == ["fractal.npy", "fractal.png"]
+
+
+def test_bench(tmp_path):
+	baseline = tmp_path / "baseline.json"
+	assert main(["bench", "periodic_orbit", "--repeat", "1", "--save", str(baseline)]) == 0
+	assert main(["bench", "periodic_orbit", "--repeat", "1", "--baseline", str(baseline), "--tolerance", "100"]) == 0
+
+	results = json.loads(baseline.read_text())
+	for result in results["results"].values():
+		result["seconds"] = 1e-9
+	baseline.write_text(json.dumps(results))
+	assert main(["bench", "periodic_orbit", "--repeat", "1", "--baseline", str(baseline)]) == 1
+	assert main(["bench", "periodic_orbit", "--repeat", "1", "--memory-budget", "0.000001"]) == 1
+	assert main(["bench", "period_statistics", "--repeat", "1", "--scaling-workers", "2",
+				"--memory-budget", "0.000001"]) == 0
+
+
+def test_subcommand_is_required(capsys):
+	with pytest.raises(SystemExit):
+		main([])
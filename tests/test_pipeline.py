@@ -0,0 +1,64 @@
+import queue
+
+import pytest
+
+from collatz import pipeline
+
+
+def _square_block(block):
+	begin, end = block
+	return begin, end, [n*n for n in range(begin, end + 1)]
+
+
+def test_blocks_are_written_in_order():
+	written = []
+	metrics = pipeline.run_pipeline([(1, 3), (4, 6), (7, 9)], lambda begin, end, data: written.append((begin, data)),
+									_square_block, queue_size = 1)
+	assert written == [(1, [1, 4, 9]), (4, [16, 25, 36]), (7, [49, 64, 81])]
+	assert metrics.blocks == 3
+
+
+def test_failed_writes_are_not_counted():
+	written = []
+
+	def write_block(begin, end, data):
+		if begin == 4:
+			raise OSError("disk full")
+		written.append(begin)
+
+	with pytest.raises(OSError):
+		pipeline.run_pipeline([(1, 3), (4, 6), (7, 9)], write_block, _square_block)
+	assert written == [1]
+
+	write_queue = queue.Queue()
+	for block in [(1, 3), (4, 6)]:
+		write_queue.put(_square_block(block))
+	write_queue.put(pipeline._DONE)
+	metrics = pipeline.PipelineMetrics()
+	errors = []
+	pipeline._writer(write_queue, write_block, metrics, errors)
+	assert metrics.blocks == 1 and len(errors) == 1
+
+
+def test_workers_are_not_forked_from_a_threaded_process(monkeypatch):
+	import multiprocessing
+	import threading
+
+	methods = []
+	alive = []
+	get_context = multiprocessing.get_context
+
+	def checked_context(method = None):
+		methods.append(method)
+		alive.append(threading.active_count())
+		return get_context(method)
+
+	monkeypatch.setattr(multiprocessing, "get_context", checked_context)
+	written = []
+	before = threading.active_count()
+	metrics = pipeline.run_pipeline([(1, 3), (4, 6), (7, 9)], lambda begin, end, data: written.append((begin, data)),
+									_square_block, workers = 2)
+	assert methods in (["forkserver"], ["spawn"])
+	assert alive == [before]
+	assert written == [(1, [1, 4, 9]), (4, [16, 25, 36]), (7, [49, 64, 81])]
+	assert metrics.blocks == 3
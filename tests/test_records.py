@@ -0,0 +1,41 @@
+import os
+import stat
+
+from collatz import collatz, functions, records
+
+
+def brute_force_records(end, kind):
+	result = []
+	best = -1
+	for n in range(1, end + 1):
+		orbit = collatz.orbit(n, functions.collatz_function)
+		metric = len(orbit) - 1 if kind == 'delay' else max(orbit)
+		if metric > best:
+			result.append((n, metric))
+			best = metric
+	return result
+
+
+def test_records_match_brute_force():
+	for kind in records.KINDS:
+		assert records.search_records(5000, kind) == brute_force_records(5000, kind)
+
+
+def test_checkpoint_resume(tmp_path):
+	checkpoint = str(tmp_path / "records.json")
+	records.search_records(2000, 'delay', checkpoint = checkpoint, checkpoint_every = 500)
+	assert stat.S_IMODE(os.stat(checkpoint).st_mode) == 0o666 & ~_umask()
+	assert os.listdir(tmp_path) == ["records.json"]
+	assert records.search_records(5000, 'delay', checkpoint = checkpoint) == brute_force_records(5000, 'delay')
+
+
+def _umask():
+	umask = os.umask(0)
+	os.umask(umask)
+	return umask
+
+
+def test_checkpoint_past_end(tmp_path):
+	checkpoint = str(tmp_path / "records.json")
+	records.search_records(50000, 'delay', checkpoint = checkpoint)
+	assert records.search_records(1000, 'delay', checkpoint = checkpoint) == brute_force_records(1000, 'delay')
@@ -0,0 +1,66 @@
+import os
+import stat
+
+import pytest
+
+from collatz import storage
+
+
+def test_atomic_write_uses_the_umask_mode(tmp_path):
+	umask = os.umask(0o022)
+	try:
+		storage.atomic_write_bytes(b"data", str(tmp_path), "block.json")
+	finally:
+		os.umask(umask)
+	assert (tmp_path / "block.json").read_bytes() == b"data"
+	assert stat.S_IMODE(os.stat(tmp_path / "block.json").st_mode) == 0o644
+	assert os.listdir(tmp_path) == ["block.json"]
+
+
+def test_atomic_write_leaves_the_umask_alone(tmp_path, monkeypatch):
+	# the umask is process wide, changing it would race with the files other threads create
+	def umask(mask):
+		raise AssertionError("umask changed")
+
+	monkeypatch.setattr(os, "umask", umask)
+	storage.atomic_write_bytes(b"data", str(tmp_path), "block.json")
+	assert (tmp_path / "block.json").read_bytes() == b"data"
+
+
+def backends(tmp_path):
+	return [storage.LocalStorage(str(tmp_path / "local")), storage.SQLiteStorage(str(tmp_path / "data.sqlite")),
+			storage.MemoryStorage()]
+
+
+def test_backends_round_trip(tmp_path):
+	from collatz import codec, collatz, functions
+
+	block = {n : {"period": p, "orbit": o} for n in range(1, 51)
+			for p, o in [collatz.orbit_and_period(n, functions.collatz_function)]}
+	encoded = codec.encode_block(block)
+	for backend in backends(tmp_path):
+		checksum = backend.save_block(1, 50, block)
+		backend.save_block(51, 60, {})
+		assert backend.list_blocks() == [(1, 50), (51, 60)]
+		assert backend.load_block(1, 50) == {str(n) : value for n, value in block.items()}
+		assert backend.block_checksum(1, 50) == checksum
+		assert backend.block_checksum(61, 70) is None
+
+		backend.save_encoded_block(1, 50, encoded)
+		assert backend.list_encoded_blocks() == [(1, 50)]
+		assert backend.load_encoded_block(1, 50)[27].to_list() == block[27]["orbit"]
+
+		assert backend.load_meta("manifest") is None
+		with backend.transaction():
+			backend.save_meta("manifest", {"blocks": [[1, 50]]})
+		assert backend.load_meta("manifest") == {"blocks": [[1, 50]]}
+		backend.close()
+
+
+def test_incomplete_backend_cannot_be_created():
+	class Incomplete(storage.Storage):
+		def list_blocks(self):
+			return []
+
+	with pytest.raises(TypeError):
+		Incomplete()